@@ -0,0 +1,73 @@
+"""Benchmark the resolution of absolute references with `--allow-absolute`.
+
+Creates a deep directory tree whose files reference documents at the workspace root with absolute
+links, e.g. `[guide](/docs/guide.md)`, and resolves every reference once with the memoization caches
+cleared before each reference (the previous behavior) and once with them in place. Reports the time
+and the number of existence checks, and the statistics of the memoization cache.
+
+Usage:
+    poetry run python benchmarks/absolute_resolution.py [DIRECTORIES] [FILES_PER_DIRECTORY]
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+
+def build_tree(root: str, directories: int) -> list[str]:
+    for name in ("guide", "install", "faq", "api", "changelog"):
+        os.makedirs(os.path.join(root, "docs"), exist_ok=True)
+        open(os.path.join(root, "docs", f"{name}.md"), "w").close()
+    origin_dirs = []
+    for i in range(directories):
+        origin_dir = os.path.join(root, "src", f"pkg{i}", "sub", "deeper", "module", "docs")
+        os.makedirs(origin_dir)
+        origin_dirs.append(origin_dir)
+    return origin_dirs
+
+
+def main() -> None:
+    directories = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    files_per_directory = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    links = [f"/docs/{name}.md" for name in ("guide", "install", "faq", "api", "changelog")] * 4
+
+    # The validators warn about every absolute reference
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as root:
+        # Settings are parsed from the command line on import
+        sys.argv = ["refcheck", root, "--allow-absolute"]
+        from refcheck.validators import (
+            clear_resolution_caches,
+            file_exists,
+            resolve_absolute_reference,
+        )
+
+        origin_dirs = build_tree(root, directories)
+        references = [
+            (os.path.join(origin_dir, f"file{i}.md"), link)
+            for origin_dir in origin_dirs
+            for i in range(files_per_directory)
+            for link in links
+        ]
+
+        print(f"Resolving {len(references)} absolute references:")
+        print(f"{'mode':<10} {'time':>10} {'exists calls':>14}")
+        for mode in ("uncached", "memoized"):
+            clear_resolution_caches()
+            with mock.patch("os.path.exists", wraps=os.path.exists) as exists:
+                start = time.perf_counter()
+                for origin, link in references:
+                    if mode == "uncached":
+                        clear_resolution_caches()
+                    assert file_exists(origin, link)
+                elapsed = time.perf_counter() - start
+            print(f"{mode:<10} {elapsed:9.3f}s {exists.call_count:>14}")
+
+        print(resolve_absolute_reference.cache_info())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark checking a pull request with `--changed-since`.
+
+Creates a git repository of documents that link to each other's headers, commits it, then changes a
+few documents and deletes one on a branch, and runs refcheck on the whole repository once without
+and once with `--changed-since main`. Reports the time of each run and the number of files checked.
+
+Usage:
+    poetry run python benchmarks/changed_since.py [FILES] [CHANGED_FILES]
+"""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+GIT = ["git", "-c", "user.name=bench", "-c", "user.email=bench@example.com"]
+
+
+def build_repository(root: str, files: int) -> None:
+    for i in range(files):
+        section = os.path.join(root, "docs", f"section{i % 100}")
+        os.makedirs(section, exist_ok=True)
+        links = "\n".join(
+            f"See [page {j}](../section{j % 100}/page{j}.md#section-{j})."
+            for j in range(i + 1, i + 6)
+            if j < files
+        )
+        with open(os.path.join(section, f"page{i}.md"), "w", encoding="utf-8") as file:
+            file.write(f"# Page {i}\n\n## Section {i}\n\n{links}\n")
+    subprocess.run([*GIT, "init", "-q", "-b", "main"], cwd=root, check=True)
+    subprocess.run([*GIT, "add", "."], cwd=root, check=True)
+    subprocess.run([*GIT, "commit", "-q", "-m", "Documentation"], cwd=root, check=True)
+
+
+def change_repository(root: str, files: int, changed_files: int) -> None:
+    subprocess.run([*GIT, "checkout", "-q", "-b", "feature"], cwd=root, check=True)
+    for i in range(1, changed_files + 1):
+        with open(os.path.join(root, "docs", f"section{i}", f"page{i}.md"), "a") as file:
+            file.write("\nMore text.\n")
+    deleted = files // 2
+    os.remove(os.path.join(root, "docs", f"section{deleted % 100}", f"page{deleted}.md"))
+    subprocess.run([*GIT, "commit", "-q", "-a", "-m", "Change"], cwd=root, check=True)
+
+
+def run_refcheck(root: str, *args: str) -> tuple[float, str]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-m", "refcheck.main", "docs", "--no-color", *args],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.getcwd()},
+    )
+    return time.perf_counter() - start, result.stdout
+
+
+def main() -> None:
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    changed_files = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as root:
+        build_repository(root, files)
+        change_repository(root, files, changed_files)
+
+        print(f"Checking {files} files after changing {changed_files} and deleting one:")
+        print(f"{'mode':<24} {'time':>8} {'files checked':>14}")
+        for name, args in (
+            ("all files", ()),
+            ("--changed-since main", ("--changed-since", "main")),
+        ):
+            elapsed, output = run_refcheck(root, *args)
+            checked = len(re.findall(r"^\[\+\] FILE: ", output, re.MULTILINE))
+            print(f"{name:<24} {elapsed:7.2f}s {checked:>14}")
+
+
+if __name__ == "__main__":
+    main()
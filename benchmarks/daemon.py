@@ -0,0 +1,66 @@
+"""Benchmark checks served by `refcheck --daemon`.
+
+Creates a tree of documents that link to each other's headers, then checks one document and the
+whole tree with `refcheck`, and with `refcheck-client` while a daemon serves the tree. Reports the
+time of each check, from the start of the process to its exit.
+
+Usage:
+    poetry run python benchmarks/daemon.py [FILES]
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from incremental import build_tree
+
+
+def run(root: str, module: str, *paths: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", module, *paths, "--no-color"],
+        cwd=root,
+        capture_output=True,
+        env={**os.environ, "PYTHONPATH": os.getcwd()},
+    )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root, files)
+        page = os.path.join("docs", "section1", "page1.md")
+        print(f"Checking {files} files:")
+        print(f"{'check':<24} {'refcheck':>9} {'client':>9}")
+        direct = {paths: run(root, "refcheck.main", *paths) for paths in [(page,), ("docs",)]}
+
+        daemon = subprocess.Popen(
+            [sys.executable, "-u", "-m", "refcheck.main", "docs", "--no-color", "--daemon"],
+            cwd=root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            env={**os.environ, "PYTHONPATH": os.getcwd()},
+        )
+        try:
+            assert daemon.stdout is not None
+            for line in daemon.stdout:
+                if "Serving checks" in line:
+                    break
+            for paths, name in [((page,), "one file"), (("docs",), "all files")]:
+                # The first check also validates the targets, later ones reuse the results
+                client = [run(root, "refcheck.client", *paths) for _ in range(3)]
+                print(f"{name:<24} {direct[paths]:8.2f}s {client[0]:8.2f}s")
+                print(f"{name + ' again':<24} {'':>9} {client[-1]:8.2f}s")
+        finally:
+            daemon.send_signal(signal.SIGINT)
+            daemon.communicate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark the search for Markdown files in a tree with a large `node_modules` directory.
+
+Creates a documentation tree next to a `node_modules` directory with many packages, excludes
+`node_modules`, and searches the tree once with the previous `os.walk` implementation, which entered
+excluded directories and skipped them afterwards, and once with the pruning `os.scandir` walker.
+Reports the time, the number of directories listed and the rates of the new walker.
+
+Then searches the whole tree, including `node_modules`, serially and with the parallel walker, with
+a simulated latency per directory listing as on network file systems, and reports the total time
+and the time until the first Markdown file is available to the parser.
+
+Usage:
+    poetry run python benchmarks/discovery_walk.py [PACKAGES] [FILES_PER_PACKAGE] [LATENCY_MS]
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+
+def build_tree(root: str, packages: int, files_per_package: int) -> None:
+    for i in range(20):
+        section = os.path.join(root, "docs", f"section{i}")
+        os.makedirs(section)
+        for j in range(10):
+            open(os.path.join(section, f"page{j}.md"), "w").close()
+    for i in range(packages):
+        package = os.path.join(root, "node_modules", f"package{i}")
+        for sub in ("lib", "dist", "types"):
+            os.makedirs(os.path.join(package, sub))
+            for j in range(files_per_package):
+                open(os.path.join(package, sub, f"module{j}.js"), "w").close()
+        open(os.path.join(package, "README.md"), "w").close()
+
+
+def legacy_get_markdown_files_from_dir(root_dir: str, exclude: list[str]) -> list[str]:
+    """The previous implementation, which skipped excluded directories after entering them."""
+    exclude_set = set(os.path.normpath(path) for path in exclude)
+    markdown_files = []
+    for subdir, dirs, files in os.walk(root_dir):
+        subdir_norm = os.path.normpath(subdir)
+        if any(subdir_norm.startswith(exclude_item) for exclude_item in exclude_set):
+            continue
+        for file in files:
+            file_path_norm = os.path.normpath(os.path.join(subdir, file))
+            if file.endswith(".md") and file_path_norm not in exclude_set:
+                markdown_files.append(file_path_norm)
+    return markdown_files
+
+
+def main() -> None:
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    files_per_package = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 0.5) / 1000
+
+    real_scandir = os.scandir
+
+    def slow_scandir(path):
+        time.sleep(latency)
+        return real_scandir(path)
+
+    with tempfile.TemporaryDirectory() as root:
+        # Settings are parsed from the command line on import
+        sys.argv = ["refcheck", root]
+        from refcheck.utils import ParallelWalker, get_markdown_files_from_dir
+
+        build_tree(root, packages, files_per_package)
+        exclude = [os.path.join(root, "node_modules")]
+
+        print(f"Searching a tree with {packages} packages in node_modules, which is excluded:")
+        print(f"{'walker':<10} {'time':>10} {'listed dirs':>12} {'found':>7}")
+        walkers = [
+            ("os.walk", legacy_get_markdown_files_from_dir),
+            ("scandir", get_markdown_files_from_dir),
+        ]
+        for name, walker in walkers:
+            with (
+                mock.patch("os.scandir", wraps=real_scandir) as listings,
+                mock.patch("builtins.print"),
+            ):
+                start = time.perf_counter()
+                found = walker(root, exclude)
+                elapsed = time.perf_counter() - start
+            print(f"{name:<10} {elapsed * 1000:8.1f}ms {listings.call_count:>12} {len(found):>7}")
+
+        print("\nWithout exclusions:")
+        # The walker logs its statistics
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+        with mock.patch("builtins.print"):
+            get_markdown_files_from_dir(root)
+        logging.disable(logging.INFO)
+
+        print(f"\nWithout exclusions, with {latency * 1000:.1f} ms of latency per listing:")
+        print(f"{'walker':<12} {'time':>10} {'first file':>12} {'found':>7}")
+        with mock.patch("os.scandir", slow_scandir), mock.patch("builtins.print"):
+            start = time.perf_counter()
+            found = get_markdown_files_from_dir(root)
+            elapsed = time.perf_counter() - start
+        # The serial walker returns all files at once
+        print(f"{'serial':<12} {elapsed:9.3f}s {elapsed:11.3f}s {len(found):>7}")
+        for threads in (2, 4, 8, 16):
+            with mock.patch("os.scandir", slow_scandir):
+                start = time.perf_counter()
+                first = None
+                found = []
+                for file_path in ParallelWalker(threads).iter_markdown_files([root]):
+                    first = first or time.perf_counter() - start
+                    found.append(file_path)
+                elapsed = time.perf_counter() - start
+            print(f"{f'{threads} threads':<12} {elapsed:9.3f}s {first:11.3f}s {len(found):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark the search for Markdown files in a git repository with `--git`.
+
+Creates a git repository with a documentation tree next to a build output directory and a
+`node_modules` directory, both ignored in `.gitignore`, and searches it once by walking the tree,
+once by walking it with the ignored directories excluded by hand, and once by listing the files of
+the repository with `git ls-files`. Reports the time, the number of directories listed and the number
+of Markdown files found, then the time to check the existence of the link targets of the
+documentation with `os.path.exists` and with the index filled from git.
+
+Usage:
+    poetry run python benchmarks/git_discovery.py [PACKAGES] [FILES_PER_PACKAGE]
+"""
+
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import mock
+
+
+def build_repository(root: str, packages: int, files_per_package: int) -> list[str]:
+    targets = []
+    for i in range(20):
+        section = os.path.join(root, "docs", f"section{i}")
+        os.makedirs(os.path.join(section, "img"))
+        for j in range(10):
+            open(os.path.join(section, f"page{j}.md"), "w").close()
+            open(os.path.join(section, "img", f"figure{j}.png"), "w").close()
+            targets += [os.path.join(section, f"page{j}.md"), os.path.join(section, "img", "x.png")]
+    for i in range(packages):
+        for top in ("node_modules", "build"):
+            package = os.path.join(root, top, f"package{i}")
+            os.makedirs(os.path.join(package, "lib"))
+            for j in range(files_per_package):
+                open(os.path.join(package, "lib", f"module{j}.js"), "w").close()
+            open(os.path.join(package, "README.md"), "w").close()
+    with open(os.path.join(root, ".gitignore"), "w") as file:
+        file.write("node_modules/\nbuild/\n")
+
+    git = ["git", "-c", "user.name=bench", "-c", "user.email=bench@example.com"]
+    subprocess.run([*git, "init", "-q"], cwd=root, check=True)
+    subprocess.run([*git, "add", "."], cwd=root, check=True)
+    subprocess.run([*git, "commit", "-q", "-m", "Documentation"], cwd=root, check=True)
+    return targets
+
+
+def main() -> None:
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    files_per_package = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    logging.disable(logging.WARNING)
+    real_scandir = os.scandir
+    with tempfile.TemporaryDirectory() as root:
+        # Settings are parsed from the command line on import
+        sys.argv = ["refcheck", root, "--git"]
+        from refcheck.utils import (
+            get_markdown_files_from_dir,
+            get_markdown_files_from_git,
+            path_index,
+        )
+
+        targets = build_repository(root, packages, files_per_package)
+        ignored = [os.path.join(root, "node_modules"), os.path.join(root, "build")]
+
+        print(f"Searching a repository with {packages} ignored packages in two directories:")
+        print(f"{'discovery':<18} {'time':>10} {'listed dirs':>12} {'found':>7}")
+        searches = [
+            ("walk", lambda: get_markdown_files_from_dir(root)),
+            ("walk, excluded", lambda: get_markdown_files_from_dir(root, ignored)),
+            ("git ls-files", lambda: get_markdown_files_from_git([root])[0]),
+        ]
+        for name, search in searches:
+            with (
+                mock.patch("os.scandir", wraps=real_scandir) as listings,
+                mock.patch("builtins.print"),
+            ):
+                start = time.perf_counter()
+                found = search()
+                elapsed = time.perf_counter() - start
+            print(f"{name:<18} {elapsed * 1000:8.1f}ms {listings.call_count:>12} {len(found):>7}")
+
+        print(f"\nChecking {len(targets)} link targets:")
+        for name, exists in (("os.path.exists", os.path.exists), ("git index", path_index.exists)):
+            start = time.perf_counter()
+            existing = sum(map(exists, targets))
+            elapsed = time.perf_counter() - start
+            print(f"{name:<18} {elapsed * 1000:8.1f}ms {existing:>7} exist")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark re-runs with `--incremental`.
+
+Creates a tree of documents that link to each other's headers and runs refcheck on it without the
+cache, then with `--incremental` on a cold cache, again without changes, and again after editing
+one document. Reports the time of each run and the statistics of the cache.
+
+Usage:
+    poetry run python benchmarks/incremental.py [FILES]
+"""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def build_tree(root: str, files: int) -> None:
+    for i in range(files):
+        section = os.path.join(root, "docs", f"section{i % 100}")
+        os.makedirs(section, exist_ok=True)
+        links = "\n".join(
+            f"See [page {j}](../section{j % 100}/page{j}.md#section-{j})."
+            for j in range(i + 1, i + 6)
+            if j < files
+        )
+        with open(os.path.join(section, f"page{i}.md"), "w", encoding="utf-8") as file:
+            file.write(f"# Page {i}\n\n## Section {i}\n\n{links}\n")
+
+
+def run_refcheck(root: str, *args: str) -> tuple[float, str]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-m", "refcheck.main", "docs", "--no-color", "--verbose", *args],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.getcwd()},
+    )
+    output = result.stdout + result.stderr
+    stats = re.search(r"Reused \d+ of \d+ documents and \d+ of \d+ local verdicts", output)
+    return time.perf_counter() - start, stats[0] if stats else ""
+
+
+def main() -> None:
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root, files)
+        # Files modified right before a run are compared by content on the next one
+        past = time.time() - 60
+        for directory, _, names in os.walk(root):
+            for name in names:
+                os.utime(os.path.join(directory, name), (past, past))
+
+        print(f"Checking {files} files:")
+        print(f"{'run':<24} {'time':>8}  cache")
+        runs = [
+            ("without cache", ()),
+            ("cold cache", ("--incremental",)),
+            ("no changes", ("--incremental",)),
+            ("one file edited", ("--incremental",)),
+        ]
+        for name, args in runs:
+            if name == "one file edited":
+                with open(os.path.join(root, "docs", "section1", "page1.md"), "a") as file:
+                    file.write("\n## New Section\n")
+            elapsed, stats = run_refcheck(root, *args)
+            print(f"{name:<24} {elapsed:7.2f}s  {stats}")
+
+
+if __name__ == "__main__":
+    main()
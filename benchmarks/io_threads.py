@@ -0,0 +1,87 @@
+"""Benchmark local validation on a simulated high-latency file system.
+
+Creates a tree of documents linking to each other's headers and to images, and checks all
+references with a growing number of I/O threads. The latency of network file systems is simulated
+by delaying every existence check and every file opened by the parser.
+
+Usage:
+    poetry run python benchmarks/io_threads.py [FILES] [LATENCY_MS]
+"""
+
+import builtins
+import logging
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+
+def build_tree(root: str, files: int) -> list[str]:
+    os.makedirs(os.path.join(root, "img"))
+    paths = []
+    for i in range(files):
+        open(os.path.join(root, "img", f"figure{i}.png"), "w").close()
+        links = "\n".join(
+            f"See [page {j}](page{j}.md#section-{j}) and ![figure](img/figure{j}.png)."
+            for j in range(i, i + 10)
+        )
+        path = os.path.join(root, f"page{i}.md")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(f"# Page {i}\n\n## Section {i}\n\n{links}\n")
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 2.0) / 1000
+
+    def slow(function):
+        def delayed(*args, **kwargs):
+            time.sleep(latency)
+            return function(*args, **kwargs)
+
+        return delayed
+
+    # References to missing pages are reported as errors
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as root:
+        # Settings are parsed from the command line on import
+        sys.argv = ["refcheck", root]
+        from refcheck.main import ReferenceChecker
+        from refcheck.parsers import MarkdownParser
+        from refcheck.store import document_store
+        from refcheck.validators import clear_resolution_caches
+
+        paths = build_tree(root, files)
+        # Parsed outside of the store, so that the target files are read while checking
+        parser = MarkdownParser()
+        references = [
+            ref
+            for path in paths
+            for refs in parser.parse_markdown_file(path).values()
+            for ref in refs
+        ]
+
+        print(f"Checking {files} files with {latency * 1000:.1f} ms of latency per file access:")
+        print(f"{'threads':>8} {'time':>10} {'broken':>8}")
+        for io_threads in (1, 2, 4, 8, 16):
+            document_store.reset()
+            clear_resolution_caches()
+            checker = ReferenceChecker(io_threads=io_threads)
+            with (
+                mock.patch("os.path.exists", slow(os.path.exists)),
+                mock.patch("refcheck.parsers.open", slow(builtins.open), create=True),
+                mock.patch("builtins.print"),
+            ):
+                start = time.perf_counter()
+                if io_threads > 1:
+                    checker.validate_local_targets(references)
+                checker.check_references(references)
+                elapsed = time.perf_counter() - start
+            print(f"{io_threads:>8} {elapsed:9.3f}s {len(checker.broken_references):>8}")
+
+
+if __name__ == "__main__":
+    main()
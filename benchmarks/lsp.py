@@ -0,0 +1,121 @@
+"""Benchmark diagnostics of `refcheck-lsp`.
+
+Creates a tree of documents that link to each other's headers, starts the language server on it,
+then opens one document and edits it a few times. Reports the time from each notification to the
+diagnostics of the document, against the time of `refcheck` checking the same document.
+
+Usage:
+    poetry run python benchmarks/lsp.py [FILES]
+"""
+
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+from typing import IO, Any
+
+from incremental import build_tree
+
+EDITS = 5
+
+
+def send(stdin: IO[bytes], message: dict[str, Any]) -> None:
+    body = json.dumps({"jsonrpc": "2.0", **message}).encode("utf-8")
+    stdin.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+    stdin.flush()
+
+
+def receive(stdout: IO[bytes]) -> dict[str, Any]:
+    length = 0
+    while line := stdout.readline().strip():
+        name, _, value = line.decode("ascii").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return json.loads(stdout.read(length))
+
+
+def wait_for_diagnostics(stdout: IO[bytes], uri: str) -> list[dict[str, Any]]:
+    while True:
+        message = receive(stdout)
+        if (
+            message.get("method") == "textDocument/publishDiagnostics"
+            and message["params"]["uri"] == uri
+        ):
+            return message["params"]["diagnostics"]
+
+
+def main() -> None:
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root, files)
+        path = pathlib.Path(root, "docs", "section1", "page1.md")
+        uri = path.as_uri()
+        text = path.read_text(encoding="utf-8")
+
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "refcheck.main", str(path), "--no-color"],
+            cwd=root,
+            capture_output=True,
+            env={**os.environ, "PYTHONPATH": os.getcwd()},
+        )
+        direct = time.perf_counter() - start
+
+        server = subprocess.Popen(
+            [sys.executable, "-m", "refcheck.lsp"],
+            cwd=root,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env={**os.environ, "PYTHONPATH": os.getcwd()},
+        )
+        assert server.stdin is not None and server.stdout is not None
+        try:
+            params = {"rootUri": pathlib.Path(root).as_uri(), "capabilities": {}}
+            send(server.stdin, {"id": 0, "method": "initialize", "params": params})
+            receive(server.stdout)
+            send(server.stdin, {"method": "initialized", "params": {}})
+
+            start = time.perf_counter()
+            document = {"uri": uri, "languageId": "markdown", "version": 0, "text": text}
+            send(
+                server.stdin,
+                {"method": "textDocument/didOpen", "params": {"textDocument": document}},
+            )
+            broken = wait_for_diagnostics(server.stdout, uri)
+            opened = time.perf_counter() - start
+
+            edits = []
+            for version in range(1, EDITS + 1):
+                # Each edit adds a header and a link to a missing header of another file
+                text += f"\n## Edit {version}\n\n[missing](../section2/page2.md#edit-{version})\n"
+                start = time.perf_counter()
+                params = {
+                    "textDocument": {"uri": uri, "version": version},
+                    "contentChanges": [{"text": text}],
+                }
+                send(server.stdin, {"method": "textDocument/didChange", "params": params})
+                diagnostics = wait_for_diagnostics(server.stdout, uri)
+                edits.append(time.perf_counter() - start)
+                assert len(diagnostics) == len(broken) + version
+
+            send(server.stdin, {"id": 1, "method": "shutdown"})
+            send(server.stdin, {"method": "exit"})
+            server.wait()
+        finally:
+            if server.poll() is None:
+                server.kill()
+
+        print(f"Workspace of {files} files:")
+        print(f"{'refcheck on one file':<28} {direct * 1000:8.1f} ms")
+        print(f"{'didOpen':<28} {opened * 1000:8.1f} ms")
+        print(f"{'didChange (mean)':<28} {sum(edits) / len(edits) * 1000:8.1f} ms")
+        print(f"{'didChange (max)':<28} {max(edits) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
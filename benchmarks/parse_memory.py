@@ -0,0 +1,68 @@
+"""Benchmark the peak memory of parsing a large markdown file.
+
+Compares the current bytes-native parser, which memory-maps large files and decodes only matched
+slices, against the previous approach of reading and decoding the whole file into a `str` before
+scanning it. Each approach runs in its own process, so the reported peak RSS is its own.
+
+Usage:
+    poetry run python benchmarks/parse_memory.py [SIZE_IN_MIB]
+"""
+
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from refcheck.parsers import DEFAULT_KINDS, MarkdownParser, build_scan_pattern
+
+
+def write_document(path: str, size: int) -> None:
+    paragraph = "Some prose with ümlauts that does not link anywhere at all. " * 20 + "\n"
+    paragraph += "A line with a [link](docs/file.md) and an ![image](img/pic.png).\n\n"
+    with open(path, "w", encoding="utf-8") as file:
+        for _ in range(size // len(paragraph.encode("utf-8"))):
+            file.write(paragraph)
+
+
+def parse_legacy(path: str) -> int:
+    with open(path, "r", encoding="utf-8") as file:
+        content = file.read()
+    pattern = re.compile(build_scan_pattern(DEFAULT_KINDS).pattern.decode("ascii"))
+    return sum(1 for _ in pattern.finditer(content))
+
+
+def parse_current(path: str) -> int:
+    parser = MarkdownParser()
+    with parser.open_buffer(path) as buffer:
+        assert buffer is not None
+        return sum(1 for _ in parser.iter_references_in_buffer(path, buffer))
+
+
+def run(mode: str, path: str) -> None:
+    start = time.perf_counter()
+    count = parse_legacy(path) if mode == "legacy" else parse_current(path)
+    elapsed = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+    print(f"{mode:<10} {peak_rss:10.1f} MiB {elapsed:9.2f} s {count:>10} matches")
+
+
+def main() -> None:
+    if len(sys.argv) == 4 and sys.argv[1] == "--run":
+        run(sys.argv[2], sys.argv[3])
+        return
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "large.md")
+        write_document(path, size * 1024 * 1024)
+        print(f"Parsing a {size} MiB document:")
+        print(f"{'approach':<10} {'peak RSS':>14} {'time':>11} {'found':>18}")
+        for mode in ("legacy", "current"):
+            subprocess.run([sys.executable, __file__, "--run", mode, path], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark parsing and local validation on a pool of processes.
+
+Creates a tree of documents that link to each other's headers, then checks it with `refcheck`
+and a growing number of processes, up to the number of CPUs. Reports the time of each check, from
+the start of the process to its exit, and checks that all of them report the same.
+
+Usage:
+    poetry run python benchmarks/processes.py [FILES]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from incremental import build_tree
+
+
+def run(root: str, processes: int) -> tuple[float, list[str]]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "refcheck.main",
+            "docs",
+            "--no-color",
+            "--processes",
+            str(processes),
+        ],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.getcwd()},
+    )
+    # Files are found in no particular order, so the lines of the output are compared sorted
+    return time.perf_counter() - start, sorted(result.stdout.splitlines())
+
+
+def main() -> None:
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, 16, 32, cpus} & set(range(1, cpus + 1)) | {1, 2})
+
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root, files)
+        print(f"Checking {files} files on {cpus} CPUs:")
+        print(f"{'processes':>9} {'time':>9} {'speedup':>8}")
+        baseline, expected = run(root, 1)
+        for processes in counts:
+            elapsed, output = run(root, processes)
+            assert output == expected, f"--processes {processes} reported differently"
+            print(f"{processes:>9} {elapsed:8.2f}s {baseline / elapsed:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
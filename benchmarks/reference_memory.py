@@ -0,0 +1,93 @@
+"""Benchmark the memory used by parsed references.
+
+Compares the current slotted `Reference` (plus offset-only `ReferenceMatch`) against the previous
+layout: a plain dataclass per reference, built from a list of `ReferenceMatch` objects holding on to
+their `re.Match`. Reports the peak while parsing and the memory retained by the references.
+
+Usage:
+    poetry run python benchmarks/reference_memory.py [NUMBER_OF_REFERENCES]
+"""
+
+import re
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from re import Match
+
+from refcheck.parsers import BASIC_REFERENCE_PATTERN, MarkdownParser
+
+
+@dataclass
+class LegacyReference:
+    file_path: str
+    line_number: int
+    syntax: str
+    link: str
+    is_remote: bool
+
+
+@dataclass
+class LegacyReferenceMatch:
+    line_number: int
+    match: Match
+
+
+def build_document(count: int) -> str:
+    return "".join(f"Line {i} with a [link {i}](docs/file_{i}.md) in it.\n" for i in range(count))
+
+
+def legacy_references(file_path: str, content: str) -> list[LegacyReference]:
+    matches = []
+    line_number, last_pos = 1, 0
+    for m in re.finditer(BASIC_REFERENCE_PATTERN, content):
+        # Lines are counted from the previous match, so the document is traversed once
+        line_number += content.count("\n", last_pos, m.start())
+        last_pos = m.start()
+        matches.append(LegacyReferenceMatch(line_number=line_number, match=m))
+    references = [
+        LegacyReference(
+            file_path=file_path,
+            line_number=m.line_number,
+            syntax=m.match.group(0),
+            link=m.match.group("link"),
+            is_remote=False,
+        )
+        for m in matches
+    ]
+    return references
+
+
+def measure(label: str, build) -> tuple[int, int]:
+    tracemalloc.start()
+    result = build()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print(f"{label:<10} {peak / 1024 / 1024:10.2f} MiB {retained / 1024 / 1024:10.2f} MiB")
+    return peak, retained
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    file_path = "docs/benchmark.md"
+    parser = MarkdownParser()
+
+    print(f"Memory for {count} references:")
+    print(f"{'layout':<10} {'peak':>14} {'retained':>14}")
+    # Each builder creates its own copy of the document and drops it once parsing is done, so the
+    # retained figure only counts what the references keep alive.
+    legacy_peak, legacy_retained = measure(
+        "legacy", lambda: legacy_references(file_path, build_document(count))
+    )
+    peak, retained = measure(
+        "slotted",
+        lambda: list(
+            parser.iter_references_in_buffer(file_path, build_document(count).encode("utf-8"))
+        ),
+    )
+    print(f"Peak reduction:     {100 * (1 - peak / legacy_peak):.1f}%")
+    print(f"Retained reduction: {100 * (1 - retained / legacy_retained):.1f}%")
+
+
+if __name__ == "__main__":
+    main()
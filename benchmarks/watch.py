@@ -0,0 +1,68 @@
+"""Benchmark re-checks with `--watch`.
+
+Creates a tree of documents that link to each other's headers and runs refcheck on it with
+`--watch`. Reports the time of the initial check, and the time from editing one document to the
+end of the summary of the check that follows, without and with a header change.
+
+Usage:
+    poetry run python benchmarks/watch.py [FILES]
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from incremental import build_tree
+
+SUMMARY_END = "=" * 68
+
+
+def wait_for(process: subprocess.Popen, text: str) -> None:
+    assert process.stdout is not None
+    for line in process.stdout:
+        if text in line:
+            return
+    raise RuntimeError(f"refcheck exited before printing {text!r}")
+
+
+def main() -> None:
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root, files)
+        print(f"Checking {files} files:")
+
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-u", "-m", "refcheck.main", "docs", "--no-color", "--watch"],
+            cwd=root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            env={**os.environ, "PYTHONPATH": os.getcwd()},
+        )
+        try:
+            wait_for(process, "Watching")
+            print(f"{'initial check':<24} {time.perf_counter() - start:7.2f}s")
+
+            edits = [
+                ("text edited", "\nMore text.\n"),
+                ("header added", "\n## New Section\n"),
+            ]
+            for name, text in edits:
+                start = time.perf_counter()
+                with open(os.path.join(root, "docs", "section1", "page1.md"), "a") as file:
+                    file.write(text)
+                wait_for(process, "Markdown files to check again")
+                wait_for(process, SUMMARY_END)
+                print(f"{name:<24} {time.perf_counter() - start:7.2f}s")
+        finally:
+            process.send_signal(signal.SIGINT)
+            process.communicate()
+
+
+if __name__ == "__main__":
+    main()
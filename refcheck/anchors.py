@@ -0,0 +1,165 @@
+import re
+from enum import Enum
+from typing import Iterator
+
+from refcheck.parsers import Buffer
+
+# Documents are analyzed as bytes, like the parser scans them. Only header texts and ids are decoded.
+
+# ATX headings - ## Title ##
+ATX_HEADING_PATTERN = re.compile(rb"^ {0,3}#{1,6}(?:[ \t]+(?P<text>.*?))?(?:[ \t]+#+)?[ \t]*$")
+# Setext headings - the paragraph above a line of `=` or `-`
+SETEXT_UNDERLINE_PATTERN = re.compile(rb"^ {0,3}(?:=+|-+)[ \t]*$")
+# Lines starting other blocks, which cannot be part of a setext heading
+BLOCK_START_PATTERN = re.compile(rb"^ {0,3}(?:[-*+>|]|\d+[.)])(?:\s|$)|^ {4}")
+FENCE_PATTERN = re.compile(rb"^ {0,3}(?P<fence>`{3,}|~{3,})")
+FRONT_MATTER_END_PATTERN = re.compile(rb"^(?:---|\.\.\.)[ \t]*$")
+
+# Explicit heading ids - ## Title {#custom-id}
+HEADER_ID_PATTERN = re.compile(r"\s*\{#(?P<id>[^\s}]+)\}\s*$")
+# HTML anchors - <a name="anchor"></a> or <span id="anchor"></span>
+HTML_ANCHOR_PATTERN = re.compile(
+    rb"<[a-zA-Z][^>]*?\s(?:id|name)=(?P<quote>[\"'])(?P<id>.*?)(?P=quote)"
+)
+
+# Inline syntax that is rendered as its text in headings
+INLINE_LINK_TEXT_PATTERN = re.compile(r"!?\[(?P<text>[^\]]*)\](?:\([^)]*\)|\[[^\]]*\])")
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+# Everything but letters, digits, `_`, `-` and spaces is dropped from slugs
+SLUG_REMOVE_PATTERN = re.compile(r"[^\w\- ]")
+HYPHENS_PATTERN = re.compile(r"-{2,}")
+
+
+class AnchorStyle(str, Enum):
+    """Rules used to turn headings into anchors."""
+
+    GITHUB = "github"
+    GITLAB = "gitlab"
+
+
+def slugify(text: str, style: AnchorStyle = AnchorStyle.GITHUB) -> str:
+    """Turn the text of a heading into its anchor, without the suffix of duplicate headings.
+
+    Both styles lowercase the text, drop punctuation and symbols while keeping non-ASCII letters and
+    turn each space into a hyphen. GitLab additionally collapses runs of hyphens.
+    """
+    slug = SLUG_REMOVE_PATTERN.sub("", text.strip().lower()).replace(" ", "-")
+    if style is AnchorStyle.GITLAB:
+        slug = HYPHENS_PATTERN.sub("-", slug)
+    return slug
+
+
+class Slugger:
+    """Generate the anchors of the headings of one document, numbering duplicates.
+
+    The first heading gets the plain slug, the following ones with the same slug get `-1`, `-2`,
+    ... appended, skipping suffixes that are taken by other headings.
+    """
+
+    def __init__(self, style: AnchorStyle = AnchorStyle.GITHUB):
+        self.style = style
+        self.occurrences: dict[str, int] = {}
+
+    def slug(self, text: str) -> str:
+        original = slugify(text, self.style)
+        slug = original
+        while slug in self.occurrences:
+            self.occurrences[original] += 1
+            slug = f"{original}-{self.occurrences[original]}"
+        self.occurrences[slug] = 0
+        return slug
+
+
+def _heading_text(text: str) -> str:
+    """Reduce the Markdown of a heading to the text it is rendered as."""
+    text = INLINE_LINK_TEXT_PATTERN.sub(r"\g<text>", text)
+    return HTML_TAG_PATTERN.sub("", text)
+
+
+def _iter_lines(content: Buffer) -> Iterator[bytes]:
+    """Yield the lines of a buffer without their line breaks."""
+    if isinstance(content, bytes):
+        yield from content.splitlines()
+    else:
+        # `mmap` has no `splitlines`, but reading it line by line does not copy it as a whole
+        content.seek(0)
+        for line in iter(content.readline, b""):
+            yield line.rstrip(b"\r\n")
+
+
+def _iter_lines_outside_code(content: Buffer) -> Iterator[bytes]:
+    """Yield the lines of a document that are not part of front matter or fenced code blocks.
+
+    The lines of a code block are replaced by a single empty line, so that they still separate
+    the paragraphs around them.
+    """
+    lines = _iter_lines(content)
+    if content[:4] == b"---\n":
+        next(lines)
+        for line in lines:
+            if FRONT_MATTER_END_PATTERN.match(line):
+                break
+
+    fence = None
+    for line in lines:
+        match = FENCE_PATTERN.match(line)
+        if fence is None:
+            if match:
+                fence = match["fence"]
+                yield b""
+            else:
+                yield line
+        elif (
+            match
+            and match["fence"][0] == fence[0]
+            and len(match["fence"]) >= len(fence)
+            and not line[match.end() :].strip()
+        ):
+            fence = None
+
+
+def extract_anchors(content: Buffer, style: AnchorStyle = AnchorStyle.GITHUB) -> frozenset[str]:
+    """Collect the anchors a Markdown document defines.
+
+    These are the slugs of its ATX and setext headings, explicit `{#id}` heading ids and the `id`
+    and `name` attributes of HTML elements. Headings and HTML in fenced code blocks are ignored.
+    """
+    slugger = Slugger(style)
+    anchors: set[str] = set()
+
+    def add_heading(raw_text: bytes) -> None:
+        text = raw_text.decode("utf-8", errors="replace")
+        explicit_id = HEADER_ID_PATTERN.search(text)
+        if explicit_id:
+            anchors.add(explicit_id["id"])
+            return
+        slug = slugger.slug(_heading_text(text))
+        if slug:
+            anchors.add(slug)
+
+    # Lines of the current paragraph, or None inside other blocks, e.g. lists, until a blank line
+    paragraph: list[bytes] | None = []
+    for line in _iter_lines_outside_code(content):
+        if b"<" in line:
+            anchors.update(
+                match["id"].decode("utf-8", errors="replace")
+                for match in HTML_ANCHOR_PATTERN.finditer(line)
+            )
+
+        if paragraph and SETEXT_UNDERLINE_PATTERN.match(line):
+            add_heading(b" ".join(paragraph))
+            paragraph = []
+            continue
+
+        heading = ATX_HEADING_PATTERN.match(line)
+        if heading:
+            add_heading(heading["text"] or b"")
+            paragraph = []
+        elif not line.strip():
+            paragraph = []
+        elif paragraph == [] and BLOCK_START_PATTERN.match(line):
+            paragraph = None
+        elif paragraph is not None:
+            paragraph.append(line.strip())
+
+    return frozenset(anchors)
@@ -0,0 +1,283 @@
+import os
+import json
+import hashlib
+import logging
+import time
+import sqlite3
+import threading
+from dataclasses import dataclass
+
+from refcheck.anchors import AnchorStyle
+from refcheck.parsers import Buffer, MarkdownParser, Reference, ReferenceKind
+from refcheck.utils import path_index
+
+logger = logging.getLogger()
+
+CACHE_DIR = ".refcheck_cache"
+CACHE_FILE = "index.sqlite3"
+# Bump when the parser or the anchors change what is extracted from the same content
+CACHE_VERSION = "4"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    refs TEXT NOT NULL,
+    anchors TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS verdicts (
+    target TEXT NOT NULL,
+    fragment TEXT NOT NULL,
+    state TEXT NOT NULL,
+    valid INTEGER NOT NULL,
+    PRIMARY KEY (target, fragment)
+);
+"""
+
+# Files modified this recently may change again without changing their size and modification time
+RACY_NANOSECONDS = 2_000_000_000
+
+# States of a target that its verdicts depend on, besides the content hash of Markdown files
+MISSING = "missing"
+EXISTS = "exists"
+
+
+def content_hash(buffer: Buffer) -> str:
+    """Return the hash identifying the content of a file."""
+    return hashlib.blake2b(buffer, digest_size=16).hexdigest()
+
+
+def get_fingerprint(
+    parser: MarkdownParser, anchor_style: AnchorStyle, options: dict[str, object] | None = None
+) -> str:
+    """Return the fingerprint of the configuration that cached documents and verdicts depend on.
+
+    Options are the settings that change how local targets are resolved, e.g. whether only the
+    files known to git exist, so verdicts made under other settings are not reused.
+    """
+    digest = hashlib.blake2b(parser.scan_pattern.pattern, digest_size=16)
+    digest.update(anchor_style.value.encode())
+    digest.update(json.dumps(options or {}, sort_keys=True).encode())
+    return f"{CACHE_VERSION}:{digest.hexdigest()}"
+
+
+def create_cache_directory(directory: str = CACHE_DIR) -> None:
+    """Create the directory of the cache, if needed, ignored by git."""
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+        # Keep the cache out of version control, like .pytest_cache
+        with open(os.path.join(directory, ".gitignore"), "w", encoding="utf-8") as file:
+            file.write("# Created by refcheck\n*\n")
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """Statistics on how much work the cache saved."""
+
+    reused_documents: int = 0
+    parsed_documents: int = 0
+    reused_verdicts: int = 0
+    computed_verdicts: int = 0
+
+    def __str__(self):
+        return (
+            f"Reused {self.reused_documents} of {self.reused_documents + self.parsed_documents} "
+            f"documents and {self.reused_verdicts} of "
+            f"{self.reused_verdicts + self.computed_verdicts} local verdicts from the cache."
+        )
+
+
+class IndexCache:
+    """Persistent index of the documents and local verdicts of previous runs, in SQLite.
+
+    Documents are stored with the size, modification time and content hash of their file. A file
+    whose size and modification time did not change is not read again; one whose content hash did
+    not change is not parsed again.
+
+    Verdicts of local references are stored by (target path, fragment), along with the state of the
+    target they depend on: whether it exists and, for fragments, the content hash of the target.
+    A verdict is reused while its target is in the same state, wherever the reference is made, so
+    only references to changed targets are validated again.
+
+    Paths are stored as absolute paths. The cache can be used from several threads.
+    """
+
+    def __init__(self, path: str, fingerprint: str):
+        self.path = path
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+
+        row = self._connection.execute(
+            "SELECT value FROM meta WHERE key = 'fingerprint'"
+        ).fetchone()
+        if row is None or row[0] != fingerprint:
+            if row is not None:
+                logger.info("The configuration changed, discarding the cache.")
+            self._connection.execute("DELETE FROM files")
+            self._connection.execute("DELETE FROM verdicts")
+            self._connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)", (fingerprint,)
+            )
+
+    @classmethod
+    def open(cls, fingerprint: str, directory: str = CACHE_DIR) -> "IndexCache":
+        """Open the cache in a directory, creating it if needed."""
+        create_cache_directory(directory)
+        return cls(os.path.join(directory, CACHE_FILE), fingerprint)
+
+    def close(self) -> None:
+        """Write the changes of the run and close the cache."""
+        logger.info(self.stats)
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    def _stat(self, path: str) -> os.stat_result | None:
+        try:
+            return os.stat(path)
+        except OSError:
+            return None
+
+    def _stored_mtime(self, stat: os.stat_result) -> int:
+        """Return the modification time to store for a file, or 0 to compare its content next time.
+
+        Like git does for its index, files modified right before they were read are not trusted by
+        their modification time, as a later write in the same clock tick would not change it.
+        """
+        return 0 if time.time_ns() - stat.st_mtime_ns < RACY_NANOSECONDS else stat.st_mtime_ns
+
+    def load_document(
+        self, file_path: str, file_hash: str | None = None
+    ) -> tuple[tuple[Reference, ...], frozenset[str]] | None:
+        """Return the references and anchors of a file from the cache, or None if it changed.
+
+        Without a hash, the file must have the size and modification time it was stored with, so
+        it is not read. With the hash of its content, it must have the same content.
+        """
+        abs_path = os.path.abspath(file_path)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT mtime_ns, size, hash, refs, anchors FROM files WHERE path = ?", (abs_path,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        mtime_ns, size, stored_hash, refs, anchors = row
+        if file_hash is None:
+            stat = self._stat(abs_path)
+            if stat is None or (stat.st_mtime_ns, stat.st_size) != (mtime_ns, size):
+                return None
+        elif file_hash != stored_hash:
+            return None
+        else:
+            # Same content, e.g. after a checkout, so the new modification time is recorded
+            self._update_stat(abs_path)
+
+        with self._lock:
+            self.stats.reused_documents += 1
+        references = tuple(
+            Reference(
+                file_path,
+                line_number,
+                syntax,
+                link,
+                kind=ReferenceKind(kind),
+                column=column,
+            )
+            for line_number, column, syntax, link, kind in json.loads(refs)
+        )
+        return references, frozenset(json.loads(anchors))
+
+    def _update_stat(self, abs_path: str) -> None:
+        stat = self._stat(abs_path)
+        if stat is not None:
+            with self._lock:
+                self._connection.execute(
+                    "UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?",
+                    (self._stored_mtime(stat), stat.st_size, abs_path),
+                )
+
+    def store_document(
+        self,
+        file_path: str,
+        file_hash: str,
+        references: tuple[Reference, ...],
+        anchors: frozenset[str],
+    ) -> None:
+        """Store the references and anchors of a file that was just parsed."""
+        abs_path = os.path.abspath(file_path)
+        stat = self._stat(abs_path)
+        if stat is None:
+            return
+        refs = json.dumps(
+            [
+                (ref.line_number, ref.column, ref.syntax, ref.link, ref.kind.value)
+                for ref in references
+            ]
+        )
+        with self._lock:
+            self.stats.parsed_documents += 1
+            self._connection.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    abs_path,
+                    self._stored_mtime(stat),
+                    stat.st_size,
+                    file_hash,
+                    refs,
+                    json.dumps(sorted(anchors)),
+                ),
+            )
+
+    def _target_state(self, abs_path: str, fragment: str) -> str | None:
+        """Return the state of a target that its verdicts depend on, or None if it is unknown.
+
+        Without a fragment, a verdict only depends on whether the target exists, which is looked up
+        in `path_index` like the validators do, e.g. in the files listed by git. With one, it
+        depends on the content of the target, which is known from its size and modification time
+        if it is stored.
+        """
+        if not path_index.exists(abs_path):
+            return MISSING
+        if not fragment:
+            return EXISTS
+        stat = self._stat(abs_path)
+        if stat is None:
+            return None
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT hash FROM files WHERE path = ? AND mtime_ns = ? AND size = ?",
+                (abs_path, stat.st_mtime_ns, stat.st_size),
+            ).fetchone()
+        return row[0] if row else None
+
+    def load_verdict(self, key: tuple[str, str]) -> bool | None:
+        """Return the verdict of references to a (target path, fragment), or None if it changed."""
+        abs_path, fragment = os.path.abspath(key[0]), key[1]
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT state, valid FROM verdicts WHERE target = ? AND fragment = ?",
+                (abs_path, fragment),
+            ).fetchone()
+        if row is None or row[0] != self._target_state(abs_path, fragment):
+            return None
+        self.stats.reused_verdicts += 1
+        return bool(row[1])
+
+    def store_verdict(self, key: tuple[str, str], is_valid: bool) -> None:
+        """Store the verdict of references to a (target path, fragment) that was just validated."""
+        abs_path, fragment = os.path.abspath(key[0]), key[1]
+        self.stats.computed_verdicts += 1
+        state = self._target_state(abs_path, fragment)
+        if state is None:
+            return
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?)",
+                (abs_path, fragment, state, int(is_valid)),
+            )
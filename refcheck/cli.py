@@ -29,7 +29,18 @@ class CustomFormatter(argparse.HelpFormatter):
             return ", ".join(parts)
 
 
-def get_command_line_arguments() -> Namespace:
+def positive_int(value: str) -> int:
+    """Parse a positive integer argument."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"invalid positive integer: '{value}'")
+    return number
+
+
+def get_argument_parser() -> argparse.ArgumentParser:
     """Setup command line argument parser."""
     parser = argparse.ArgumentParser(
         prog="refcheck",
@@ -50,7 +61,7 @@ def get_command_line_arguments() -> Namespace:
         type=str,
         nargs="*",
         default=[],
-        help="Files or directories to exclude",
+        help="Files or directories to exclude, as .gitignore patterns",
     )  # type: ignore
     parser.add_argument(
         "-cm",
@@ -65,6 +76,83 @@ def get_command_line_arguments() -> Namespace:
         action="store_true",
         help="Allow absolute path references like [ref](/path/to/file.md)",
     )  # type: ignore
+    parser.add_argument(
+        "--html-links",
+        action="store_true",
+        help='Check HTML anchor references like <a href="file.md">',
+    )  # type: ignore
+    parser.add_argument(
+        "--html-images",
+        action="store_true",
+        help='Check HTML image references like <img src="image.png">',
+    )  # type: ignore
+    parser.add_argument(
+        "--raw-links",
+        action="store_true",
+        help="Check bare URLs like https://example.com",
+    )  # type: ignore
+    parser.add_argument(
+        "--anchor-style",
+        choices=["github", "gitlab"],
+        default="github",
+        help="Rules used to generate the anchors of headers (default: github)",
+    )  # type: ignore
+    parser.add_argument(
+        "--fs-snapshot",
+        action="store_true",
+        help="Answer local file checks from a snapshot of the searched directories",
+    )  # type: ignore
+    parser.add_argument(
+        "--io-threads",
+        metavar="N",
+        type=positive_int,
+        default=1,
+        help="Number of threads searching directories and checking local references (default: 1)",
+    )  # type: ignore
+    parser.add_argument(
+        "--git",
+        action="store_true",
+        help="Find files with git, skipping ignored ones, and check local references against them",
+    )  # type: ignore
+    parser.add_argument(
+        "--changed-since",
+        metavar="REF",
+        default=None,
+        help="Only check files changed since a git commit, and files linking to them",
+    )  # type: ignore
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse the results of unchanged files from the previous run, kept in .refcheck_cache",
+    )  # type: ignore
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and check changed files, and files linking to them, again",
+    )  # type: ignore
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep the files in memory and serve checks to refcheck-client on a local socket",
+    )  # type: ignore
+    parser.add_argument(
+        "--processes",
+        metavar="N",
+        type=positive_int,
+        default=1,
+        help="Number of processes parsing files and checking local references (default: 1)",
+    )  # type: ignore
+    return parser
+
+
+def get_default_arguments() -> Namespace:
+    """Return the arguments of a run without options or paths."""
+    return get_argument_parser().parse_args([])
+
+
+def get_command_line_arguments() -> Namespace:
+    """Parse the command line arguments, printing the help if no path is given."""
+    parser = get_argument_parser()
 
     # Check if the user has provided any files or directories
     args = parser.parse_args()
@@ -0,0 +1,34 @@
+import os
+import sys
+
+from refcheck.cli import get_command_line_arguments
+from refcheck.daemon import OPTIONS, get_socket_path, send_request
+
+
+def main() -> None:
+    """Check files with the daemon started by `refcheck --daemon`, or in this process without one.
+
+    The client takes the same arguments as `refcheck`. It only imports what it needs to talk to the
+    daemon, so it starts faster than `refcheck` itself.
+    """
+    args = get_command_line_arguments()
+    request = {
+        "cwd": os.getcwd(),
+        "paths": args.paths,
+        "options": {name: getattr(args, name) for name in OPTIONS},
+    }
+    response = send_request(get_socket_path(), request)
+    if response is not None and "output" in response:
+        sys.stdout.write(response["output"])
+        sys.exit(0 if response.get("ok") else 1)
+
+    if response is not None:
+        print(f"[!] {response.get('error')} Checking without the daemon.", file=sys.stderr)
+    # Imported only now, as loading the checker is part of what the daemon saves
+    from refcheck.main import main as check
+
+    sys.exit(0 if check() else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import os
+import json
+import socket
+import logging
+from typing import Any, Callable
+
+from refcheck.cache import CACHE_DIR
+
+logger = logging.getLogger()
+
+SOCKET_FILE = "daemon.sock"
+# Seconds the client waits for the answer of the daemon before checking in its own process, and
+# the daemon for the request of a client
+CLIENT_TIMEOUT = 300
+# Options that change the result of a check, which the client and the daemon must agree on
+OPTIONS = (
+    "exclude",
+    "check_remote",
+    "no_color",
+    "allow_absolute",
+    "html_links",
+    "html_images",
+    "raw_links",
+    "anchor_style",
+    "fs_snapshot",
+    "io_threads",
+    "git",
+    "changed_since",
+    "incremental",
+)
+
+Message = dict[str, Any]
+
+
+def get_socket_path(directory: str = CACHE_DIR) -> str:
+    """Return the path of the socket of the daemon serving the current directory."""
+    return os.path.join(directory, SOCKET_FILE)
+
+
+def _receive(connection: socket.socket) -> Message | None:
+    """Read a JSON message sent until the end of the stream, or return None if it is invalid."""
+    chunks = []
+    while chunk := connection.recv(65536):
+        chunks.append(chunk)
+    try:
+        message = json.loads(b"".join(chunks))
+    except ValueError:
+        return None
+    return message if isinstance(message, dict) else None
+
+
+def _send(connection: socket.socket, message: Message) -> None:
+    connection.sendall(json.dumps(message).encode())
+    connection.shutdown(socket.SHUT_WR)
+
+
+def send_request(socket_path: str, request: Message) -> Message | None:
+    """Send a request to the daemon and return its response, or None if no daemon answered."""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(CLIENT_TIMEOUT)
+            connection.connect(socket_path)
+            _send(connection, request)
+            return _receive(connection)
+    except OSError as e:
+        # No socket, a socket left by a daemon that was killed, or a daemon that did not answer
+        logger.info(f"Could not reach the daemon on {socket_path}: {e}")
+        return None
+
+
+def _answer(connection: socket.socket, handle: Callable[[Message], Message]) -> None:
+    try:
+        connection.settimeout(CLIENT_TIMEOUT)
+        request = _receive(connection)
+        if request is None:
+            response: Message = {"error": "The request is not a JSON object."}
+        else:
+            response = handle(request)
+        _send(connection, response)
+    except OSError as e:
+        logger.warning(f"Could not answer the client: {e}")
+
+
+def serve(socket_path: str, handle: Callable[[Message], Message]) -> None:
+    """Answer the requests sent to a Unix domain socket, one at a time, until interrupted.
+
+    Each connection carries one request and its response, both JSON objects sent until the end of
+    the stream. A socket left by a daemon that was killed is replaced, but a running daemon is not.
+    """
+    if os.path.exists(socket_path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(socket_path)
+            except OSError:
+                os.remove(socket_path)
+            else:
+                raise OSError(f"A daemon is already running on {socket_path}.")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(socket_path)
+        try:
+            server.listen()
+            while True:
+                connection, _ = server.accept()
+                with connection:
+                    _answer(connection, handle)
+        finally:
+            os.remove(socket_path)
@@ -0,0 +1,102 @@
+import os
+import logging
+import subprocess
+
+logger = logging.getLogger()
+
+GIT_TIMEOUT = 60
+
+
+def run_git(directory: str, *args: str) -> bytes | None:
+    """Run a git command in a directory and return its output, or None if it failed."""
+    try:
+        result = subprocess.run(
+            ["git", "-C", directory, *args],
+            capture_output=True,
+            check=True,
+            timeout=GIT_TIMEOUT,
+        )
+    except FileNotFoundError:
+        logger.warning("Could not find the git executable.")
+        return None
+    except subprocess.CalledProcessError as e:
+        logger.info(f"git {args[0]} failed in {directory}: {os.fsdecode(e.stderr).strip()}")
+        return None
+    except subprocess.TimeoutExpired:
+        logger.warning(f"git {args[0]} timed out in {directory}.")
+        return None
+    return result.stdout
+
+
+def get_repository_root(directory: str) -> str | None:
+    """Return the root of the git working tree containing a directory, or None if there is none.
+
+    The root is found relative to the directory, so its path goes through the same symbolic links
+    as the paths of the files in it.
+    """
+    output = run_git(directory, "rev-parse", "--show-cdup")
+    if output is None:
+        return None
+    return os.path.normpath(os.path.join(os.path.abspath(directory), os.fsdecode(output.strip())))
+
+
+def list_repository_files(root: str) -> list[str] | None:
+    """List the files of a working tree that git knows about, relative to its root.
+
+    These are the tracked files, except those deleted from the working tree, and the untracked
+    files that are not ignored by `.gitignore`. All of them are listed by a single `git ls-files`
+    call, which reads the index instead of walking the tree. Paths use `/` as separator.
+    """
+    # With -t, every file is tagged with its status: deleted tracked files are listed twice, once
+    # as cached and once as removed (R)
+    output = run_git(
+        root, "ls-files", "-z", "-t", "--cached", "--others", "--deleted", "--exclude-standard"
+    )
+    if output is None:
+        return None
+
+    files: dict[str, None] = {}
+    removed = set()
+    for entry in output.split(b"\0"):
+        if not entry:
+            continue
+        tag, path = entry[:1], os.fsdecode(entry[2:])
+        if tag == b"R":
+            removed.add(path)
+        else:
+            files[path] = None
+    return [path for path in files if path not in removed]
+
+
+def list_changed_files(root: str, since: str) -> tuple[list[str], list[str]] | None:
+    """List the files of a working tree changed since a commit, relative to its root.
+
+    Changes are taken from the merge base of `since` and `HEAD` to the working tree, so a branch is
+    compared with the point it was forked from, and include uncommitted and untracked files.
+    Renamed files count as deleted at their old path and added at their new one.
+
+    Returns the added or modified files, and the deleted files, or None if git failed, e.g. because
+    `since` is not a valid revision.
+    """
+    output = run_git(
+        root,
+        "diff",
+        "-z",
+        "--name-status",
+        "--no-renames",
+        "--merge-base",
+        "--end-of-options",
+        since,
+    )
+    untracked = run_git(root, "ls-files", "-z", "--others", "--exclude-standard")
+    if output is None or untracked is None:
+        return None
+
+    changed: list[str] = []
+    deleted: list[str] = []
+    # Entries are status and path, each terminated by a NUL character
+    fields = output.split(b"\0")
+    for status, path in zip(fields[0::2], fields[1::2]):
+        (deleted if status == b"D" else changed).append(os.fsdecode(path))
+    changed.extend(os.fsdecode(path) for path in untracked.split(b"\0") if path)
+    return changed, deleted
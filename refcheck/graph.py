@@ -0,0 +1,123 @@
+import os
+import logging
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from refcheck.git import get_repository_root, list_changed_files
+from refcheck.parsers import MARKDOWN_EXTENSIONS, TargetKind
+from refcheck.store import Document
+
+logger = logging.getLogger()
+
+# Targets that are files on the local file system
+FILE_TARGETS = frozenset({TargetKind.MARKDOWN, TargetKind.ASSET})
+
+
+@dataclass(slots=True)
+class ChangeSet:
+    """Files changed in a range of commits, by absolute path."""
+
+    changed: set[str] = field(default_factory=set)
+    deleted: set[str] = field(default_factory=set)
+
+
+class ReferenceGraph:
+    """Reverse index of the references between files, telling which files link to a given path.
+
+    Relative and backslash-prefixed references are indexed by the path they point to. Absolute
+    references, e.g. `/docs/guide.md`, are resolved by searching the directories above their file,
+    so they are indexed by their path instead and match every file whose path ends with it.
+    """
+
+    def __init__(self):
+        # Absolute target path -> files linking to it
+        self._referrers: dict[str, set[str]] = {}
+        # Path of absolute references without the leading slash -> files linking to it
+        self._absolute_referrers: dict[str, set[str]] = {}
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Document | None]) -> "ReferenceGraph":
+        """Index the references of documents, skipping files that could not be read."""
+        graph = cls()
+        for document in documents:
+            if document is not None:
+                graph.add_document(document)
+        return graph
+
+    def add_document(self, document: Document) -> None:
+        """Index the references to local files made in a document."""
+        directory = os.path.dirname(os.path.abspath(document.path))
+        for ref in document.references:
+            if ref.target not in FILE_TARGETS or not ref.path:
+                continue
+            if ref.path.startswith("/"):
+                key = ref.path.lstrip("/").replace("\\", "/")
+                self._absolute_referrers.setdefault(key, set()).add(document.path)
+                continue
+            if ref.path.startswith("\\"):
+                # Resolved relative to the current directory, see resolve_backslash_reference
+                target = os.path.abspath(ref.path[1:])
+            else:
+                target = os.path.normpath(os.path.join(directory, ref.path))
+            self._referrers.setdefault(target, set()).add(document.path)
+
+    def get_referrers(self, path: str) -> set[str]:
+        """Return the files that link to a path, relative or absolute, of a file or directory."""
+        abs_path = os.path.abspath(path)
+        referrers = set(self._referrers.get(abs_path, ()))
+        if self._absolute_referrers:
+            # Any trailing part of the path may be what an absolute reference is relative to
+            parts = abs_path.replace(os.sep, "/").split("/")
+            for i in range(1, len(parts)):
+                referrers.update(self._absolute_referrers.get("/".join(parts[i:]), ()))
+        return referrers
+
+
+def get_changes_since(paths: list[str], since: str) -> ChangeSet | None:
+    """Return the files changed since a commit in the git repositories of the checked paths.
+
+    Returns None if a path is not in a git repository, or `since` is not a commit in it.
+    """
+    changes = ChangeSet()
+    repositories = set()
+    for path in paths:
+        directory = path if os.path.isdir(path) else os.path.dirname(path) or os.curdir
+        root = get_repository_root(directory)
+        if root is None:
+            logger.error(f"{path} is not in a git repository.")
+            return None
+        if root in repositories:
+            continue
+        repositories.add(root)
+
+        listed = list_changed_files(root, since)
+        if listed is None:
+            logger.error(f"Could not list the files changed since '{since}' in {root}.")
+            return None
+        changed, deleted = listed
+        changes.changed.update(os.path.join(root, *path.split("/")) for path in changed)
+        changes.deleted.update(os.path.join(root, *path.split("/")) for path in deleted)
+    return changes
+
+
+def select_affected_files(
+    markdown_files: list[str], graph: ReferenceGraph, changes: ChangeSet
+) -> list[str]:
+    """Return the Markdown files that changed, or that link to a file a change could break.
+
+    Links break when their target is deleted, or renamed, which is a deletion of the old path, and
+    their fragments break when the headers of a changed Markdown file change. Links to directories
+    that only held deleted files are found from the parent directories of deleted files. Added or
+    modified assets cannot break links, so files linking to them are not selected.
+    """
+    targets = set(changes.deleted)
+    targets.update(
+        path for path in changes.changed if os.path.splitext(path)[1].lower() in MARKDOWN_EXTENSIONS
+    )
+    for path in changes.deleted:
+        targets.add(os.path.dirname(path))
+
+    affected = set(changes.changed)
+    for target in targets:
+        affected.update(os.path.abspath(path) for path in graph.get_referrers(target))
+    return [file for file in markdown_files if os.path.abspath(file) in affected]
@@ -0,0 +1,254 @@
+import os
+import re
+import logging
+import posixpath
+from dataclasses import dataclass
+from re import Pattern
+from typing import Iterable
+
+logger = logging.getLogger()
+
+IGNORE_FILE = ".refcheckignore"
+
+
+@dataclass(slots=True, frozen=True)
+class IgnoreRule:
+    """A parsed line of an ignore file, with the gitignore semantics of its pattern.
+
+    Attributes:
+        pattern: The pattern as written, without negation and trailing slash.
+        regex: Regular expression source matching the paths the pattern applies to, relative to the
+            directory of the ignore file and with `/` as separator.
+        negated: Whether the pattern starts with `!`, re-including paths excluded by earlier rules.
+        directory_only: Whether the pattern ends with `/` and only matches directories.
+    """
+
+    pattern: str
+    regex: str
+    negated: bool
+    directory_only: bool
+
+
+def _strip_trailing_spaces(line: str) -> str:
+    """Remove trailing spaces, except those escaped with a backslash."""
+    stripped = line.rstrip(" ")
+    if stripped.endswith("\\") and len(stripped) < len(line):
+        stripped += " "
+    return stripped
+
+
+def translate_pattern(pattern: str) -> str:
+    """Translate a gitignore glob into a regular expression source for relative paths.
+
+    `*` and `?` do not match `/`, `[...]` is a character class, a leading `**/` matches in all
+    directories, a trailing `/**` everything inside, and `/**/` zero or more directories. A
+    backslash escapes the next character. Patterns without a slash, except a trailing one, match
+    at any depth, all others are anchored to the directory of the ignore file.
+    """
+    anchored = "/" in pattern
+    pattern = pattern.removeprefix("/")
+    parts = ["" if anchored else "(?:.*/)?"]
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        at_segment_start = i == 0 or pattern[i - 1] == "/"
+        if at_segment_start and pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif at_segment_start and pattern.startswith("**", i) and i + 2 == n:
+            parts.append(".*")
+            i += 2
+        elif char == "*":
+            # Other consecutive asterisks are regular asterisks
+            while i < n and pattern[i] == "*":
+                i += 1
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+            i += 1
+        elif char == "[":
+            start = i + 1
+            negated = pattern[start : start + 1] in ("!", "^")
+            if negated:
+                start += 1
+            # A `]` right after the opening bracket is part of the class
+            end = pattern.find("]", start + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+                i += 1
+                continue
+            content = pattern[start:end].replace("\\", "\\\\").replace("[", "\\[")
+            content = content.replace("]", "\\]")
+            parts.append(f"[^/{content}]" if negated else f"[{content}]")
+            i = end + 1
+        elif char == "\\" and i + 1 < n:
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(char))
+            i += 1
+    return "".join(parts)
+
+
+def parse_ignore_line(line: str) -> IgnoreRule | None:
+    """Parse a line of an ignore file, returning None for blank lines and comments.
+
+    Like git, an invalid pattern, e.g. the character class of `[z-a]`, is skipped with a warning.
+    """
+    line = _strip_trailing_spaces(line.strip("\r\n\t").lstrip(" "))
+    if not line or line.startswith("#"):
+        return None
+
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    elif line.startswith(("\\!", "\\#")):
+        line = line[1:]
+
+    directory_only = line.endswith("/") and not line.endswith("\\/")
+    pattern = line.rstrip("/") if directory_only else line
+    if not pattern:
+        return None
+    regex = translate_pattern(pattern)
+    try:
+        re.compile(regex)
+    except re.error as e:
+        logger.warning(f"Skipping invalid exclusion pattern '{line}': {e}")
+        return None
+    return IgnoreRule(pattern, regex, negated, directory_only)
+
+
+class IgnoreRules:
+    """The rules of one ignore file, applying to the paths below its directory.
+
+    All rules are compiled into one regular expression, so a path is matched in a single call
+    however many rules there are. The last rule matching a path decides, so the alternatives are
+    ordered from the last rule to the first, and each one is a group that tells which rule matched.
+    """
+
+    def __init__(self, base_dir: str, rules: Iterable[IgnoreRule]):
+        self.base_dir = os.path.abspath(base_dir)
+        self._prefix = os.path.join(self.base_dir, "")
+        self.rules = list(rules)
+        self._dir_pattern, self._dir_negated = self._compile(self.rules)
+        self._file_pattern, self._file_negated = self._compile(
+            [rule for rule in self.rules if not rule.directory_only]
+        )
+
+    @classmethod
+    def from_lines(cls, base_dir: str, lines: Iterable[str]) -> "IgnoreRules":
+        """Parse the lines of an ignore file in `base_dir`."""
+        return cls(base_dir, filter(None, map(parse_ignore_line, lines)))
+
+    @staticmethod
+    def _compile(rules: list[IgnoreRule]) -> tuple[Pattern[str] | None, list[bool]]:
+        if not rules:
+            return None, []
+        ordered = rules[::-1]
+        pattern = re.compile("|".join(f"({rule.regex})" for rule in ordered), re.DOTALL)
+        # Group numbers start at 1
+        return pattern, [False] + [rule.negated for rule in ordered]
+
+    def match(self, abs_path: str, is_dir: bool) -> bool | None:
+        """Return whether the rules exclude an absolute path, or None if no rule matches it."""
+        if not abs_path.startswith(self._prefix):
+            return None
+        relative_path = abs_path[len(self._prefix) :]
+        if os.sep != "/":
+            relative_path = relative_path.replace(os.sep, "/")
+
+        if is_dir:
+            pattern, negated = self._dir_pattern, self._dir_negated
+        else:
+            pattern, negated = self._file_pattern, self._file_negated
+        match = pattern.fullmatch(relative_path) if pattern else None
+        if match is None:
+            return None
+        return not negated[match.lastindex or 0]
+
+
+class IgnoreMatcher:
+    """Decides which files and directories are excluded, from the rules of nested directories.
+
+    Rules of deeper directories take precedence over the rules of their parents, as in git. Paths
+    are matched one at a time: once a directory is excluded, the walk does not enter it, so nothing
+    below it can be included again.
+    """
+
+    def __init__(self, rule_sets: tuple[IgnoreRules, ...] = ()):
+        self.rule_sets = rule_sets
+
+    @classmethod
+    def from_patterns(cls, patterns: Iterable[str], base_dir: str | None = None) -> "IgnoreMatcher":
+        """Build a matcher from exclusions given on the command line or read from the ignore file.
+
+        Relative patterns apply below `base_dir`, the current directory by default. Absolute paths,
+        and relative ones that lead out of `base_dir` like `../docs`, exclude exactly that file or
+        directory.
+        """
+        base_dir = base_dir or os.getcwd()
+        relative: list[str] = []
+        absolute: dict[str, list[str]] = {}
+        for pattern in patterns:
+            if os.sep != "/":
+                pattern = pattern.replace(os.sep, "/")
+            if not os.path.isabs(pattern):
+                pattern = _normalize_pattern(pattern)
+                if pattern.lstrip("/").split("/")[0] != "..":
+                    relative.append(pattern)
+                    continue
+                # Rules only apply below their directory, so it is anchored to an absolute path
+                pattern = os.path.join(base_dir, pattern.lstrip("/"))
+            path = os.path.abspath(pattern)
+            root = os.path.join(os.path.splitdrive(path)[0], os.sep)
+            anchored = os.path.relpath(path, root).replace(os.sep, "/")
+            absolute.setdefault(root, []).append("/" + glob_escape(anchored))
+
+        rule_sets = [IgnoreRules.from_lines(root, lines) for root, lines in absolute.items()]
+        rule_sets.append(IgnoreRules.from_lines(base_dir, relative))
+        return cls(tuple(rule_sets))
+
+    def with_ignore_file(self, directory: str) -> "IgnoreMatcher":
+        """Return a matcher that also applies the ignore file of a directory."""
+        file_path = os.path.join(directory, IGNORE_FILE)
+        try:
+            with open(file_path, "r", encoding="utf-8") as file:
+                rules = IgnoreRules.from_lines(directory, file)
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Could not read {file_path}: {e}")
+            return self
+        logger.info(f"Read {len(rules.rules)} exclusions from {file_path}.")
+        return IgnoreMatcher(self.rule_sets + (rules,))
+
+    def is_ignored(self, path: str, is_dir: bool) -> bool:
+        """Check if a file or directory is excluded."""
+        abs_path = os.path.abspath(path)
+        for rules in reversed(self.rule_sets):
+            excluded = rules.match(abs_path, is_dir)
+            if excluded is not None:
+                return excluded
+        return False
+
+
+def _normalize_pattern(pattern: str) -> str:
+    """Resolve the `.` and `..` segments of a relative exclusion, e.g. `./docs` to `/docs`.
+
+    Such patterns name a path relative to the current directory, so the result stays anchored even
+    if no slash is left. Other patterns, including their glob characters, are kept as given.
+    """
+    negation = "!" if pattern.startswith("!") else ""
+    body = pattern[len(negation) :]
+    if not any(segment in (".", "..") for segment in body.split("/")):
+        return pattern
+    normalized = posixpath.normpath(body)
+    if normalized == ".":
+        return pattern
+    if "/" not in normalized:
+        normalized = "/" + normalized
+    trailing = "/" if body.endswith("/") else ""
+    return negation + normalized + trailing
+
+
+def glob_escape(path: str) -> str:
+    """Escape the characters of a path that have a special meaning in ignore patterns."""
+    return re.sub(r"([*?\[\\!#])", r"\\\1", path)
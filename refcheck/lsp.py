@@ -0,0 +1,334 @@
+import os
+import sys
+import json
+import logging
+import argparse
+from argparse import Namespace
+from typing import Any, BinaryIO, Callable
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from refcheck.settings import settings
+from refcheck.cli import get_default_arguments
+from refcheck.log_conf import setup_logging
+from refcheck.anchors import AnchorStyle
+from refcheck.parsers import MarkdownParser, ReferenceKind
+from refcheck.store import Document, document_store
+from refcheck.validators import clear_resolution_caches, validate_local_reference
+from refcheck.main import REMOTE_TARGETS, get_reference_kinds
+
+logger = logging.getLogger()
+
+Message = dict[str, Any]
+
+# JSON-RPC error codes
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+# LSP constants
+TEXT_DOCUMENT_SYNC_FULL = 1
+SEVERITY_ERROR = 1
+
+# Options the client can pass in `initializationOptions`, and the settings they set
+INITIALIZATION_OPTIONS = {
+    "allowAbsolute": "allow_absolute",
+    "anchorStyle": "anchor_style",
+    "htmlLinks": "html_links",
+    "htmlImages": "html_images",
+}
+
+
+def uri_to_path(uri: str) -> str:
+    """Return the local path of a `file:` URI."""
+    return url2pathname(urlparse(uri).path)
+
+
+def utf16_length(text: str) -> int:
+    """Return the length of a text in UTF-16 code units, the unit of LSP character offsets."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def get_range(lines: list[str], line_number: int, syntax: str, column: int) -> Message:
+    """Return the LSP range of a reference, or of its whole line if it spans several lines.
+
+    The column is the byte offset of the reference in its line, as recorded by the parser.
+    """
+    line_index = line_number - 1
+    line = lines[line_index] if 0 <= line_index < len(lines) else ""
+    encoded = line.encode("utf-8")
+    if "\n" in syntax or not encoded.startswith(syntax.encode("utf-8"), column):
+        start, end = 0, utf16_length(line)
+    else:
+        start = utf16_length(encoded[:column].decode("utf-8"))
+        end = start + utf16_length(syntax)
+    return {
+        "start": {"line": line_index, "character": start},
+        "end": {"line": line_index, "character": end},
+    }
+
+
+def get_diagnostics(document: Document, text: str) -> list[Message]:
+    """Validate the local references of a document, returning a diagnostic for each broken one.
+
+    Remote references are not requested, so that diagnostics only depend on local files.
+    """
+    lines = text.split("\n")
+    diagnostics = []
+    for ref in document.references:
+        if ref.kind is ReferenceKind.REFERENCE_LINK:
+            message = f"Label '{ref.link}' is not defined."
+        elif ref.target in REMOTE_TARGETS or validate_local_reference(ref):
+            continue
+        else:
+            message = f"Broken reference: '{ref.link}' was not found."
+        diagnostics.append(
+            {
+                "range": get_range(lines, ref.line_number, ref.syntax, ref.column),
+                "severity": SEVERITY_ERROR,
+                "source": "refcheck",
+                "message": message,
+            }
+        )
+    return diagnostics
+
+
+class LanguageServer:
+    """Publishes broken references of the open Markdown documents as LSP diagnostics.
+
+    Open documents are analyzed from the text of the editor and put into the document store in
+    place of their file, so references to their headers see unsaved changes. Each change only
+    parses the changed document again: the files of the workspace are loaded into the store the
+    first time a reference points to them, and stay there until the client reports that they
+    changed on disk. When the anchors of a document change, the other open documents are
+    validated again, as they may link to them.
+    """
+
+    def __init__(self, reader: BinaryIO, writer: BinaryIO):
+        self._reader = reader
+        self._writer = writer
+        # URI -> text of the open documents
+        self._texts: dict[str, str] = {}
+        self._anchors: dict[str, frozenset[str]] = {}
+        self._register_watched_files = False
+        self._shutdown = False
+        self._exit = False
+
+    def run(self) -> int:
+        """Answer messages until the client exits, returning the exit code it expects."""
+        while not self._exit:
+            message = self._read_message()
+            if message is None:
+                break
+            self._dispatch(message)
+        return 0 if self._shutdown else 1
+
+    def _read_message(self) -> Message | None:
+        """Read a message with its `Content-Length` header, or return None at the end of input."""
+        length = None
+        while True:
+            line = self._reader.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.decode("ascii").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        if length is None:
+            return None
+        try:
+            message = json.loads(self._reader.read(length))
+        except ValueError as e:
+            logger.warning(f"Ignoring a message that is not valid JSON: {e}")
+            return {}
+        return message if isinstance(message, dict) else {}
+
+    def _send(self, message: Message) -> None:
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode("utf-8")
+        self._writer.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+        self._writer.flush()
+
+    def _dispatch(self, message: Message) -> None:
+        method = message.get("method")
+        if method is None:
+            return  # Response to a request of the server
+        handler = self.HANDLERS.get(method)
+        params = message.get("params") or {}
+        if "id" not in message:
+            # Notifications get no response, not even for errors
+            if handler is not None:
+                try:
+                    handler(self, params)
+                except Exception:
+                    logger.exception(f"Could not handle {method}.")
+            return
+
+        if handler is None:
+            error = {"code": METHOD_NOT_FOUND, "message": f"Unknown method: {method}"}
+            self._send({"id": message["id"], "error": error})
+            return
+        try:
+            result = handler(self, params)
+        except Exception as e:
+            logger.exception(f"Could not handle {method}.")
+            self._send({"id": message["id"], "error": {"code": INTERNAL_ERROR, "message": str(e)}})
+        else:
+            self._send({"id": message["id"], "result": result})
+
+    def initialize(self, params: Message) -> Message:
+        """Configure the checks from the options of the client, and announce the capabilities."""
+        folders = params.get("workspaceFolders") or []
+        root_uri = folders[0]["uri"] if folders else params.get("rootUri")
+        if root_uri:
+            # Backslash-prefixed references are relative to the current directory
+            os.chdir(uri_to_path(root_uri))
+
+        options = params.get("initializationOptions") or {}
+        arguments = vars(get_default_arguments())
+        arguments.update(
+            {
+                setting: options[option]
+                for option, setting in INITIALIZATION_OPTIONS.items()
+                if option in options
+            }
+        )
+        settings.configure(Namespace(**arguments))
+        document_store.reset(
+            MarkdownParser(get_reference_kinds()), AnchorStyle(settings.anchor_style)
+        )
+        clear_resolution_caches()
+
+        capabilities = params.get("capabilities") or {}
+        watched_files = capabilities.get("workspace", {}).get("didChangeWatchedFiles", {})
+        self._register_watched_files = bool(watched_files.get("dynamicRegistration"))
+        return {
+            "capabilities": {
+                "textDocumentSync": {"openClose": True, "change": TEXT_DOCUMENT_SYNC_FULL}
+            },
+            "serverInfo": {"name": "refcheck"},
+        }
+
+    def initialized(self, params: Message) -> None:
+        """Ask the client to report changes to the files of the workspace, if it can."""
+        if not self._register_watched_files:
+            return
+        registration = {
+            "id": "refcheck-watched-files",
+            "method": "workspace/didChangeWatchedFiles",
+            "registerOptions": {"watchers": [{"globPattern": "**/*"}]},
+        }
+        self._send(
+            {
+                "id": "register-watched-files",
+                "method": "client/registerCapability",
+                "params": {"registrations": [registration]},
+            }
+        )
+
+    def shutdown(self, params: Message) -> None:
+        self._shutdown = True
+
+    def exit(self, params: Message) -> None:
+        self._exit = True
+
+    def did_open(self, params: Message) -> None:
+        document = params["textDocument"]
+        self._update(document["uri"], document["text"])
+
+    def did_change(self, params: Message) -> None:
+        # With full synchronization, the last change has the whole text
+        self._update(params["textDocument"]["uri"], params["contentChanges"][-1]["text"])
+
+    def did_close(self, params: Message) -> None:
+        uri = params["textDocument"]["uri"]
+        self._texts.pop(uri, None)
+        anchors = self._anchors.pop(uri, None)
+        self._publish(uri, [])
+
+        # The file on disk replaces the text of the editor, which may not have been saved
+        path = uri_to_path(uri)
+        document_store.forget([path])
+        document = document_store.get(path)
+        if anchors != (document.anchors if document else None):
+            self._validate_others(uri)
+
+    def did_change_watched_files(self, params: Message) -> None:
+        paths = [
+            uri_to_path(change["uri"])
+            for change in params.get("changes", [])
+            if change["uri"] not in self._texts
+        ]
+        document_store.forget(paths)
+        clear_resolution_caches()
+        for uri in self._texts:
+            self._validate(uri)
+
+    def _update(self, uri: str, text: str) -> None:
+        """Analyze the new text of a document and publish its diagnostics."""
+        path = uri_to_path(uri)
+        if uri in self._anchors:
+            anchors: frozenset[str] | None = self._anchors[uri]
+        else:
+            # Opened: other documents were validated against the file on disk
+            saved = document_store.get(path)
+            anchors = saved.anchors if saved else None
+
+        self._texts[uri] = text
+        document = document_store.put(path, text.encode("utf-8"))
+        self._anchors[uri] = document.anchors
+        self._publish(uri, get_diagnostics(document, text))
+        if anchors != document.anchors:
+            self._validate_others(uri)
+
+    def _validate_others(self, uri: str) -> None:
+        """Validate the open documents other than one whose anchors changed."""
+        for other_uri in self._texts:
+            if other_uri != uri:
+                self._validate(other_uri)
+
+    def _validate(self, uri: str) -> None:
+        document = document_store.get(uri_to_path(uri))
+        if document is not None:
+            self._publish(uri, get_diagnostics(document, self._texts[uri]))
+
+    def _publish(self, uri: str, diagnostics: list[Message]) -> None:
+        self._send(
+            {
+                "method": "textDocument/publishDiagnostics",
+                "params": {"uri": uri, "diagnostics": diagnostics},
+            }
+        )
+
+    # Handlers of requests and notifications, by method
+    HANDLERS: dict[str, Callable[["LanguageServer", Message], Any]] = {
+        "initialize": initialize,
+        "initialized": initialized,
+        "shutdown": shutdown,
+        "exit": exit,
+        "textDocument/didOpen": did_open,
+        "textDocument/didChange": did_change,
+        "textDocument/didClose": did_close,
+        "workspace/didChangeWatchedFiles": did_change_watched_files,
+    }
+
+
+def main() -> None:
+    """Serve the Language Server Protocol on the standard input and output."""
+    parser = argparse.ArgumentParser(
+        prog="refcheck-lsp", description="Language server publishing broken Markdown references"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose output")
+    # Passed by some clients to select the transport, which is always stdio
+    parser.add_argument("--stdio", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    setup_logging(verbose=args.verbose)
+    # Messages go to the original standard output, anything printed by the checks to stderr
+    writer = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    sys.exit(LanguageServer(sys.stdin.buffer, writer).run())
+
+
+if __name__ == "__main__":
+    main()
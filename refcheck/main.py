@@ -1,15 +1,43 @@
+import os
 import sys
+import io
+import sqlite3
 import requests
 import logging
-from typing import List
+from argparse import Namespace
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, List
 from dataclasses import dataclass
 
 from refcheck.settings import settings
 from refcheck.log_conf import setup_logging
-from refcheck.parsers import MarkdownParser, Reference
-from refcheck.validators import file_exists, is_valid_markdown_reference
+from refcheck.anchors import AnchorStyle
+from refcheck.cache import IndexCache, create_cache_directory, get_fingerprint
+from refcheck.parsers import (
+    DEFAULT_KINDS,
+    MarkdownParser,
+    ParseStats,
+    Reference,
+    ReferenceKind,
+    TargetKind,
+)
+from refcheck.store import Document, document_store
+from refcheck.graph import ReferenceGraph, get_changes_since, select_affected_files
+from refcheck.validators import (
+    clear_resolution_caches,
+    get_target_key,
+    validate_local_reference,
+    validate_references,
+)
+from refcheck.daemon import OPTIONS, Message, get_socket_path, serve
+from refcheck.watch import Watcher, create_watcher, select_rechecked_files
 from refcheck.utils import (
+    PathIndex,
+    path_index,
+    get_directories_from_args,
     get_markdown_files_from_args,
+    iter_markdown_files_from_args,
     print_red,
     print_green,
     print_yellow,
@@ -18,58 +46,204 @@ from refcheck.utils import (
 logger = logging.getLogger()
 
 
-@dataclass
-class BrokenReference(Reference):
+BROKEN = "BROKEN"
+# Targets that are not on the local file system
+REMOTE_TARGETS = frozenset({TargetKind.REMOTE, TargetKind.OTHER_SCHEME})
+# Shards of files per process, so that processes finishing early take over the remaining shards
+SHARDS_PER_PROCESS = 4
+
+
+@dataclass(slots=True, frozen=True)
+class BrokenReference:
+    """A reference that failed validation, stored along with its status code."""
+
+    reference: Reference
     status: str
 
 
 class ReferenceChecker:
-    def __init__(self):
+    def __init__(self, io_threads: int = 1, cache: IndexCache | None = None, processes: int = 1):
+        self.io_threads = io_threads
+        self.processes = processes
+        self.cache = cache
         self.broken_references: List[BrokenReference] = []
+        # Results of local references by (target path, fragment), shared by all their occurrences
+        self.local_results: dict[tuple[str, str], bool] = {}
+        # Results of remote references by URL, which do not depend on the local files
+        self.remote_results: dict[str, bool] = {}
 
-    def check_references(self, references: list[Reference]):
+    def check_references(self, references: Iterable[Reference]):
         for ref in references:
-            logger.info(ref)
-
-            if ref.is_remote and not settings.check_remote:
-                logger.info("Skipping remote reference check.")
-                status = print_yellow("SKIPPED")
-            elif ref.is_remote and settings.check_remote:
-                # Check if remote reference is reachable
-                try:
-                    response = requests.head(ref.link, timeout=5, verify=False)
-                    if response.status_code < 400:
-                        status = print_green("OK")
-                    else:
-                        logger.info(
-                            f"Status code: {response.status_code}, Reason: {response.reason}"
-                        )
-                        status = print_red("BROKEN")
-                        self.broken_references.append(
-                            BrokenReference(**ref.__dict__, status=status)
-                        )
-                except requests.exceptions.RequestException as e:
-                    logger.error(f"Error: Could not reach remote reference '{ref.link}': {e}")
-                    status = print_red("BROKEN")
-                    self.broken_references.append(BrokenReference(**ref.__dict__, status=status))
-            else:
-                if ".md" in ref.link or "#" in ref.link:
-                    if is_valid_markdown_reference(ref):
-                        status = print_green("OK")
-                    else:
-                        status = print_red("BROKEN")
-                        self.broken_references.append(
-                            BrokenReference(**ref.__dict__, status=status)
-                        )
-                else:
-                    if file_exists(ref.file_path, ref.link):
-                        status = print_green("OK")
-                    else:
-                        status = print_red("BROKEN")
-                        self.broken_references.append(
-                            BrokenReference(**ref.__dict__, status=status)
+            self.check_reference(ref)
+
+    def check_reference(self, ref: Reference):
+        logger.info(ref)
+
+        if ref.kind is ReferenceKind.REFERENCE_LINK:
+            # The parser only yields reference-style links whose label has no definition
+            logger.error(f"Label '{ref.link}' is not defined in '{ref.file_path}'.")
+            is_valid: bool | None = False
+        else:
+            is_valid = self.TARGET_CHECKS[ref.target](self, ref)
+
+        if is_valid is None:
+            status = print_yellow("SKIPPED")
+        elif is_valid:
+            status = print_green("OK")
+        else:
+            status = print_red(BROKEN)
+            self.broken_references.append(BrokenReference(ref, BROKEN))
+        print(f"{ref.file_path}:{ref.line_number}: {ref.syntax} - {status}")
+
+    def check_remote_reference(self, ref: Reference) -> bool | None:
+        """Check if a remote reference is reachable, or return None if remote checks are off."""
+        if not settings.check_remote:
+            logger.info("Skipping remote reference check.")
+            return None
+        if ref.link in self.remote_results:
+            logger.info(f"Remote reference already checked: {ref.link}")
+            return self.remote_results[ref.link]
+        self.remote_results[ref.link] = self._is_reachable(ref.link)
+        return self.remote_results[ref.link]
+
+    def _is_reachable(self, link: str) -> bool:
+        """Send a HEAD request to a URL and check that it does not fail."""
+        try:
+            response = requests.head(link, timeout=5, verify=False)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error: Could not reach remote reference '{link}': {e}")
+            return False
+        if response.status_code >= 400:
+            logger.info(f"Status code: {response.status_code}, Reason: {response.reason}")
+            return False
+        return True
+
+    def skip_reference(self, ref: Reference) -> None:
+        """Skip a reference that cannot be checked, e.g. a `mailto:` link."""
+        logger.info(f"Skipping reference with a scheme that cannot be checked: {ref.link}")
+
+    def validate_local_targets(self, references: Iterable[Reference]) -> None:
+        """Validate the local targets of the references ahead of time on a pool of threads.
+
+        Targets are grouped by file, and each file is validated by one thread, so that it is read
+        once and the checks of different files overlap. The results are only recorded, so the
+        references are reported in order by `check_references` afterwards. References that are
+        not resolved relative to their file, e.g. absolute ones, are left to it, too.
+        """
+        targets: dict[str, dict[tuple[str, str], Reference]] = {}
+        for ref in references:
+            if ref.target in REMOTE_TARGETS or ref.kind is ReferenceKind.REFERENCE_LINK:
+                continue
+            key = get_target_key(ref)
+            if key is None or key in self.local_results or self._load_result(key) is not None:
+                continue
+            targets.setdefault(key[0], {}).setdefault(key, ref)
+
+        logger.info(f"Validating {len(targets)} target files on {self.io_threads} threads.")
+        with ThreadPoolExecutor(max_workers=self.io_threads) as executor:
+            for results in executor.map(self._validate_target_file, targets.values()):
+                for key, is_valid in results.items():
+                    self._record_result(key, is_valid)
+
+    def _validate_target_file(
+        self, references: dict[tuple[str, str], Reference]
+    ) -> dict[tuple[str, str], bool]:
+        """Validate one reference to each (path, fragment) target of the same file."""
+        return dict(zip(references, validate_references(references.values())))
+
+    def validate_in_processes(self, markdown_files: list[str]) -> None:
+        """Parse the files and validate their local targets ahead of time on a pool of processes.
+
+        The sorted files are split into contiguous shards, so files of the same directory, which
+        tend to link to each other, go to the same process. The documents are added to the
+        document store and the results recorded, so the references are reported in order by
+        `check_references` afterwards, as with `validate_local_targets`. It validates the
+        fragments the processes left, from the anchors of the documents they sent.
+        """
+        files = sorted(markdown_files)
+        size = max(1, -(-len(files) // (self.processes * SHARDS_PER_PROCESS)))
+        shards = [files[i : i + size] for i in range(0, len(files), size)]
+        logger.info(f"Checking {len(shards)} shards of files on {self.processes} processes.")
+
+        initargs = (
+            settings.to_arguments(),
+            document_store.parser,
+            document_store.anchor_style,
+            path_index,
+        )
+        with ProcessPoolExecutor(
+            max_workers=self.processes, initializer=_init_process, initargs=initargs
+        ) as executor:
+            for result in executor.map(_check_shard, shards):
+                for path, rows, anchors in result.documents:
+                    path = sys.intern(path)
+                    references = tuple(
+                        Reference(
+                            path,
+                            line_number,
+                            syntax,
+                            link,
+                            kind=ReferenceKind(kind),
+                            column=column,
                         )
-            print(f"{ref.file_path}:{ref.line_number}: {ref.syntax} - {status}")
+                        for line_number, column, syntax, link, kind in rows
+                    )
+                    document_store.add(Document(path, references, frozenset(anchors)))
+                document_store.parser.stats.merge(result.stats)
+                for target_path, fragment, is_valid in result.verdicts:
+                    self._record_result((target_path, fragment), is_valid)
+
+    def is_valid_local_reference(self, ref: Reference) -> bool:
+        """Validate a local reference, once per run for each target it resolves to."""
+        key = get_target_key(ref)
+        if key is not None and key in self.local_results:
+            logger.info(f"Target already checked: {key[0]}#{key[1]}")
+            return self.local_results[key]
+        if key is not None:
+            cached = self._load_result(key)
+            if cached is not None:
+                logger.info(f"Target unchanged since the last run: {key[0]}#{key[1]}")
+                return cached
+
+        is_valid = validate_local_reference(ref)
+        if key is not None:
+            self._record_result(key, is_valid)
+        return is_valid
+
+    def _load_result(self, key: tuple[str, str]) -> bool | None:
+        """Reuse the result of a previous run for a target that did not change, if there is one."""
+        if self.cache is None:
+            return None
+        is_valid = self.cache.load_verdict(key)
+        if is_valid is not None:
+            self.local_results[key] = is_valid
+        return is_valid
+
+    def _record_result(self, key: tuple[str, str], is_valid: bool) -> None:
+        self.local_results[key] = is_valid
+        if self.cache is not None:
+            self.cache.store_verdict(key, is_valid)
+
+    # How references are checked, by the kind of their target. Checks return None if skipped.
+    TARGET_CHECKS: dict[TargetKind, Callable[["ReferenceChecker", Reference], bool | None]] = {
+        TargetKind.SAME_FILE_ANCHOR: is_valid_local_reference,
+        TargetKind.MARKDOWN: is_valid_local_reference,
+        TargetKind.ASSET: is_valid_local_reference,
+        TargetKind.REMOTE: check_remote_reference,
+        TargetKind.OTHER_SCHEME: skip_reference,
+    }
+
+    def forget_files(self, files: Iterable[str]) -> None:
+        """Drop the broken references of files, and all local results, before checking them again.
+
+        Local results depend on the files on disk, so they are dropped when any file changes.
+        Remote results are kept.
+        """
+        files = set(files)
+        self.broken_references = [
+            broken for broken in self.broken_references if broken.reference.file_path not in files
+        ]
+        self.local_results.clear()
 
     def print_summary(self):
         print("\nReference check complete.")
@@ -78,11 +252,13 @@ class ReferenceChecker:
         if self.broken_references:
             print(print_red(f"[!] {len(self.broken_references)} broken references found:"))
             self.broken_references = sorted(
-                self.broken_references, key=lambda ref: (ref.file_path, ref.line_number)
+                self.broken_references,
+                key=lambda broken: (broken.reference.file_path, broken.reference.line_number),
             )
 
             for broken_ref in self.broken_references:
-                print(f"{broken_ref.file_path}:{broken_ref.line_number}: {broken_ref.syntax}")
+                ref = broken_ref.reference
+                print(f"{ref.file_path}:{ref.line_number}: {ref.syntax}")
         else:
             if settings.no_color:
                 print("No broken references!")
@@ -92,6 +268,95 @@ class ReferenceChecker:
         print("====================================================================")
 
 
+# A document as sent between processes: its path, its references without their file path, as
+# (line number, column, syntax, link, kind), and its anchors
+DocumentRow = tuple[str, list[tuple[int, int, str, str, str]], list[str]]
+
+
+@dataclass(slots=True)
+class ShardResult:
+    """What a process of `validate_in_processes` found in a shard of files.
+
+    Documents are sent as plain tuples, which are smaller and faster to pickle than references.
+
+    Attributes:
+        documents: The document of each readable file of the shard.
+        verdicts: The (target path, fragment, is valid) of each local target of their references.
+        stats: Statistics of the parser on the shard.
+    """
+
+    documents: list[DocumentRow]
+    verdicts: list[tuple[str, str, bool]]
+    stats: ParseStats
+
+
+def _init_process(
+    arguments: Namespace, parser: MarkdownParser, anchor_style: AnchorStyle, index: PathIndex
+) -> None:
+    """Configure a process of the pool like the main process.
+
+    Processes that are not forked, as on Windows and macOS, start without the snapshot of the files
+    taken with `--git` or `--fs-snapshot`, so it is sent along.
+    """
+    settings.configure(arguments)
+    document_store.reset(parser, anchor_style)
+    path_index.load(index)
+    clear_resolution_caches()
+
+
+def _check_shard(markdown_files: list[str]) -> ShardResult:
+    """Parse a shard of files and validate the local targets of their references, once each.
+
+    Fragments of files outside the shard are left to the main process, which gets the documents
+    of all shards, so that files are not parsed again by every process linking to them.
+    """
+    stats = document_store.parser.stats = ParseStats()
+    shard = {os.path.abspath(file) for file in markdown_files}
+    documents: list[DocumentRow] = []
+    targets: dict[tuple[str, str], Reference] = {}
+    for file in markdown_files:
+        document = document_store.get(file)
+        if document is None:
+            continue
+        rows = [
+            (ref.line_number, ref.column, ref.syntax, ref.link, ref.kind.value)
+            for ref in document.references
+        ]
+        documents.append((document.path, rows, list(document.anchors)))
+        for ref in document.references:
+            if ref.target in REMOTE_TARGETS or ref.kind is ReferenceKind.REFERENCE_LINK:
+                continue
+            key = get_target_key(ref)
+            if key is not None and (not key[1] or os.path.abspath(key[0]) in shard):
+                targets.setdefault(key, ref)
+
+    verdicts = validate_references(targets.values())
+    return ShardResult(
+        documents, [(*key, is_valid) for key, is_valid in zip(targets, verdicts)], stats
+    )
+
+
+def get_reference_kinds() -> frozenset[ReferenceKind]:
+    """Return the kinds of references enabled by the user."""
+    kinds = set(DEFAULT_KINDS)
+    if settings.html_links:
+        kinds.add(ReferenceKind.HTML_LINK)
+    if settings.html_images:
+        kinds.add(ReferenceKind.HTML_IMAGE)
+    if settings.raw_links:
+        kinds.add(ReferenceKind.RAW_LINK)
+    return frozenset(kinds)
+
+
+def get_verdict_options() -> dict[str, object]:
+    """Return the settings that local verdicts depend on, besides the files themselves."""
+    return {
+        "git": settings.git,
+        "fs_snapshot": settings.fs_snapshot,
+        "allow_absolute": settings.allow_absolute,
+    }
+
+
 def main() -> bool:
     # Check if settings configuration is valid
     if not settings.is_valid():
@@ -108,42 +373,308 @@ def main() -> bool:
             )
         )
 
+    parser = MarkdownParser(get_reference_kinds())
+    anchor_style = AnchorStyle(settings.anchor_style)
+    cache = None
+    if settings.incremental:
+        try:
+            cache = IndexCache.open(get_fingerprint(parser, anchor_style, get_verdict_options()))
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not open the cache, checking all files: {e}")
+
+    # Each file is read once, whether it is checked, the target of anchor references, or both
+    document_store.reset(parser, anchor_style, cache)
+    try:
+        if settings.daemon:
+            return serve_checks(cache)
+        return check_files(cache)
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def check_files(cache: IndexCache | None = None) -> bool:
+    """Find, parse and check the Markdown files specified by the user."""
+    if settings.processes > 1 and settings.incremental:
+        print(print_red("[!] --processes cannot be combined with --incremental."))
+        return False
+
     # Retrieve all markdown files specified by the user
-    markdown_files = get_markdown_files_from_args(settings.paths, settings.exclude)
+    if settings.io_threads > 1 and not settings.git:
+        # Parse the files as they are found, while the directories are still being searched,
+        # unless they are parsed by other processes
+        markdown_files = []
+        for file in iter_markdown_files_from_args(
+            settings.paths, settings.exclude, settings.io_threads
+        ):
+            if settings.processes == 1:
+                document_store.get(file)
+            markdown_files.append(file)
+        # Files are found in no particular order, so they are reported sorted
+        markdown_files.sort()
+    else:
+        markdown_files = get_markdown_files_from_args(
+            settings.paths, settings.exclude, use_git=settings.git
+        )
     if not markdown_files:
         print(print_red("[!] No Markdown files specified or found."))
         return False
+    discovered_files = markdown_files
+
+    if settings.changed_since is not None:
+        changes = get_changes_since(settings.paths, settings.changed_since)
+        if changes is None:
+            print(
+                print_red(f"[!] Could not find the files changed since {settings.changed_since}.")
+            )
+            return False
+        # All files are parsed to find the ones linking to changed files
+        graph = ReferenceGraph.from_documents(document_store.get(file) for file in markdown_files)
+        total = len(markdown_files)
+        markdown_files = select_affected_files(markdown_files, graph, changes)
+        print(
+            f"\n[+] {len(markdown_files)} of {total} Markdown files changed since "
+            f"{settings.changed_since} or link to changed files."
+        )
+        if not markdown_files and not settings.watch:
+            print(print_green("No changed Markdown files to check."))
+            return True
+
+    checker = ReferenceChecker(
+        io_threads=settings.io_threads, cache=cache, processes=settings.processes
+    )
+    is_valid = report_files(checker, markdown_files)
+    if settings.watch:
+        return watch_files(checker, discovered_files)
+    return is_valid
+
 
+def report_files(checker: ReferenceChecker, markdown_files: list[str]) -> bool:
+    """List and check Markdown files, print the summary and return whether no link is broken."""
     print(f"\n[+] {len(markdown_files)} Markdown files to check.")
     for file in markdown_files:
         print(f"- {file}")
 
-    md_parser = MarkdownParser()
-    checker = ReferenceChecker()
+    check_markdown_files(checker, markdown_files)
+
+    logger.info(document_store.parser.stats)
+    checker.print_summary()
+    return not bool(checker.broken_references)
+
+
+def check_markdown_files(checker: ReferenceChecker, markdown_files: list[str]) -> None:
+    """Check the references of Markdown files, reporting them file by file."""
+    if checker.processes > 1:
+        # Parse the files and validate their targets in other processes, then report them below
+        checker.validate_in_processes(markdown_files)
+    elif settings.io_threads > 1:
+        # Overlap the file system checks of all files, then report them in order below. Documents
+        # are loaded as their targets are collected, and stay in the store for the report.
+        documents = (document_store.get(file) for file in markdown_files)
+        checker.validate_local_targets(
+            ref for document in documents if document for ref in document.references
+        )
 
     for file in markdown_files:
         print(f"\n[+] FILE: {file}")
-        references = md_parser.parse_markdown_file(file)
 
-        basic_refs = references["basic_references"]
-        logging.info(f"Checking {len(basic_refs)} basic references ...")
-        checker.check_references(basic_refs)
+        document = document_store.get(file)
+        references = document.references if document else ()
+        checker.check_references(references)
 
-        image_refs = references["basic_images"]
-        logging.info(f"Checking {len(image_refs)} image references ...")
-        checker.check_references(image_refs)
+        logger.info(f"Checked {len(references)} references.")
+        if not references:
+            print("No references found.")
 
-        inline_links = references["inline_links"]
-        logging.info(f"Checking {len(inline_links)} inline links ...")
-        checker.check_references(inline_links)
 
-        if len(basic_refs) == 0 and len(image_refs) == 0 and len(inline_links) == 0:
-            print("No references found.")
+def watch_files(checker: ReferenceChecker, markdown_files: list[str]) -> bool:
+    """Check the files again as they change, until interrupted, and return the last result.
 
-    checker.print_summary()
+    Only the files that changed and the files linking to them are checked again. The documents of
+    the other files stay in the document store, and the results of remote references in the
+    checker, so they are not read or requested again. The snapshot of `--fs-snapshot` is dropped
+    on the first change, as it no longer matches the file system.
+    """
+    directories = get_directories_from_args(settings.paths, settings.exclude)
+    watcher = create_watcher(directories)
+    print(
+        f"\n[+] Watching {len(watcher.directories)} directories for changes ({watcher.name}). "
+        "Press Ctrl+C to stop."
+    )
+    try:
+        while True:
+            changed_paths = watcher.wait_for_changes()
+            if changed_paths is not None and not changed_paths:
+                continue
+            previous_files = set(markdown_files)
+            markdown_files, rechecked = update_watched_files(watcher, markdown_files, changed_paths)
+            # Deleted files are no longer checked, so their broken references go as well
+            checker.forget_files(previous_files.difference(markdown_files).union(rechecked))
+            if not rechecked:
+                logger.info(f"No checked files affected by {sorted(changed_paths or ())}.")
+                continue
+
+            print(f"\n[+] {len(rechecked)} Markdown files to check again.")
+            check_markdown_files(checker, rechecked)
+            checker.print_summary()
+    except KeyboardInterrupt:
+        print("\n[+] Stopped watching.")
+    finally:
+        watcher.close()
     return not bool(checker.broken_references)
 
 
+def forget_changes(watcher: Watcher, changed_paths: set[str] | None, exclude: list[str]) -> bool:
+    """Drop what is known of changed paths, returning whether directories were created or deleted.
+
+    With `changed_paths` None, the changes are unknown, so all documents are dropped. When
+    directories change, the watched directories are searched again.
+    """
+    document_store.forget(changed_paths)
+    clear_resolution_caches()
+    path_index.clear()
+
+    watched = set(watcher.directories)
+    directories_changed = changed_paths is None or any(
+        path in watched or os.path.isdir(path) for path in changed_paths
+    )
+    if directories_changed:
+        watcher.set_directories(get_directories_from_args(settings.paths, exclude))
+    return directories_changed
+
+
+def update_watched_files(
+    watcher: Watcher, markdown_files: list[str], changed_paths: set[str] | None
+) -> tuple[list[str], list[str]]:
+    """Apply changes to the watched files, returning the Markdown files and those to check again.
+
+    With `changed_paths` None, the changes are unknown, so all files are checked again.
+    """
+    known = {os.path.abspath(file) for file in markdown_files}
+    directories_changed = forget_changes(watcher, changed_paths, settings.exclude)
+    if (
+        settings.git
+        or directories_changed
+        or any(
+            path.endswith(".md") and (path in known) != os.path.isfile(path)
+            for path in changed_paths or ()
+        )
+    ):
+        # Markdown files were created or deleted, possibly along with their directory. With --git,
+        # the files of git are listed again after any change, as `path_index` was cleared.
+        markdown_files = sorted(
+            get_markdown_files_from_args(settings.paths, settings.exclude, use_git=settings.git)
+        )
+    if changed_paths is None:
+        return markdown_files, markdown_files
+
+    removed = known.difference(os.path.abspath(file) for file in markdown_files)
+    document_store.forget(removed)
+    changed_paths = changed_paths | removed
+    graph = ReferenceGraph.from_documents(document_store.get(file) for file in markdown_files)
+    return markdown_files, select_rechecked_files(markdown_files, graph, changed_paths)
+
+
+class CheckServer:
+    """Serves checks of the files below the checked paths to `refcheck-client`, from memory.
+
+    Documents stay in the document store between requests, and the results of remote references
+    in the checker. Before each check, what is known of the files changed since the previous one
+    is dropped, as reported by a watcher of the checked directories. Requests must come from the
+    same directory and with the same options as the server was started with, so the results are
+    the same as those of a check in the process of the client.
+    """
+
+    def __init__(self, cache: IndexCache | None = None):
+        self.options = {name: getattr(settings, name) for name in OPTIONS}
+        self.exclude = list(settings.exclude)
+        self.roots = [os.path.abspath(path) for path in settings.paths]
+        self.checker = ReferenceChecker(io_threads=settings.io_threads, cache=cache)
+
+        markdown_files = get_markdown_files_from_args(
+            settings.paths, self.exclude, use_git=settings.git
+        )
+        for file in markdown_files:
+            document_store.get(file)
+        print(f"\n[+] Loaded {len(markdown_files)} Markdown files.")
+        self.watcher = create_watcher(get_directories_from_args(settings.paths, self.exclude))
+
+    def handle(self, request: Message) -> Message:
+        """Check the paths of a request, returning the output and the broken references."""
+        if request.get("cwd") != os.getcwd():
+            return {"error": f"The daemon serves {os.getcwd()}."}
+        if request.get("options") != self.options:
+            return {"error": "The daemon was started with other options."}
+        paths = request.get("paths")
+        if not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+            return {"error": "The request has no list of paths."}
+        if not all(self._is_served(path) for path in paths):
+            return {"error": "The daemon was started on other paths."}
+
+        changed_paths = self.watcher.wait_for_changes(timeout=0)
+        if changed_paths is None or changed_paths:
+            forget_changes(self.watcher, changed_paths, self.exclude)
+            # Local results depend on the files on disk
+            self.checker.forget_files(())
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            is_valid = self._check(paths)
+        logger.info(f"Checked {paths}: {'OK' if is_valid else BROKEN}")
+        return {
+            "ok": is_valid,
+            "output": output.getvalue(),
+            "broken": [
+                {
+                    "file": broken.reference.file_path,
+                    "line": broken.reference.line_number,
+                    "syntax": broken.reference.syntax,
+                    "link": broken.reference.link,
+                }
+                for broken in self.checker.broken_references
+            ],
+        }
+
+    def _is_served(self, path: str) -> bool:
+        abs_path = os.path.abspath(path)
+        return any(os.path.commonpath([abs_path, root]) == root for root in self.roots)
+
+    def _check(self, paths: list[str]) -> bool:
+        markdown_files = sorted(
+            get_markdown_files_from_args(paths, self.exclude, use_git=settings.git)
+        )
+        if not markdown_files:
+            print(print_red("[!] No Markdown files specified or found."))
+            return False
+        self.checker.broken_references = []
+        return report_files(self.checker, markdown_files)
+
+    def close(self) -> None:
+        self.watcher.close()
+
+
+def serve_checks(cache: IndexCache | None = None) -> bool:
+    """Load the files specified by the user, then serve checks to `refcheck-client` until stopped."""
+    if settings.changed_since is not None:
+        print(print_red("[!] --daemon cannot be combined with --changed-since."))
+        return False
+
+    server = CheckServer(cache)
+    socket_path = get_socket_path()
+    try:
+        create_cache_directory()
+        print(f"[+] Serving checks on {socket_path}. Press Ctrl+C to stop.")
+        serve(socket_path, server.handle)
+    except KeyboardInterrupt:
+        print("\n[+] Stopped serving checks.")
+    except OSError as e:
+        print(print_red(f"[!] Could not serve checks: {e}"))
+        return False
+    finally:
+        server.close()
+    return True
+
+
 if __name__ == "__main__":
     if main():
         sys.exit(0)
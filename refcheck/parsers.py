@@ -1,7 +1,14 @@
+import os
 import re
+import sys
+import mmap
 import logging
+from enum import Enum
 from re import Pattern, Match
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import BinaryIO, Iterator
 
 logger = logging.getLogger()
 
@@ -15,36 +22,209 @@ BASIC_IMAGE_PATTERN = re.compile(r"!\[(?P<text>[^(){}\[\]]+)\]\((?P<link>[^(){}\
 # Inline Links - <http://example.com>
 INLINE_LINK_PATTERN = re.compile(r"<(?P<link>(?:https?://|mailto:|[a-zA-Z0-9._%+-]+@)[^>]+)>")
 
-RAW_LINK_PATTERN = re.compile(
-    r"(^| )(?:(https?://\S+))"
-)  # all links that are surrounded by nothing or spaces
+# Reference-style links - [text][label], [label][] and ![alt][label], resolved through definitions.
+# Brackets glued to a word or to other brackets are indexing, e.g. `a[i][j]`, not links.
+REFERENCE_LINK_PATTERN = re.compile(r"(?<![\w\]])!?\[(?P<text>[^\]]+)\]\[(?P<link>[^\]]*)\]")
+# Link reference definitions - [label]: https://example.com "Title"
+LINK_DEFINITION_PATTERN = re.compile(
+    r"(?m:(?<=^)|(?<=^ )|(?<=^  )|(?<=^   ))\[(?P<label>[^\]^][^\]]*)\]:[ \t]*<?(?P<link>[^\s>]+)>?"
+    r"(?:[ \t]+(?:\"[^\"\n]*\"|'[^'\n]*'|\([^)\n]*\)))?[ \t]*(?m:$)"
+)
+
+# Bare links - https://example.com, surrounded by whitespace. Trailing punctuation is not part of it.
+RAW_LINK_PATTERN = re.compile(r"(?<![^\s(])(?P<link>https?://[^\s<>\"'`]+?)(?=[.,;:!?)]*(?:\s|$))")
 HTML_LINK_PATTERN = re.compile(
-    r"<a\s+(?:[^>]*?\s+)?href=([\"\'])(.*?)\1"
+    r"<a\s+(?:[^>]*?\s+)?href=(?P<quote>[\"\'])(?P<link>.*?)(?P=quote)[^>]*>"
 )  # <a href="http://example.com">
 
 # Local File References - scripts, markdown files, and local images
 HTML_IMAGE_PATTERN = re.compile(
-    r"<img\s+(?:[^>]*?\s+)?src=([\"\'])(.*?)\1"
+    r"<img\s+(?:[^>]*?\s+)?src=(?P<quote>[\"\'])(?P<link>.*?)(?P=quote)[^>]*>"
 )  # <img src="image.png">
 
 
-@dataclass
+# Anything that looks like a `scheme:` prefix, e.g. `https:` or `mailto:`
+SCHEME_PATTERN = re.compile(r"^(?P<scheme>[a-zA-Z][a-zA-Z\d+\-.]*):")
+# Schemes of remote references that can be checked with an HTTP request
+HTTP_SCHEMES = frozenset({"http", "https"})
+# Extensions of local files whose fragments refer to headers
+MARKDOWN_EXTENSIONS = frozenset({".md", ".markdown"})
+
+# Every reference contains one of these, so files without them cannot contain references.
+LINK_SYNTAX_TRIGGERS = (b"[", b"<", b"http")
+# Every match of the scan pattern starts with one of these, so anything in between can be skipped.
+SCAN_START_PATTERN = re.compile(rb"[\[<`!]|http")
+
+# Files of at least this size are memory-mapped instead of read, so their pages are scanned in place.
+MMAP_THRESHOLD = 64 * 1024
+# `mmap` has no `count`, so newlines are counted in copies of at most this many bytes.
+NEWLINE_CHUNK_SIZE = 1024 * 1024
+
+# Links whose classification is kept, as the references of a run often share their links.
+CLASSIFIED_LINKS = 4096
+
+# The raw content of a file, as scanned by the parser.
+Buffer = bytes | mmap.mmap
+
+
+class ReferenceKind(str, Enum):
+    """Kind of syntax a reference was found in.
+
+    The values double as the keys of the dictionary returned by
+    `MarkdownParser.parse_markdown_file`.
+    """
+
+    BASIC_REFERENCE = "basic_references"
+    BASIC_IMAGE = "basic_images"
+    INLINE_LINK = "inline_links"
+    HTML_LINK = "html_links"
+    HTML_IMAGE = "html_images"
+    RAW_LINK = "raw_links"
+    LINK_DEFINITION = "link_definitions"
+    # Usages of reference-style links are resolved against the definitions of their document and
+    # checked through them. Only usages with an undefined label are yielded as references.
+    REFERENCE_LINK = "reference_links"
+
+
+class TargetKind(str, Enum):
+    """Kind of target a link points to, which decides how it is validated."""
+
+    SAME_FILE_ANCHOR = "same_file_anchor"  # #header
+    MARKDOWN = "markdown"  # file.md or file.md#header
+    ASSET = "asset"  # image.png, script.sh or file.pdf#page=2
+    REMOTE = "remote"  # http:// and https:// URLs
+    OTHER_SCHEME = "other_scheme"  # mailto:, ftp:, ... that cannot be checked
+
+
+@lru_cache(maxsize=CLASSIFIED_LINKS)
+def classify_link(link: str) -> tuple[TargetKind, str, str]:
+    """Classify a link and split it into its path and fragment.
+
+    The fragment is the part after the first `#`. Remote links are not split, their path is the
+    whole link and their fragment is empty. Results are shared by the references with the same
+    link, which classify it on demand.
+    """
+    scheme_match = SCHEME_PATTERN.match(link)
+    if scheme_match:
+        if scheme_match.group("scheme").lower() in HTTP_SCHEMES:
+            return TargetKind.REMOTE, link, ""
+        return TargetKind.OTHER_SCHEME, link, ""
+
+    path, _, fragment = link.partition("#")
+    if not path:
+        return TargetKind.SAME_FILE_ANCHOR, path, fragment
+    if os.path.splitext(path)[1].lower() in MARKDOWN_EXTENSIONS:
+        return TargetKind.MARKDOWN, path, fragment
+    return TargetKind.ASSET, path, fragment
+
+
+DEFAULT_KINDS = frozenset(
+    {
+        ReferenceKind.BASIC_REFERENCE,
+        ReferenceKind.BASIC_IMAGE,
+        ReferenceKind.INLINE_LINK,
+        ReferenceKind.LINK_DEFINITION,
+        ReferenceKind.REFERENCE_LINK,
+    }
+)
+
+# Alternatives of the scan pattern, in the order in which they are tried at each position. Code comes
+# first so that references inside it are consumed and skipped, and images before basic references.
+CODE_GROUPS = ("code_block", "inline_code")
+SCAN_ORDER: list[tuple[str, Pattern[str]]] = [
+    ("code_block", CODE_BLOCK_PATTERN),
+    ("inline_code", INLINE_CODE_PATTERN),
+    (ReferenceKind.LINK_DEFINITION.value, LINK_DEFINITION_PATTERN),
+    (ReferenceKind.BASIC_IMAGE.value, BASIC_IMAGE_PATTERN),
+    (ReferenceKind.BASIC_REFERENCE.value, BASIC_REFERENCE_PATTERN),
+    (ReferenceKind.REFERENCE_LINK.value, REFERENCE_LINK_PATTERN),
+    (ReferenceKind.HTML_LINK.value, HTML_LINK_PATTERN),
+    (ReferenceKind.HTML_IMAGE.value, HTML_IMAGE_PATTERN),
+    (ReferenceKind.INLINE_LINK.value, INLINE_LINK_PATTERN),
+    (ReferenceKind.RAW_LINK.value, RAW_LINK_PATTERN),
+]
+
+
+def _scan_group(name: str, pattern: Pattern[str]) -> str:
+    """Wrap a pattern in a named group, prefixing its own group names so they stay unique."""
+    inner = re.sub(r"\(\?P([<=])(\w+)", rf"(?P\g<1>{name}__\g<2>", pattern.pattern)
+    return f"(?P<{name}>{inner})"
+
+
+def normalize_label(label: str) -> str:
+    """Normalize a link label, which is matched case-insensitively and ignoring whitespace."""
+    return " ".join(label.split()).casefold()
+
+
+@lru_cache
+def build_scan_pattern(kinds: frozenset[ReferenceKind]) -> Pattern[bytes]:
+    """Combine the patterns of the given reference kinds into a single scan pattern.
+
+    All kinds are extracted in the same pass over the document, so enabling more kinds does not add
+    more passes. The pattern matches bytes, so files are scanned without decoding them first.
+    """
+    enabled = set(CODE_GROUPS) | {kind.value for kind in kinds}
+    return re.compile(
+        "|".join(
+            _scan_group(name, pattern) for name, pattern in SCAN_ORDER if name in enabled
+        ).encode("ascii")
+    )
+
+
+def _count_newlines(buffer: Buffer, start: int, end: int) -> int:
+    """Count the newlines between two offsets of a buffer."""
+    if isinstance(buffer, bytes):
+        return buffer.count(b"\n", start, end)
+    return sum(
+        buffer[pos : min(pos + NEWLINE_CHUNK_SIZE, end)].count(b"\n")
+        for pos in range(start, end, NEWLINE_CHUNK_SIZE)
+    )
+
+
+@dataclass(slots=True, frozen=True)
 class Reference:
     """Data class to store reference information.
 
+    References are immutable and slotted to keep their footprint small, as large runs hold millions
+    of them. Only what was found in the document is stored; what follows from the link is derived
+    from it when asked. The parser interns `file_path`, so all references of a file share one
+    string.
+
     Attributes:
         file_path: Path to the file where the reference was found.
         line_number: Line number where the reference was found.
         syntax: Syntax of the reference, e.g. `[text](link)`.
         link: The link part of the reference, e.g. `link` in `[text](link)`.
-        is_remote: Whether the reference is a remote reference.
+        kind: Kind of syntax the reference was found in.
+        column: Byte offset of the reference in its line.
     """
 
     file_path: str
     line_number: int
     syntax: str
     link: str
-    is_remote: bool
+    kind: ReferenceKind = field(default=ReferenceKind.BASIC_REFERENCE, kw_only=True)
+    column: int = field(default=0, kw_only=True)
+
+    @property
+    def target(self) -> TargetKind:
+        """Kind of target the link points to."""
+        return classify_link(self.link)[0]
+
+    @property
+    def path(self) -> str:
+        """The path of the link, without its fragment."""
+        return classify_link(self.link)[1]
+
+    @property
+    def fragment(self) -> str:
+        """The fragment of the link, e.g. `header` in `file.md#header`, or "" if it has none."""
+        return classify_link(self.link)[2]
+
+    @property
+    def is_remote(self) -> bool:
+        """Whether the link has a scheme, e.g. `https:` or `mailto:`."""
+        return self.target in (TargetKind.REMOTE, TargetKind.OTHER_SCHEME)
 
     def __str__(self):
         """Return a user-friendly string representation of the Reference."""
@@ -55,17 +235,65 @@ class Reference:
             f"  Line Number: {self.line_number}\n"
             f"  Syntax: {self.syntax}\n"
             f"  Link: {self.link}\n"
+            f"  Target: {self.target.value}\n"
             f"  Status: {remote_status}"
         )
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ReferenceMatch:
+    """Location of a reference match in a document.
+
+    Only byte offsets are stored: keeping the `re.Match` would keep the whole document alive.
+    """
+
     line_number: int
-    match: Match
+    start: int
+    end: int
+    link_start: int
+    link_end: int
+
+
+@dataclass(slots=True)
+class ParseStats:
+    """Statistics on how much text the parser could skip without scanning it."""
+
+    files: int = 0
+    mapped_files: int = 0
+    skipped_files: int = 0
+    skipped_file_bytes: int = 0
+    scanned_bytes: int = 0
+    skipped_bytes: int = 0
+    undecodable_slices: int = 0
+
+    def merge(self, other: "ParseStats") -> None:
+        """Add the counts of another parser, e.g. of another process."""
+        self.files += other.files
+        self.mapped_files += other.mapped_files
+        self.skipped_files += other.skipped_files
+        self.skipped_file_bytes += other.skipped_file_bytes
+        self.scanned_bytes += other.scanned_bytes
+        self.skipped_bytes += other.skipped_bytes
+        self.undecodable_slices += other.undecodable_slices
+
+    def __str__(self):
+        total_bytes = self.scanned_bytes + self.skipped_bytes
+        skipped_share = self.skipped_bytes / total_bytes if total_bytes else 0.0
+        return (
+            f"Skipped {self.skipped_files} of {self.files} files ({self.skipped_file_bytes} bytes) "
+            f"without link syntax and {self.skipped_bytes} of {total_bytes} bytes "
+            f"({skipped_share:.1%}) in link-free stretches of the remaining files. "
+            f"{self.mapped_files} files were memory-mapped, {self.undecodable_slices} matches were "
+            f"not valid UTF-8."
+        )
 
 
 class MarkdownParser:
+    def __init__(self, kinds: frozenset[ReferenceKind] = DEFAULT_KINDS):
+        """Create a parser extracting the given kinds of references."""
+        self.scan_pattern = build_scan_pattern(kinds)
+        self.stats = ParseStats()
+
     def parse_markdown_file(self, file_path: str) -> dict[str, list[Reference]]:
         """Parse a markdown file to extract references.
 
@@ -73,158 +301,182 @@ class MarkdownParser:
             file_path: Path to the markdown file.
 
         Returns:
-            A dictionary containing lists of references found in the markdown file.
+            A dictionary containing lists of references found in the markdown file, keyed by
+            `ReferenceKind` value.
+        """
+        with self.open_buffer(file_path) as buffer:
+            if buffer is None:
+                return {}
+
+            references: dict[str, list[Reference]] = {kind.value: [] for kind in ReferenceKind}
+            for reference in self.iter_references_in_buffer(sys.intern(file_path), buffer):
+                references[reference.kind.value].append(reference)
+        return references
+
+    @contextmanager
+    def open_buffer(self, file_path: str) -> Iterator[Buffer | None]:
+        """Open the raw content of a markdown file, yielding None if it cannot be read.
+
+        Large files are memory-mapped and unmapped again when the context exits, smaller ones are
+        read in one go.
         """
         logger.info(f"Parsing markdown file: '{file_path}' ...")
 
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                content = file.read()
+            file = open(file_path, "rb")
         except FileNotFoundError:
             print(f"Error: The file {file_path} was not found.")
-            return {}
+            yield None
+            return
         except IOError as e:
             print(f"Error: An I/O error occurred while reading the file {file_path}: {e}")
-            return {}
-
-        # Get all code blocks, such as ```python ... ```, or ```text``` for ensuring that found references are not part
-        # of code blocks.
-        logger.info("Extracting code blocks ...")
-        code_blocks = self._find_matches_with_line_numbers(CODE_BLOCK_PATTERN, content)
-        logger.info(f"Found {len(code_blocks)} code blocks.")
-
-        # Get all inline code spans with backticks
-        logger.info("Extracting inline code ...")
-        inline_code = self._find_matches_with_line_numbers(INLINE_CODE_PATTERN, content)
-        logger.info(f"Found {len(inline_code)} inline code spans.")
-
-        # Combine code blocks and inline code for filtering
-        all_code = code_blocks + inline_code
-
-        # Get all references that look like this: [text](reference)
-        logger.info("Extracting basic references ...")
-        basic_reference_matches = self._find_matches_with_line_numbers(
-            BASIC_REFERENCE_PATTERN, content
-        )
-        basic_reference_matches = [
-            ref for ref in basic_reference_matches if not ref.match[0].startswith("!")
-        ]
-        logger.info(f"Found {len(basic_reference_matches)} basic reference matches:")
-        for ref_match in basic_reference_matches:
-            logger.info(ref_match.__repr__())
-
-        basic_reference_matches = self._drop_code_references(basic_reference_matches, all_code)
-        logger.info("Processing reference matches...")
-        basic_references = self._process_basic_references(file_path, basic_reference_matches)
-
-        # Get all image references that look like this: ![text](reference)
-        logger.info("Extracting basic images ...")
-        basic_image_matches = self._find_matches_with_line_numbers(BASIC_IMAGE_PATTERN, content)
-        logger.info(f"Found {len(basic_image_matches)} basic images.")
-        basic_image_matches = self._drop_code_references(basic_image_matches, all_code)
-        basic_images = self._process_basic_references(file_path, basic_image_matches)
-
-        logger.info("Extracting inline links ...")
-        inline_link_matches = self._find_matches_with_line_numbers(INLINE_LINK_PATTERN, content)
-        logger.info(f"Found {len(inline_link_matches)} inline links.")
-        inline_link_matches = self._drop_code_references(inline_link_matches, all_code)
-        inline_links = self._process_basic_references(file_path, inline_link_matches)
-
-        return {
-            "basic_references": basic_references,
-            "basic_images": basic_images,
-            "inline_links": inline_links,
-        }
-
-    def _drop_code_references(
-        self, references: list[ReferenceMatch], code_sections: list[ReferenceMatch]
-    ) -> list[ReferenceMatch]:
-        """Drop references that are part of code blocks or inline code."""
-        logger.info("Dropping references that are part of code blocks or inline code ...")
-
-        # Filter out references that are inside code blocks or inline code
-        filtered_references = []
-        dropped_counter = 0
-
-        for ref in references:
-            is_in_code = False
-            for code_section in code_sections:
-                logger.debug(ref.match.group(0))
-
-                # Check if reference is within the code section content
-                if code_section.match.lastindex and code_section.match.lastindex >= 1:
-                    content = code_section.match.group(1)
-                    logger.debug(f"Code content: {content}")
-                    if ref.match.group(0) in content:
-                        logger.info(f"Dropping reference: {ref.match.group(0)}")
-                        is_in_code = True
-                        dropped_counter += 1
-                        break
-
-            if not is_in_code:
-                filtered_references.append(ref)
-
-        if dropped_counter > 0:
-            logger.info(f"Dropped {dropped_counter} references.")
-        else:
-            logger.info("No code references found.")
-
-        return filtered_references
-
-    def _is_remote_reference(self, link: str) -> bool:
-        """Check if a link is a remote reference."""
-        protocol_pattern = re.compile(
-            r"^([a-zA-Z][a-zA-Z\d+\-.]*):.*"
-        )  # matches anything that looks like a `protocol:`
-        return bool(protocol_pattern.match(link))
-
-    def _process_basic_references(
-        self, file_path: str, matches: list[ReferenceMatch]
-    ) -> list[Reference]:
-        """Process basic references."""
-        references: list[Reference] = []
-        for match in matches:
-            link = match.match.group("link")
-            reference = Reference(
-                file_path=file_path,
-                line_number=match.line_number,
-                syntax=match.match.group(0),
-                link=link,
-                is_remote=self._is_remote_reference(link),
-            )
-            references.append(reference)
-        return references
+            yield None
+            return
+
+        with file:
+            buffer = self._map_file(file)
 
-    def _process_inline_links(
-        self, file_path: str, matches: list[ReferenceMatch]
-    ) -> list[Reference]:
-        """Process inline links enclosed in angle brackets.
+        try:
+            yield buffer
+        finally:
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+
+    def _map_file(self, file: BinaryIO) -> Buffer:
+        """Memory-map a file opened in binary mode, falling back to reading it."""
+        size = os.fstat(file.fileno()).st_size
+        if size and size >= MMAP_THRESHOLD:
+            try:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError) as e:
+                # E.g. file systems or special files that do not support mapping
+                logger.info(f"Could not memory-map file, reading it instead: {e}")
+            else:
+                return buffer
+        return file.read()
+
+    def _decode(self, file_path: str, raw: bytes) -> str:
+        """Decode a slice of a file, replacing bytes that are not valid UTF-8."""
+        try:
+            return raw.decode("utf-8")
+        except UnicodeDecodeError as e:
+            logger.warning(f"Invalid UTF-8 in '{file_path}', replacing undecodable bytes: {e}")
+            self.stats.undecodable_slices += 1
+            return raw.decode("utf-8", errors="replace")
 
-        Handles patterns like:
-        - <http://example.com>
-        - <a href="https://www.example.org">Example</a>
-        - <img src="https://example.com/image.png" alt="Image">
+    def iter_references_in_buffer(self, file_path: str, content: Buffer) -> Iterator[Reference]:
+        """Scan the content once, skipping code blocks and inline code, and yield references.
+
+        The content is scanned as raw bytes and only the matched slices are decoded. Content without
+        any link syntax is skipped without scanning it.
+
+        Link definitions are collected into a symbol table of the document while scanning, and
+        reference-style links are resolved against it. As definitions may follow their usages,
+        usages with a label that is still undefined are yielded once the scan is complete.
         """
-        references: list[Reference] = []
-        for match in matches:
-            link = match.match.group("link")
-            reference = Reference(
-                file_path=file_path,
-                line_number=match.line_number,
-                syntax=match.match.group(0),
-                link=link,
-                is_remote=self._is_remote_reference(link),
+        self.stats.files += 1
+        if isinstance(content, mmap.mmap):
+            self.stats.mapped_files += 1
+        if all(content.find(trigger) == -1 for trigger in LINK_SYNTAX_TRIGGERS):
+            logger.info("File does not contain any link syntax. Skipping.")
+            self.stats.skipped_files += 1
+            self.stats.skipped_file_bytes += len(content)
+            return
+
+        found_counter = 0
+        definitions: dict[str, Reference] = {}
+        unresolved: list[Reference] = []
+
+        for line_number, match in self._iter_matches_with_line_numbers(self.scan_pattern, content):
+            group = match.lastgroup
+            if group is None or group in CODE_GROUPS:
+                continue
+
+            kind = ReferenceKind(group)
+            if kind is ReferenceKind.BASIC_REFERENCE and match[0].startswith(b"!"):
+                # Image syntax that the image pattern rejected, e.g. brackets in the alt text
+                continue
+
+            link_start, link_end = match.span(f"{kind.value}__link")
+            if kind is ReferenceKind.REFERENCE_LINK and link_start == link_end:
+                # Collapsed reference link `[label][]`, the text is the label
+                link_start, link_end = match.span(f"{kind.value}__text")
+
+            ref_match = ReferenceMatch(
+                line_number=line_number,
+                start=match.start(),
+                end=match.end(),
+                link_start=link_start,
+                link_end=link_end,
             )
-            references.append(reference)
-        return references
+            reference = self._to_reference(file_path, kind, ref_match, content)
+            found_counter += 1
+
+            if kind is ReferenceKind.LINK_DEFINITION:
+                label = normalize_label(self._decode(file_path, match[f"{kind.value}__label"]))
+                if label in definitions:
+                    logger.info(f"Ignoring duplicate definition of label '{label}'.")
+                    continue  # The first definition of a label wins
+                definitions[label] = reference
+            elif kind is ReferenceKind.REFERENCE_LINK:
+                if normalize_label(reference.link) not in definitions:
+                    unresolved.append(reference)
+                continue
+
+            yield reference
+
+        for reference in unresolved:
+            if normalize_label(reference.link) not in definitions:
+                logger.info(f"Label '{reference.link}' is not defined in '{file_path}'.")
+                yield reference
+
+        logger.info(
+            f"Found {found_counter} references and {len(definitions)} link definitions in "
+            f"'{file_path}'."
+        )
+
+    def _to_reference(
+        self, file_path: str, kind: ReferenceKind, ref_match: ReferenceMatch, content: Buffer
+    ) -> Reference:
+        """Build a reference from the location of a match in the content."""
+        return Reference(
+            file_path=file_path,
+            line_number=ref_match.line_number,
+            syntax=self._decode(file_path, content[ref_match.start : ref_match.end]),
+            link=self._decode(file_path, content[ref_match.link_start : ref_match.link_end]),
+            kind=kind,
+            column=ref_match.start - content.rfind(b"\n", 0, ref_match.start) - 1,
+        )
+
+    def _iter_matches_with_line_numbers(
+        self, pattern: Pattern[bytes], text: Buffer
+    ) -> Iterator[tuple[int, Match[bytes]]]:
+        """Lazily find regex matches along with their line numbers.
+
+        Matching is only attempted where a match can start (see `SCAN_START_PATTERN`), so link-free
+        stretches are skipped without running the pattern on them. Line numbers are counted
+        incrementally from the previous match, so the text is traversed only once. Offsets of the
+        matches are byte offsets.
+        """
+        line_number = 1
+        last_pos = 0
+        pos = 0
+        while True:
+            start = SCAN_START_PATTERN.search(text, pos)
+            if start is None:
+                self.stats.skipped_bytes += len(text) - pos
+                break
+            self.stats.skipped_bytes += start.start() - pos
+
+            match = pattern.match(text, start.start())
+            if match is None:
+                self.stats.scanned_bytes += 1
+                pos = start.start() + 1
+                continue
 
-    def _find_matches_with_line_numbers(
-        self, pattern: Pattern[str], text: str
-    ) -> list[ReferenceMatch]:
-        """Find regex matches along with their line numbers."""
-        matches_with_line_numbers = []
-        for match in re.finditer(pattern, text):
             start_pos = match.start(0)
-            line_number = text.count("\n", 0, start_pos) + 1
-            matches_with_line_numbers.append(ReferenceMatch(line_number=line_number, match=match))
-        return matches_with_line_numbers
+            line_number += _count_newlines(text, last_pos, start_pos)
+            last_pos = start_pos
+            self.stats.scanned_bytes += match.end() - start_pos
+            pos = max(match.end(), start_pos + 1)
+            yield line_number, match
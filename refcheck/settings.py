@@ -1,4 +1,6 @@
 import sys
+from argparse import Namespace
+from typing import Any
 
 from refcheck.cli import get_command_line_arguments
 
@@ -13,18 +15,57 @@ class Settings:
             self._no_color: bool = False
             self._allow_absolute: bool = False
             self._exclude: list[str] = []
-        else:
-            args = get_command_line_arguments()
+            self._html_links: bool = False
+            self._html_images: bool = False
+            self._raw_links: bool = False
+            self._anchor_style: str = "github"
+            self._fs_snapshot: bool = False
+            self._io_threads: int = 1
+            self._git: bool = False
+            self._changed_since: str | None = None
+            self._incremental: bool = False
+            self._watch: bool = False
+            self._daemon: bool = False
+            self._processes: int = 1
+        # Otherwise, the command line is parsed when a setting is first read, see __getattr__
+
+    def configure(self, args: Namespace) -> None:
+        """Take the settings from parsed arguments, e.g. those of an entry point with its own."""
+        self._paths = args.paths
+        self._verbose = args.verbose
+        self._check_remote = args.check_remote
+        self._no_color = args.no_color
+        self._allow_absolute = args.allow_absolute
+        self._exclude = args.exclude
+        self._html_links = args.html_links
+        self._html_images = args.html_images
+        self._raw_links = args.raw_links
+        self._anchor_style = args.anchor_style
+        self._fs_snapshot = args.fs_snapshot
+        self._io_threads = args.io_threads
+        self._git = args.git
+        self._changed_since = args.changed_since
+        self._incremental = args.incremental
+        self._watch = args.watch
+        self._daemon = args.daemon
+        self._processes = args.processes
 
-            self._paths: list[str] = args.paths
-            self._verbose: bool = args.verbose
-            self._check_remote: bool = args.check_remote
-            self._no_color: bool = args.no_color
-            self._allow_absolute: bool = args.allow_absolute
-            self._exclude: list[str] = args.exclude
+    def to_arguments(self) -> Namespace:
+        """Return the settings as parsed arguments, e.g. to configure them in another process."""
+        if "_paths" not in vars(self):
+            self.configure(get_command_line_arguments())
+        return Namespace(**{name.removeprefix("_"): value for name, value in vars(self).items()})
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes that are not set. Reading the command line on first use lets
+        # entry points with other arguments, like refcheck-lsp, import the modules using settings
+        if not name.startswith("_") or "_paths" in self.__dict__:
+            raise AttributeError(name)
+        self.configure(get_command_line_arguments())
+        return getattr(self, name)
 
     def __str__(self) -> str:
-        return f"Settings(paths={self.paths}, verbose={self.verbose}, check_remote={self.check_remote}, no_color={self.no_color}, allow_absolute={self.allow_absolute}, exclude={self.exclude})"
+        return f"Settings(paths={self.paths}, verbose={self.verbose}, check_remote={self.check_remote}, no_color={self.no_color}, allow_absolute={self.allow_absolute}, exclude={self.exclude}, html_links={self.html_links}, html_images={self.html_images}, raw_links={self.raw_links}, anchor_style={self.anchor_style}, fs_snapshot={self.fs_snapshot}, io_threads={self.io_threads}, git={self.git}, changed_since={self.changed_since}, incremental={self.incremental}, watch={self.watch}, daemon={self.daemon}, processes={self.processes})"
 
     def is_valid(self) -> bool:
         try:
@@ -58,5 +99,53 @@ class Settings:
     def exclude(self) -> list[str]:
         return self._exclude
 
+    @property
+    def html_links(self) -> bool:
+        return self._html_links
+
+    @property
+    def html_images(self) -> bool:
+        return self._html_images
+
+    @property
+    def raw_links(self) -> bool:
+        return self._raw_links
+
+    @property
+    def anchor_style(self) -> str:
+        return self._anchor_style
+
+    @property
+    def fs_snapshot(self) -> bool:
+        return self._fs_snapshot
+
+    @property
+    def io_threads(self) -> int:
+        return self._io_threads
+
+    @property
+    def git(self) -> bool:
+        return self._git
+
+    @property
+    def changed_since(self) -> str | None:
+        return self._changed_since
+
+    @property
+    def incremental(self) -> bool:
+        return self._incremental
+
+    @property
+    def watch(self) -> bool:
+        return self._watch
+
+    @property
+    def daemon(self) -> bool:
+        return self._daemon
+
+    @property
+    def processes(self) -> int:
+        return self._processes
+
 
 settings = Settings()
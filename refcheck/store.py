@@ -0,0 +1,124 @@
+import os
+import sys
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Iterable
+
+from refcheck.anchors import AnchorStyle, extract_anchors
+from refcheck.cache import IndexCache, content_hash
+from refcheck.parsers import Buffer, MarkdownParser, Reference
+
+logger = logging.getLogger()
+
+
+@dataclass(slots=True, frozen=True)
+class Document:
+    """A Markdown file, analyzed once for everything the checks need from it.
+
+    Attributes:
+        path: Normalized path of the file.
+        references: References found in the file, in document order.
+        anchors: Anchors defined by the file, e.g. the slugs of its headers.
+    """
+
+    path: str
+    references: tuple[Reference, ...]
+    anchors: frozenset[str]
+
+
+class DocumentStore:
+    """Run-scoped store that reads and analyzes each Markdown file exactly once.
+
+    A file is read a single time whether it is parsed as a source of references, looked up as the
+    target of anchor references, or both. Documents are keyed by their absolute path, so all the
+    ways a file is referred to share one document.
+
+    Documents can be loaded from several threads. Files are opened and read concurrently, while
+    the analysis, which updates the statistics of the parser, is done by one thread at a time.
+
+    With an `IndexCache`, documents of previous runs are reused for files that did not change.
+    """
+
+    def __init__(
+        self,
+        parser: MarkdownParser | None = None,
+        anchor_style: AnchorStyle = AnchorStyle.GITHUB,
+        cache: IndexCache | None = None,
+    ):
+        self.reset(parser, anchor_style, cache)
+
+    def reset(
+        self,
+        parser: MarkdownParser | None = None,
+        anchor_style: AnchorStyle = AnchorStyle.GITHUB,
+        cache: IndexCache | None = None,
+    ) -> None:
+        """Forget all documents and analyze files with the given parser, anchor style and cache."""
+        self.parser = parser or MarkdownParser()
+        self.anchor_style = anchor_style
+        self.cache = cache
+        self._documents: dict[str, Document | None] = {}
+        self._analysis_lock = threading.Lock()
+
+    def get(self, file_path: str) -> Document | None:
+        """Return the document of a Markdown file, or None if the file cannot be read."""
+        key = os.path.abspath(file_path)
+        if key not in self._documents:
+            self._documents[key] = self._load(os.path.normpath(file_path))
+        return self._documents[key]
+
+    def put(self, file_path: str, buffer: Buffer) -> Document:
+        """Analyze content that replaces the file on disk, e.g. the unsaved text of an editor."""
+        file_path = sys.intern(os.path.normpath(file_path))
+        with self._analysis_lock:
+            references = tuple(self.parser.iter_references_in_buffer(file_path, buffer))
+            anchors = extract_anchors(buffer, self.anchor_style)
+        document = Document(path=file_path, references=references, anchors=anchors)
+        self._documents[os.path.abspath(file_path)] = document
+        return document
+
+    def add(self, document: Document) -> None:
+        """Store a document analyzed elsewhere, e.g. in another process."""
+        self._documents[os.path.abspath(document.path)] = document
+
+    def forget(self, paths: Iterable[str] | None = None) -> None:
+        """Drop the documents of files that changed, or all of them, so they are read again."""
+        if paths is None:
+            self._documents.clear()
+            return
+        for path in paths:
+            self._documents.pop(os.path.abspath(path), None)
+
+    def _load(self, file_path: str) -> Document | None:
+        """Read a file and extract its references and anchors from the same buffer."""
+        file_path = sys.intern(file_path)
+        cached = self.cache.load_document(file_path) if self.cache is not None else None
+        if cached is not None:
+            logger.info(f"Reused {file_path} from the cache.")
+            references, anchors = cached
+            return Document(path=file_path, references=references, anchors=anchors)
+
+        with self.parser.open_buffer(file_path) as buffer:
+            if buffer is None:
+                return None
+            if self.cache is not None:
+                file_hash = content_hash(buffer)
+                cached = self.cache.load_document(file_path, file_hash)
+            if cached is not None:
+                references, anchors = cached
+            else:
+                with self._analysis_lock:
+                    references = tuple(self.parser.iter_references_in_buffer(file_path, buffer))
+                    anchors = extract_anchors(buffer, self.anchor_style)
+                if self.cache is not None:
+                    self.cache.store_document(file_path, file_hash, references, anchors)
+
+        logger.info(
+            f"Loaded {file_path} with {len(references)} references and {len(anchors)} anchors."
+        )
+        return Document(path=file_path, references=references, anchors=anchors)
+
+
+# Shared by main and the validators for the whole run
+document_store = DocumentStore()
@@ -1,12 +1,19 @@
 import os
+import time
+import queue
 import logging
+import posixpath
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterable, Iterator
 
 from refcheck.settings import settings
+from refcheck.ignore import IGNORE_FILE, IgnoreMatcher
+from refcheck.git import get_repository_root, list_repository_files
 
 logger = logging.getLogger()
 
-IGNORE_FILE = ".refcheckignore"
-
 CHECK_IGNORE_DEFAULTS = [
     ".git",
     ".vscode",
@@ -20,67 +27,498 @@ CHECK_IGNORE_DEFAULTS = [
 
 
 def load_exclusion_patterns() -> list[str]:
-    """Read exclusions from the .refcheckignore file."""
+    """Read exclusions from the .refcheckignore file, skipping blank lines and comments."""
     if not os.path.isfile(IGNORE_FILE):
         logger.warning(f"Could not find {IGNORE_FILE}. Using default exclusions.")
         exclusions = CHECK_IGNORE_DEFAULTS
     else:
         logger.info(f"Reading exclusions from {IGNORE_FILE}...")
         with open(IGNORE_FILE, "r", encoding="utf-8") as file:
-            exclusions = [line.strip() for line in file if line.strip()]
+            exclusions = [
+                line.strip() for line in file if line.strip() and not line.lstrip().startswith("#")
+            ]
 
     print(print_yellow(f"[!] WARNING: Skipping these files and directories: {exclusions}"))
     return exclusions
 
 
+class PathIndex:
+    """In-memory snapshot of the directory trees walked during file discovery.
+
+    Queries for paths whose parent directory was walked are answered from the snapshot. All other
+    paths, e.g. outside the checked directories or below symlinked directories, which are not
+    walked, fall back to the file system. An empty index always falls back.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop the snapshot."""
+        self._walked: set[str] = set()
+        # Case-normalized absolute path -> (absolute path as walked, whether it is a directory)
+        self._entries: dict[str, tuple[str, bool]] = {}
+
+    def load(self, other: "PathIndex") -> None:
+        """Take the snapshot of another index, e.g. one sent to another process."""
+        self._walked = other._walked
+        self._entries = other._entries
+
+    def add_directory(self, dirpath: str, dirnames: list[str], filenames: list[str]) -> None:
+        """Record the entries of a directory, as yielded by `os.walk`."""
+        dirpath = os.path.abspath(dirpath)
+        self._walked.add(os.path.normcase(dirpath))
+        for names, is_dir in ((dirnames, True), (filenames, False)):
+            for name in names:
+                path = os.path.join(dirpath, name)
+                self._entries[os.path.normcase(path)] = (path, is_dir)
+
+    def add_files(self, root: str, relative_paths: Iterable[str]) -> None:
+        """Record a whole tree from the paths of its files relative to `root`, with `/` separators.
+
+        The directories of the tree are the ancestors of its files, e.g. as listed by git. Files
+        that are not listed, e.g. ignored ones, and empty directories do not exist in the snapshot.
+        """
+        root = os.path.abspath(root)
+        self._walked.add(os.path.normcase(root))
+        for relative_path in relative_paths:
+            path = root
+            *dirnames, filename = relative_path.split("/")
+            for name in dirnames:
+                path = os.path.join(path, name)
+                key = os.path.normcase(path)
+                if key not in self._walked:
+                    self._walked.add(key)
+                    self._entries[key] = (path, True)
+            path = os.path.join(path, filename)
+            self._entries[os.path.normcase(path)] = (path, False)
+
+    def _lookup(self, path: str) -> tuple[str, tuple[str, bool] | None] | None:
+        """Return the absolute path and its entry, or None if the path is not covered."""
+        abs_path = os.path.abspath(path)
+        key = os.path.normcase(abs_path)
+
+        # Go up to the first ancestor of the path, or the path itself, whose parent was walked
+        child, parent = key, os.path.dirname(key)
+        while parent not in self._walked:
+            if parent == child:
+                return None  # Reached the root of the file system
+            child, parent = parent, os.path.dirname(parent)
+        if child == key:
+            return abs_path, self._entries.get(key)
+
+        entry = self._entries.get(child)
+        if entry is None or not entry[1]:
+            # Nothing exists below a directory that does not exist, or below a file
+            return abs_path, None
+        return None  # Below a directory that was not walked, e.g. a symlink
+
+    def exists(self, path: str) -> bool:
+        """Check if a path exists, like `os.path.exists`."""
+        if not self._walked:
+            return os.path.exists(path)
+        found = self._lookup(path)
+        if found is None:
+            return os.path.exists(path)
+        abs_path, entry = found
+        if entry is not None and entry[0] != abs_path:
+            logger.warning(f"Path only matches when ignoring case: {path} -> {entry[0]}")
+        return entry is not None
+
+
+# Filled by the discovery walk if --fs-snapshot is given, and shared with the validators
+path_index = PathIndex()
+
+
+@dataclass(slots=True)
+class WalkStats:
+    """Statistics on the directories and files visited while searching for Markdown files."""
+
+    directories: int = 0
+    files: int = 0
+    pruned_directories: int = 0
+    seconds: float = 0.0
+
+    def merge(self, other: "WalkStats") -> None:
+        """Add the counts of another walk, e.g. of another thread."""
+        self.directories += other.directories
+        self.files += other.files
+        self.pruned_directories += other.pruned_directories
+
+    def __str__(self):
+        seconds = self.seconds or float("nan")
+        return (
+            f"Visited {self.directories} directories and {self.files} files in "
+            f"{self.seconds:.3f}s ({self.directories / seconds:.0f} directories/s, "
+            f"{self.files / seconds:.0f} files/s). Pruned {self.pruned_directories} excluded "
+            f"directories without entering them."
+        )
+
+
+def _scan_directory(
+    subdir: str, matcher: IgnoreMatcher, stats: WalkStats
+) -> tuple[list[tuple[str, IgnoreMatcher]], list[str]]:
+    """List one directory, returning the subdirectories to enter and the Markdown files in it.
+
+    Entries are classified with the type information cached by `os.scandir`, so most of them need
+    no extra `stat` call. If the directory has an ignore file, its rules apply to everything below
+    it, so each subdirectory is returned with the matcher to use for its entries. Excluded and
+    symlinked directories are not returned, so they are never entered.
+    """
+    stats.directories += 1
+    dirs, files, subdirs_to_enter = [], [], []
+    try:
+        with os.scandir(subdir) as iterator:
+            entries = list(iterator)
+    except OSError as e:
+        logger.warning(f"Could not list directory {subdir}: {e}")
+        return [], []
+
+    if any(entry.name == IGNORE_FILE for entry in entries):
+        matcher = matcher.with_ignore_file(subdir)
+
+    markdown_files = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if not is_dir:
+            files.append(entry.name)
+            if entry.name.endswith(".md") and not matcher.is_ignored(entry.path, is_dir=False):
+                markdown_files.append(os.path.normpath(entry.path))
+            continue
+        dirs.append(entry.name)
+        if entry.is_symlink():
+            continue  # Not entered, like os.walk does by default
+        if matcher.is_ignored(entry.path, is_dir=True):
+            stats.pruned_directories += 1
+        else:
+            subdirs_to_enter.append((entry.path, matcher))
+
+    stats.files += len(files)
+    if settings.fs_snapshot:
+        # Excluded directories are pruned and not recorded, so paths below them are looked up on disk
+        path_index.add_directory(subdir, dirs, files)
+    return subdirs_to_enter, markdown_files
+
+
 def get_markdown_files_from_dir(root_dir: str, exclude: list[str] | None = None) -> list[str]:
-    """Traverse the directory to get all markdown files."""
-    if exclude is None:
-        exclude = []
+    """Traverse the directory to get all markdown files.
+
+    Exclusions are gitignore-style patterns relative to the current directory, and the
+    .refcheckignore files found in the searched directories apply below their directory. Excluded
+    directories are pruned before they are entered, so large trees like `node_modules` are never
+    listed. Like `os.walk`, symlinked directories are not entered.
+    """
     print(f"[+] Searching for markdown files in {os.path.abspath(root_dir)} ...")
-    exclude_set = set(os.path.normpath(path) for path in exclude)
+    matcher = IgnoreMatcher.from_patterns(exclude or [])
     markdown_files = []
+    stats = WalkStats()
+    start = time.perf_counter()
 
-    # Walk through the directory to get all markdown files
-    for subdir, _, files in os.walk(root_dir):
-        subdir_norm = os.path.normpath(subdir)
-        if any(subdir_norm.startswith(exclude_item) for exclude_item in exclude_set):
-            continue  # Skip excluded directories
+    # Depth-first, visiting the subdirectories of a directory in the order they are listed
+    stack = [] if matcher.is_ignored(root_dir, is_dir=True) else [(root_dir, matcher)]
+    while stack:
+        subdirs, found = _scan_directory(*stack.pop(), stats)
+        markdown_files.extend(found)
+        stack.extend(reversed(subdirs))
 
-        for file in files:
-            file_path = os.path.join(subdir, file)
-            file_path_norm = os.path.normpath(file_path)
-            if file.endswith(".md") and file_path_norm not in exclude_set:
-                markdown_files.append(file_path_norm)
+    stats.seconds = time.perf_counter() - start
+    logger.info(stats)
+    return markdown_files
+
+
+def _select_markdown_files(
+    root_dir: str, repository_root: str, files: list[str], matcher: IgnoreMatcher
+) -> list[str]:
+    """Return the Markdown files of a repository below a directory that are not excluded.
+
+    Exclusions apply as in a walk of the directory: the .refcheckignore files listed apply below
+    their directory, and nothing below an excluded directory is returned.
+    """
+    prefix = os.path.relpath(os.path.abspath(root_dir), repository_root).replace(os.sep, "/")
+    prefix = "" if prefix == "." else prefix + "/"
+    tree = [path[len(prefix) :] for path in files if path.startswith(prefix)]
+    ignore_file_dirs = {
+        posixpath.dirname(path) for path in tree if posixpath.basename(path) == IGNORE_FILE
+    }
+
+    # Matcher for the entries of each directory, or None if the directory is excluded
+    matchers: dict[str, IgnoreMatcher | None] = {}
 
+    def get_matcher(directory: str) -> IgnoreMatcher | None:
+        if directory in matchers:
+            return matchers[directory]
+        dir_path = os.path.join(root_dir, *directory.split("/")) if directory else root_dir
+        parent = get_matcher(posixpath.dirname(directory)) if directory else matcher
+        if parent is None or parent.is_ignored(dir_path, is_dir=True):
+            result = None
+        elif directory in ignore_file_dirs:
+            result = parent.with_ignore_file(dir_path)
+        else:
+            result = parent
+        matchers[directory] = result
+        return result
+
+    markdown_files = []
+    for path in tree:
+        if not path.endswith(".md"):
+            continue
+        file_matcher = get_matcher(posixpath.dirname(path))
+        file_path = os.path.normpath(os.path.join(root_dir, *path.split("/")))
+        if file_matcher is not None and not file_matcher.is_ignored(file_path, is_dir=False):
+            markdown_files.append(file_path)
     return markdown_files
 
 
-def get_markdown_files_from_args(paths: list[str], exclude: list[str] | None = None) -> list[str]:
-    """Retrieve all markdown files specified by the user."""
-    # Read additional exclusions from the ignore file
-    if exclude is None:
-        exclude = []
-    exclude += load_exclusion_patterns()
+def get_markdown_files_from_git(
+    root_dirs: list[str], exclude: list[str] | None = None
+) -> tuple[list[str], list[str]]:
+    """Find the Markdown files below directories from the git index instead of walking them.
+
+    Files ignored by git, e.g. build output and vendored dependencies, are never visited. Each
+    repository is listed once, and all its files are recorded in `path_index`, so local references
+    are checked against the files git knows about without touching the file system.
 
-    exclude_set = set(os.path.normpath(path) for path in exclude)
+    Returns the Markdown files found, and the directories outside of a git working tree, which are
+    left to be searched on disk.
+    """
+    matcher = IgnoreMatcher.from_patterns(exclude or [])
+    repositories: dict[str, list[str] | None] = {}
+    markdown_files: list[str] = []
+    not_in_git: list[str] = []
+
+    for root_dir in root_dirs:
+        repository_root = get_repository_root(root_dir)
+        if repository_root is not None and repository_root not in repositories:
+            start = time.perf_counter()
+            files = list_repository_files(repository_root)
+            if files is not None:
+                path_index.add_files(repository_root, files)
+                logger.info(
+                    f"Listed {len(files)} files of the git repository {repository_root} in "
+                    f"{time.perf_counter() - start:.3f}s."
+                )
+            repositories[repository_root] = files
+
+        files = repositories.get(repository_root) if repository_root is not None else None
+        if repository_root is None or files is None:
+            logger.warning(f"{root_dir} is not in a git repository, searching it on disk.")
+            not_in_git.append(root_dir)
+            continue
+        print(f"[+] Searching for markdown files in {os.path.abspath(root_dir)} with git ...")
+        markdown_files.extend(_select_markdown_files(root_dir, repository_root, files, matcher))
+
+    return markdown_files, not_in_git
+
+
+class ParallelWalker:
+    """Search directory trees for Markdown files on several threads.
+
+    Every thread works depth-first on a deque of directories of its own. A thread that runs out of
+    work steals the oldest directory of another thread, which is usually the root of a large subtree
+    that has not been entered yet, so the threads stay busy on unbalanced trees. Markdown files are
+    yielded as soon as they are found, while the walk goes on.
+    """
+
+    def __init__(self, threads: int, exclude: list[str] | None = None):
+        self.threads = threads
+        self.matcher = IgnoreMatcher.from_patterns(exclude or [])
+        self.stats = WalkStats()
+
+    def iter_markdown_files(self, root_dirs: list[str]) -> Iterator[str]:
+        """Yield the Markdown files below the given directories in the order they are found."""
+        # Directories to list, with the matcher for their entries
+        self._deques: list[deque[tuple[str, IgnoreMatcher]]] = [
+            deque() for _ in range(self.threads)
+        ]
+        self._pending = 0  # Directories queued or being listed
+        self._stopped = False
+        self._error: Exception | None = None  # First error of a thread, raised by the consumer
+        self._condition = threading.Condition()
+        found: queue.SimpleQueue[str | None] = queue.SimpleQueue()
+
+        for i, root_dir in enumerate(root_dirs):
+            if not self.matcher.is_ignored(root_dir, is_dir=True):
+                self._deques[i % self.threads].append((root_dir, self.matcher))
+                self._pending += 1
+
+        start = time.perf_counter()
+        workers = [
+            threading.Thread(target=self._work, args=(index, found), daemon=True)
+            for index in range(self.threads)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            finished = 0
+            while finished < len(workers):
+                file_path = found.get()
+                if file_path is None:
+                    finished += 1
+                else:
+                    yield file_path
+            if self._error is not None:
+                raise self._error
+        finally:
+            # Let the threads exit if the consumer stops early
+            with self._condition:
+                self._stopped = True
+                self._condition.notify_all()
+            for worker in workers:
+                worker.join()
+            self.stats.seconds = time.perf_counter() - start
+            logger.info(self.stats)
+
+    def _take(self, index: int) -> tuple[str, IgnoreMatcher] | None:
+        """Take the next directory of a thread, stealing one if it has none left.
+
+        Returns None once the walk is complete. Must be called with the condition held.
+        """
+        while not self._stopped:
+            own = self._deques[index]
+            if own:
+                return own.pop()
+            for other in self._deques:
+                if other:
+                    return other.popleft()
+            if self._pending == 0:
+                break
+            self._condition.wait()
+        return None
+
+    def _work(self, index: int, found: "queue.SimpleQueue[str | None]") -> None:
+        stats = WalkStats()
+        try:
+            while True:
+                with self._condition:
+                    task = self._take(index)
+                if task is None:
+                    break
+                try:
+                    subdirs, markdown_files = _scan_directory(*task, stats)
+                except Exception as error:
+                    # The directory is done, and the walk stops so the consumer can raise the error
+                    with self._condition:
+                        if self._error is None:
+                            self._error = error
+                        self._pending -= 1
+                        self._stopped = True
+                        self._condition.notify_all()
+                    break
+                for file_path in markdown_files:
+                    found.put(file_path)
+                with self._condition:
+                    self._deques[index].extend(reversed(subdirs))
+                    self._pending += len(subdirs) - 1
+                    if subdirs or self._pending == 0:
+                        self._condition.notify_all()
+        finally:
+            with self._condition:
+                self.stats.merge(stats)
+            found.put(None)
+
+
+def get_markdown_files_from_args(
+    paths: list[str], exclude: list[str] | None = None, use_git: bool = False
+) -> list[str]:
+    """Retrieve all markdown files specified by the user.
+
+    With `use_git`, directories in a git working tree are searched with `git ls-files` instead of
+    being walked.
+    """
+    # Read additional exclusions from the ignore file, leaving the list of the caller unchanged
+    exclude = [*(exclude or []), *load_exclusion_patterns()]
+
+    matcher = IgnoreMatcher.from_patterns(exclude)
     markdown_files = set()
+    root_dirs = []
 
     for path in paths:
         norm_path = os.path.normpath(path)
-        if norm_path in exclude_set:
+        if matcher.is_ignored(norm_path, is_dir=os.path.isdir(norm_path)):
             continue
         if os.path.isdir(norm_path):
-            markdown_files.update(get_markdown_files_from_dir(norm_path, exclude))
+            root_dirs.append(norm_path)
         elif os.path.isfile(norm_path):
             if norm_path.endswith(".md"):
                 markdown_files.add(norm_path)
         else:
             print(f"[!] Warning: {path} is not a valid file or directory.")
 
+    if use_git:
+        found, root_dirs = get_markdown_files_from_git(root_dirs, exclude)
+        markdown_files.update(found)
+    for root_dir in root_dirs:
+        markdown_files.update(get_markdown_files_from_dir(root_dir, exclude))
+
     return list(markdown_files)
 
 
+def get_directories_from_args(paths: list[str], exclude: list[str] | None = None) -> list[str]:
+    """Return the directories holding the files specified by the user, e.g. to watch them.
+
+    Directories are searched like they are for Markdown files, with the exclusions of the ignore
+    file, so excluded directories and the directories below them are left out. For a file, only its
+    own directory is returned.
+    """
+    matcher = IgnoreMatcher.from_patterns([*(exclude or []), *load_exclusion_patterns()])
+    directories: dict[str, None] = {}
+    stats = WalkStats()
+
+    for path in paths:
+        norm_path = os.path.normpath(path)
+        if matcher.is_ignored(norm_path, is_dir=os.path.isdir(norm_path)):
+            continue
+        if os.path.isfile(norm_path):
+            directories[os.path.dirname(norm_path) or os.curdir] = None
+            continue
+        stack = [(norm_path, matcher)] if os.path.isdir(norm_path) else []
+        while stack:
+            directory, dir_matcher = stack.pop()
+            directories[directory] = None
+            subdirs, _ = _scan_directory(directory, dir_matcher, stats)
+            stack.extend(subdirs)
+
+    return list(directories)
+
+
+def iter_markdown_files_from_args(
+    paths: list[str], exclude: list[str] | None = None, threads: int = 2
+) -> Iterator[str]:
+    """Yield the markdown files specified by the user as soon as they are found.
+
+    Directories are searched concurrently by a `ParallelWalker`, so the files can be parsed while
+    the walk goes on. Each file is yielded once, in no particular order.
+    """
+    # Read additional exclusions from the ignore file, leaving the list of the caller unchanged
+    exclude = [*(exclude or []), *load_exclusion_patterns()]
+
+    matcher = IgnoreMatcher.from_patterns(exclude)
+    seen: set[str] = set()
+    root_dirs = []
+
+    for path in paths:
+        norm_path = os.path.normpath(path)
+        if matcher.is_ignored(norm_path, is_dir=os.path.isdir(norm_path)):
+            continue
+        if os.path.isdir(norm_path):
+            print(f"[+] Searching for markdown files in {os.path.abspath(norm_path)} ...")
+            root_dirs.append(norm_path)
+        elif os.path.isfile(norm_path):
+            if norm_path.endswith(".md") and norm_path not in seen:
+                seen.add(norm_path)
+                yield norm_path
+        else:
+            print(f"[!] Warning: {path} is not a valid file or directory.")
+
+    for file_path in ParallelWalker(threads, exclude).iter_markdown_files(root_dirs):
+        if file_path not in seen:
+            seen.add(file_path)
+            yield file_path
+
+
 def print_green_background(text: str) -> str:
     return text if settings.no_color else f"\033[42m{text}\033[0m"
 
@@ -1,10 +1,15 @@
 import os
-import re
 import logging
 import requests
+from functools import lru_cache
+from typing import Callable, Iterable
+from urllib.parse import unquote
 
 from refcheck.settings import settings
-from refcheck.parsers import Reference
+from refcheck.parsers import Reference, ReferenceKind, TargetKind
+from refcheck.anchors import slugify
+from refcheck.store import document_store
+from refcheck.utils import path_index
 
 # Disable verify warnings for HTTPS requests
 requests.packages.urllib3.disable_warnings()  # type: ignore
@@ -29,20 +34,13 @@ def file_exists(origin_file_path: str, ref_file_path: str) -> bool:
     """Check if local file exists."""
     logger.info(f"Checking if file exists: {ref_file_path}")
 
-    file_exists = False
-
     if ref_file_path.startswith("\\"):
         # This seems to be an absolute windows path (e.g. \file.md) but it's actually a relative path to the
         # file where the reference was made in. (I know, strange that this is valid...)
         logger.info(
             "Seemingly absolute reference path starts with backslash. Treating as relative path ..."
         )
-        relative_ref = ref_file_path[1:]  # Remove leading backslash
-        logger.info(f"{ref_file_path} -> {relative_ref}")
-        if os.path.exists(relative_ref):
-            file_exists = True
-        else:
-            logger.info("File does not exist.")
+        file_exists = resolve_backslash_reference(ref_file_path) is not None
 
     elif ref_file_path.startswith("/"):
         # This is an absolute path. Some compilers (e.g. VS Code's MD compiler) allow absolute paths. If the user
@@ -58,58 +56,13 @@ def file_exists(origin_file_path: str, ref_file_path: str) -> bool:
             )
             return False
 
-        # First, test the file with the absolute path
-        logger.info("Checking if the file exists as an absolute path ...")
-        abs_ref_path = os.path.abspath(ref_file_path)
-        logger.info(f"-> '{abs_ref_path}'")
-        if os.path.exists(abs_ref_path):
-            file_exists = True
-        else:
-            logger.info("File does not exist as an absolute path.")
-
-            # Strip the leading slash to convert the path to a relative path
-            ref = ref_file_path[1:]
-
-            # Get the absolute path of the file where the reference was made in, e.g., C:/Users/user/repo/docs/file.md
-            absolute_file_path = os.path.abspath(origin_file_path)
-
-            # Check if the file exists relative to the file in which the reference was made in
-            logger.info(
-                "Checking if the path exists relative to the file in which the reference was made in ..."
-            )
-            abs_ref_path = os.path.join(os.path.dirname(absolute_file_path), ref)
-            logger.info(f"-> '{abs_ref_path}'.")
-
-            if os.path.exists(abs_ref_path):
-                file_exists = True
-            else:
-                # Traverse up the directory tree and test the relative path for each directory until we either
-                # find the file, or cannot go up any further.
-                logger.info(
-                    "File does not exists there. Moving up the directory tree to find the file ..."
-                )
-
-                starting_dir = os.path.dirname(absolute_file_path)
-                while True:
-                    parent_dir = os.path.dirname(starting_dir)
-                    abs_ref_path = os.path.join(parent_dir, ref)
-                    logger.info(f"-> {abs_ref_path}")
-                    if os.path.exists(abs_ref_path):
-                        file_exists = True
-                        break
-                    else:
-                        logger.info("File does not exist. Moving up the directory tree ...")
-                        if parent_dir == starting_dir:
-                            logger.info("Reached the root of the repository. Stopping search.")
-                            break
-
-                        starting_dir = parent_dir
+        origin_dir = os.path.dirname(origin_file_path)
+        file_exists = resolve_absolute_reference(origin_dir, ref_file_path) is not None
     else:
         # It is a simple relative path. Check if the file exists relative to the file in which the reference was made in
         ref_file_path = os.path.join(os.path.dirname(origin_file_path), ref_file_path)
         logger.info(f"Path to check: {ref_file_path}")
-        if os.path.exists(ref_file_path):
-            file_exists = True
+        file_exists = path_index.exists(ref_file_path)
 
     if file_exists:
         logger.info("File exists!")
@@ -119,29 +72,113 @@ def file_exists(origin_file_path: str, ref_file_path: str) -> bool:
         return False
 
 
+# Absolute directory -> the directory its absolute references were last found relative to
+_workspace_roots: dict[str, str] = {}
+
+
+@lru_cache(maxsize=None)
+def resolve_backslash_reference(ref_file_path: str) -> str | None:
+    """Resolve a backslash-prefixed reference, returning the path it exists at or None."""
+    relative_ref = ref_file_path[1:]  # Remove leading backslash
+    logger.info(f"{ref_file_path} -> {relative_ref}")
+    return relative_ref if path_index.exists(relative_ref) else None
+
+
+@lru_cache(maxsize=None)
+def resolve_absolute_reference(origin_dir: str, ref_file_path: str) -> str | None:
+    """Resolve an absolute reference made in `origin_dir`, returning the path it exists at or None.
+
+    Results are memoized per origin directory and reference, as all files in a directory resolve a
+    reference the same way. Once a reference is found relative to a directory above the origin, that
+    directory is cached as the workspace root of the origin directory and tried first for the next
+    references, so the tree is only traversed once per directory.
+    """
+    # First, test the file with the absolute path
+    logger.info("Checking if the file exists as an absolute path ...")
+    abs_ref_path = os.path.abspath(ref_file_path)
+    logger.info(f"-> '{abs_ref_path}'")
+    if path_index.exists(abs_ref_path):
+        return abs_ref_path
+    logger.info("File does not exist as an absolute path.")
+
+    # Strip the leading slash to convert the path to a relative path
+    ref = ref_file_path[1:]
+
+    # Get the absolute path of the directory of the file where the reference was made in, e.g.,
+    # C:/Users/user/repo/docs
+    starting_dir = os.path.abspath(origin_dir)
+
+    workspace_root = _workspace_roots.get(starting_dir)
+    if workspace_root is not None:
+        abs_ref_path = os.path.join(workspace_root, ref)
+        logger.info(f"Checking relative to the cached workspace root -> '{abs_ref_path}'")
+        if path_index.exists(abs_ref_path):
+            return abs_ref_path
+
+    # Check if the file exists relative to the file in which the reference was made in
+    logger.info(
+        "Checking if the path exists relative to the file in which the reference was made in ..."
+    )
+    abs_ref_path = os.path.join(starting_dir, ref)
+    logger.info(f"-> '{abs_ref_path}'.")
+    if path_index.exists(abs_ref_path):
+        return abs_ref_path
+
+    # Traverse up the directory tree and test the relative path for each directory until we either
+    # find the file, or cannot go up any further.
+    logger.info("File does not exists there. Moving up the directory tree to find the file ...")
+    current_dir = starting_dir
+    while True:
+        parent_dir = os.path.dirname(current_dir)
+        if parent_dir != workspace_root:  # Already checked
+            abs_ref_path = os.path.join(parent_dir, ref)
+            logger.info(f"-> {abs_ref_path}")
+            if path_index.exists(abs_ref_path):
+                _workspace_roots[starting_dir] = parent_dir
+                return abs_ref_path
+
+        logger.info("File does not exist. Moving up the directory tree ...")
+        if parent_dir == current_dir:
+            logger.info("Reached the root of the repository. Stopping search.")
+            return None
+        current_dir = parent_dir
+
+
+def clear_resolution_caches() -> None:
+    """Forget all memoized reference resolutions, e.g. when the file system changed."""
+    resolve_backslash_reference.cache_clear()
+    resolve_absolute_reference.cache_clear()
+    _workspace_roots.clear()
+
+
 def _header_exists(file_path: str, header: str) -> bool:
     """Check if Markdown header exists in the given file."""
-    try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            content = file.read()
-            normalized_header = _normalize_header(header)
-            normalized_headers = [
-                _normalize_header(h) for h in re.findall(r"^#{1,6}\s+(.*)", content, re.MULTILINE)
-            ]
-            if normalized_header in normalized_headers:
-                return True
-    except FileNotFoundError:
+    document = document_store.get(file_path)
+    if document is None:
         logger.error(f"File not found: {file_path}")
-    return False
+        return False
+    # Fragments may be percent-encoded, e.g. non-ASCII headers, or written like the header itself
+    fragment = unquote(header)
+    return (
+        fragment in document.anchors
+        or slugify(fragment, document_store.anchor_style) in document.anchors
+    )
 
 
-def _normalize_header(header: str) -> str:
-    """Normalize header to match Markdown link format."""
-    return re.sub(
-        r"[^a-zA-Z0-9 -]",
-        "",
-        header.strip().lower().replace("_", " ").replace(" ", "-"),
-    )
+def get_target_key(ref: Reference) -> tuple[str, str] | None:
+    """Return the normalized (target path, fragment) of a local reference.
+
+    References with the same key are valid or broken alike, wherever they were made. The fragment
+    of assets is not checked, so it is left out of their key. Returns None for absolute and
+    backslash-prefixed references, whose resolution depends on the settings and is memoized
+    separately.
+    """
+    fragment = "" if ref.target is TargetKind.ASSET else ref.fragment
+    if ref.target is TargetKind.SAME_FILE_ANCHOR:
+        return os.path.normpath(ref.file_path), fragment
+    if ref.path.startswith(("/", "\\")):
+        return None
+    return os.path.normpath(os.path.join(os.path.dirname(ref.file_path), ref.path)), fragment
 
 
 def is_valid_markdown_reference(ref: Reference) -> bool:
@@ -153,35 +190,120 @@ def is_valid_markdown_reference(ref: Reference) -> bool:
     Returns:
         bool: True if the reference is valid and reachable, False otherwise.
     """
-    if ref.link.startswith("#"):
+    if ref.target is TargetKind.SAME_FILE_ANCHOR:
+        # Skip the existence check, the file the reference was made in exists
         logger.info("Reference is a header in the same Markdown file.")
-        referenced_header = ref.link[1:]  # Remove leading `#`
-        target_path = ref.file_path
-    elif "#" in ref.link:
-        logger.info("Reference is a header in another Markdown file.")
-        referenced_file, referenced_header = ref.link.split("#", 1)
-        target_path = referenced_file
+        target_path: str | None = ref.file_path
     else:
-        # Reference is a Markdown file
-        referenced_file = ref.link
-        referenced_header = None
-        target_path = referenced_file
-
-    # Check if the referenced file exists
-    if not ref.link.startswith(
-        "#"
-    ):  # Skip if the reference is a header in the same file because the file exists
-        if not file_exists(ref.file_path, target_path):
+        if ref.fragment:
+            logger.info("Reference is a header in another Markdown file.")
+        if not file_exists(ref.file_path, ref.path):
             return False
-        # Resolve the absolute path for header checking
-        abs_target_path = os.path.join(os.path.dirname(ref.file_path), target_path)
-    else:
-        # For same-file references, use the origin file path
-        abs_target_path = ref.file_path
+        # Look for the header in the file that was found, e.g. for absolute references
+        target_path, _ = _locate_target(ref.file_path, ref.path)
 
     # Check if the referenced header exists
-    if referenced_header and not _header_exists(abs_target_path, referenced_header):
-        logger.error(f"Referenced header does not exist in {abs_target_path}: {referenced_header}")
+    if ref.fragment and (target_path is None or not _header_exists(target_path, ref.fragment)):
+        logger.error(f"Referenced header does not exist in {target_path}: {ref.fragment}")
         return False
 
     return True
+
+
+def is_valid_asset_reference(ref: Reference) -> bool:
+    """Check if the file a reference to a local asset, e.g. an image, points to exists.
+
+    Fragments of assets, e.g. `file.pdf#page=2`, are not checked.
+    """
+    return file_exists(ref.file_path, ref.path)
+
+
+# How local references are validated, by the kind of their target
+LOCAL_VALIDATORS: dict[TargetKind, Callable[[Reference], bool]] = {
+    TargetKind.SAME_FILE_ANCHOR: is_valid_markdown_reference,
+    TargetKind.MARKDOWN: is_valid_markdown_reference,
+    TargetKind.ASSET: is_valid_asset_reference,
+}
+
+
+def validate_local_reference(ref: Reference) -> bool:
+    """Validate a local reference with the validator for the kind of its target."""
+    return LOCAL_VALIDATORS[ref.target](ref)
+
+
+def _locate_target(origin_file_path: str, ref_file_path: str) -> tuple[str | None, bool]:
+    """Return the path a reference to a local file points to, and whether it is known to exist.
+
+    Backslash-prefixed and absolute references are searched for, so their path is None if they
+    were not found. Relative references are only joined to the directory of the origin file.
+    """
+    if not ref_file_path:
+        return os.path.normpath(origin_file_path), False
+    if ref_file_path.startswith("\\"):
+        resolved = resolve_backslash_reference(ref_file_path)
+        return (os.path.normpath(resolved) if resolved else None), True
+    if ref_file_path.startswith("/"):
+        if not settings.allow_absolute:
+            logger.warning(
+                "Absolute references are not allowed. Use the --allow-absolute flag to allow them."
+            )
+            return None, True
+        resolved = resolve_absolute_reference(os.path.dirname(origin_file_path), ref_file_path)
+        return (os.path.normpath(resolved) if resolved else None), True
+    return os.path.normpath(os.path.join(os.path.dirname(origin_file_path), ref_file_path)), False
+
+
+def validate_references(references: Iterable[Reference]) -> list[bool]:
+    """Validate many references at once, grouped by the file they target.
+
+    Every target file is checked for existence once and its anchors are loaded once, however many
+    references point to it, and every (file, fragment) pair is looked up once. Fragments of assets
+    are not checked. Remote references are checked once per URL. Links with other schemes, e.g.
+    `mailto:`, cannot be checked and count as valid, while reference-style links with an undefined
+    label are invalid.
+
+    Args:
+        references: References to validate, e.g. all references of a run.
+
+    Returns:
+        list[bool]: The verdict for each reference, in the order of the references.
+    """
+    references = list(references)
+    verdicts = [False] * len(references)
+    remote_verdicts: dict[str, bool] = {}
+    # Target file -> fragment -> indices of the references to it
+    targets: dict[str, dict[str, list[int]]] = {}
+    resolved: set[str] = set()
+
+    for i, ref in enumerate(references):
+        if ref.kind is ReferenceKind.REFERENCE_LINK:
+            continue
+        if ref.target is TargetKind.OTHER_SCHEME:
+            verdicts[i] = True
+            continue
+        if ref.target is TargetKind.REMOTE:
+            if ref.link not in remote_verdicts:
+                remote_verdicts[ref.link] = is_valid_remote_reference(ref.link)
+            verdicts[i] = remote_verdicts[ref.link]
+            continue
+
+        fragment = "" if ref.target is TargetKind.ASSET else ref.fragment
+        target_path, exists = _locate_target(ref.file_path, ref.path)
+        if target_path is None:
+            continue
+        if exists:
+            resolved.add(target_path)
+        targets.setdefault(target_path, {}).setdefault(fragment, []).append(i)
+
+    logger.info(f"Validating {len(references)} references to {len(targets)} target files.")
+    for target_path, fragments in targets.items():
+        if target_path not in resolved and not path_index.exists(target_path):
+            logger.info(f"File does not exist: {target_path}")
+            continue
+        for fragment, indices in fragments.items():
+            is_valid = not fragment or _header_exists(target_path, fragment)
+            if not is_valid:
+                logger.error(f"Referenced header does not exist in {target_path}: {fragment}")
+            for i in indices:
+                verdicts[i] = is_valid
+    return verdicts
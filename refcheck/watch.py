@@ -0,0 +1,253 @@
+import os
+import sys
+import time
+import errno
+import ctypes
+import select
+import struct
+import logging
+from typing import Iterable
+
+from refcheck.graph import ReferenceGraph
+
+logger = logging.getLogger()
+
+# Seconds between two scans of the polling watcher
+POLL_INTERVAL = 1.0
+# Seconds without new events after which a burst of events, e.g. an editor saving a file, is over
+DEBOUNCE_SECONDS = 0.1
+
+# inotify event flags, from <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+# Files are reported once they are written and closed, not on every write
+WATCH_MASK = (
+    IN_CLOSE_WRITE
+    | IN_ATTRIB
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+
+# struct inotify_event: int wd; uint32_t mask, cookie, len; followed by a name of len bytes
+EVENT_HEADER = struct.Struct("iIII")
+EVENT_BUFFER_SIZE = 64 * 1024
+
+
+class PollingWatcher:
+    """Detects changes by comparing the size and modification time of files between two scans.
+
+    Each scan lists the watched directories, so it works on every system, at the cost of a
+    listing per directory every `interval` seconds. Directories are only reported when they are
+    created or deleted, not when their content changes.
+    """
+
+    name = "polling"
+
+    def __init__(self, directories: Iterable[str], interval: float = POLL_INTERVAL):
+        self.interval = interval
+        self.set_directories(directories)
+
+    def set_directories(self, directories: Iterable[str]) -> None:
+        """Watch the files directly in these directories, instead of the previous ones."""
+        self.directories = sorted({os.path.abspath(directory) for directory in directories})
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        """Return the modification time and size of each entry of the watched directories."""
+        snapshot = {}
+        for directory in self.directories:
+            try:
+                with os.scandir(directory) as iterator:
+                    for entry in iterator:
+                        try:
+                            if entry.is_dir():
+                                snapshot[entry.path] = (-1, -1)
+                            else:
+                                stat = entry.stat()
+                                snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                        except OSError:
+                            continue
+            except OSError:
+                # Deleted since it was watched, which its parent reports
+                continue
+        return snapshot
+
+    def wait_for_changes(self, timeout: float | None = None) -> set[str] | None:
+        """Block until files change and return their absolute paths.
+
+        Returns an empty set if nothing changed within `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # Scan before sleeping, so that a timeout of 0 returns the changes right away
+            snapshot = self._scan()
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed:
+                return changed
+            if deadline is None:
+                time.sleep(self.interval)
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self) -> None:
+        """Stop watching."""
+        self.directories = []
+        self._snapshot = {}
+
+
+class InotifyWatcher:
+    """Detects changes with the inotify API of Linux, called through ctypes.
+
+    The kernel reports changes to the watched directories as they happen, so nothing is scanned
+    while waiting. inotify does not watch subdirectories, so each directory is watched on its own.
+    """
+
+    name = "inotify"
+
+    def __init__(self, directories: Iterable[str]):
+        libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self._libc = libc
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        # Watch descriptor -> absolute path of the directory, and the other way around
+        self._watches: dict[int, str] = {}
+        self._descriptors: dict[str, int] = {}
+        self.set_directories(directories)
+
+    @property
+    def directories(self) -> list[str]:
+        return sorted(self._descriptors)
+
+    def set_directories(self, directories: Iterable[str]) -> None:
+        """Watch the files directly in these directories, instead of the previous ones."""
+        wanted = {os.path.abspath(directory) for directory in directories}
+        for path in set(self._descriptors) - wanted:
+            descriptor = self._descriptors.pop(path)
+            self._watches.pop(descriptor, None)
+            self._libc.inotify_rm_watch(self._fd, descriptor)
+        for path in sorted(wanted - set(self._descriptors)):
+            self._add_watch(path)
+
+    def _add_watch(self, path: str) -> None:
+        descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if descriptor < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                logger.warning(
+                    f"Could not watch {path}: too many watched directories, see "
+                    "/proc/sys/fs/inotify/max_user_watches."
+                )
+            else:
+                logger.info(f"Could not watch {path}: {os.strerror(error)}")
+            return
+        self._watches[descriptor] = path
+        self._descriptors[path] = descriptor
+
+    def wait_for_changes(self, timeout: float | None = None) -> set[str] | None:
+        """Block until files change and return their absolute paths.
+
+        Returns an empty set if nothing changed within `timeout` seconds, and None if the kernel
+        dropped events, so that the changes are unknown.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        changed: set[str] = set()
+        overflow = False
+        # Saving a file takes several events, e.g. writing a temporary file and renaming it
+        while readable:
+            overflow |= self._read_events(changed)
+            readable, _, _ = select.select([self._fd], [], [], DEBOUNCE_SECONDS)
+        return None if overflow else changed
+
+    def _read_events(self, changed: set[str]) -> bool:
+        """Add the paths of the pending events, returning whether the kernel dropped events."""
+        try:
+            data = os.read(self._fd, EVENT_BUFFER_SIZE)
+        except BlockingIOError:
+            return False
+
+        overflow = False
+        offset = 0
+        while offset < len(data):
+            descriptor, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            if mask & IN_IGNORED:
+                # The directory was deleted, or is no longer watched
+                path = self._watches.pop(descriptor, None)
+                if path is not None:
+                    self._descriptors.pop(path, None)
+                continue
+            directory = self._watches.get(descriptor)
+            if directory is not None:
+                changed.add(os.path.join(directory, os.fsdecode(name)) if name else directory)
+        return overflow
+
+    def close(self) -> None:
+        """Stop watching."""
+        os.close(self._fd)
+        self._watches.clear()
+        self._descriptors.clear()
+
+
+Watcher = InotifyWatcher | PollingWatcher
+
+
+def create_watcher(directories: Iterable[str]) -> Watcher:
+    """Return an inotify watcher where the system has one, and a polling watcher otherwise."""
+    directories = list(directories)
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directories)
+        except OSError as e:
+            logger.info(f"Could not use inotify, polling for changes instead: {e}")
+    return PollingWatcher(directories)
+
+
+def select_rechecked_files(
+    markdown_files: list[str], graph: ReferenceGraph, changed_paths: set[str]
+) -> list[str]:
+    """Return the Markdown files that changed, or that link to a changed path.
+
+    Unlike changes since a commit, a file created while watching can fix links as well as a deleted
+    one can break them, so files linking to any changed path are checked again. Links to the
+    directory of a changed path are found from its parent directory.
+    """
+    targets = set(changed_paths)
+    targets.update(os.path.dirname(path) for path in changed_paths)
+
+    affected = set(changed_paths)
+    for target in targets:
+        affected.update(os.path.abspath(path) for path in graph.get_referrers(target))
+    return [file for file in markdown_files if os.path.abspath(file) in affected]
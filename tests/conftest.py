@@ -1,9 +1,33 @@
 """Shared test fixtures and mocks for RefCheck tests."""
 
+import shutil
+import subprocess
+
 import pytest
 import requests
 from unittest import mock
 
+from refcheck.store import document_store
+from refcheck.utils import path_index
+from refcheck.validators import clear_resolution_caches
+
+
+# ============================================================================
+# Run-scoped Caches
+# ============================================================================
+
+
+@pytest.fixture(autouse=True)
+def clear_run_caches():
+    """Clear the caches that live for a whole run, so tests do not see each other's files."""
+    document_store.reset()
+    path_index.clear()
+    clear_resolution_caches()
+    yield
+    document_store.reset()
+    path_index.clear()
+    clear_resolution_caches()
+
 
 # ============================================================================
 # Settings Fixtures
@@ -193,6 +217,37 @@ def temp_directory_structure(tmp_path):
     return _create_structure
 
 
+@pytest.fixture
+def git_command():
+    """Run git commands in a repository, failing the test if they fail."""
+
+    def _run(root, *args):
+        subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+            cwd=root,
+            check=True,
+            capture_output=True,
+        )
+
+    return _run
+
+
+@pytest.fixture
+def git_repository(temp_directory_structure, git_command):
+    """Create a git repository with a directory structure as its first commit."""
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+
+    def _create_repository(structure: dict):
+        root = temp_directory_structure(structure)
+        git_command(root, "init", "-q", "-b", "main")
+        git_command(root, "add", ".")
+        git_command(root, "commit", "-q", "-m", "Initial commit")
+        return root
+
+    return _create_repository
+
+
 @pytest.fixture
 def mock_refcheckignore_exists():
     """Mock .refcheckignore file existence."""
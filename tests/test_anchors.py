@@ -0,0 +1,84 @@
+"""Tests for refcheck.anchors module."""
+
+import mmap
+
+import pytest
+
+from refcheck.anchors import AnchorStyle, Slugger, extract_anchors, slugify
+
+
+class TestSlugify:
+    """Tests for slugify function."""
+
+    @pytest.mark.parametrize(
+        "text, github, gitlab",
+        [
+            ("Getting Started", "getting-started", "getting-started"),
+            ("API: v2.0 (beta)!", "api-v20-beta", "api-v20-beta"),
+            ("snake_case_name", "snake_case_name", "snake_case_name"),
+            ("Über die Straße", "über-die-straße", "über-die-straße"),
+            ("A -- B", "a----b", "a-b"),
+            ("  Padded  ", "padded", "padded"),
+        ],
+    )
+    def test_slugify_styles(self, text, github, gitlab):
+        """Test the GitHub and GitLab slug rules."""
+        assert slugify(text, AnchorStyle.GITHUB) == github
+        assert slugify(text, AnchorStyle.GITLAB) == gitlab
+
+
+class TestSlugger:
+    """Tests for Slugger class."""
+
+    def test_duplicates_are_numbered(self):
+        """Test that duplicate headings get -1, -2, ... suffixes."""
+        slugger = Slugger()
+        assert [slugger.slug("Intro") for _ in range(3)] == ["intro", "intro-1", "intro-2"]
+
+    def test_suffix_taken_by_another_heading(self):
+        """Test that suffixes already used by other headings are skipped."""
+        slugger = Slugger()
+        assert [slugger.slug(text) for text in ["Intro", "Intro 1", "Intro"]] == [
+            "intro",
+            "intro-1",
+            "intro-2",
+        ]
+
+
+class TestExtractAnchors:
+    """Tests for extract_anchors function."""
+
+    def test_atx_and_setext_headings(self):
+        """Test that both heading syntaxes define anchors."""
+        content = b"# Title #\n\nSub Title\n---------\n\nMulti\nLine\n=====\n"
+        assert extract_anchors(content) == {"title", "sub-title", "multi-line"}
+
+    def test_headings_in_fenced_code_are_ignored(self):
+        """Test that headings and HTML in fenced code blocks define no anchors."""
+        content = b"````\n# Shell comment\n```\n<a id='x'></a>\n````\n~~~\n# Other\n~~~\n# Real\n"
+        assert extract_anchors(content) == {"real"}
+
+    def test_thematic_breaks_are_no_setext_headings(self):
+        """Test that `---` after lists, blank lines and front matter is not a heading."""
+        content = b"---\ntitle: Page\n---\n\n- item\n  continued\n---\n\n---\n"
+        assert extract_anchors(content) == set()
+
+    def test_inline_markup_in_headings(self):
+        """Test that links and HTML tags in headings are reduced to their text."""
+        content = b"## See [the guide](guide.md) for <em>more</em>\n"
+        assert extract_anchors(content) == {"see-the-guide-for-more"}
+
+    def test_explicit_ids_and_html_anchors(self):
+        """Test that explicit heading ids and HTML id/name attributes define anchors."""
+        content = b'## Install {#setup}\n<a name="old-install"></a>\n<div id="box"></div>\n'
+        assert extract_anchors(content) == {"setup", "old-install", "box"}
+
+    def test_memory_mapped_content(self, tmp_path):
+        """Test that anchors are extracted from memory-mapped files, too."""
+        file_path = tmp_path / "doc.md"
+        file_path.write_bytes(b"# One\r\n\r\nTwo\r\n===\r\n")
+        with (
+            open(file_path, "rb") as file,
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer,
+        ):
+            assert extract_anchors(buffer) == {"one", "two"}
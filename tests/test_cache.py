@@ -0,0 +1,113 @@
+"""Tests for refcheck.cache module."""
+
+import os
+import time
+from unittest import mock
+
+import pytest
+
+from refcheck.anchors import AnchorStyle
+from refcheck.cache import CACHE_FILE, IndexCache, content_hash, get_fingerprint
+from refcheck.parsers import MarkdownParser, ReferenceKind
+from refcheck.store import DocumentStore
+
+FINGERPRINT = get_fingerprint(MarkdownParser(), AnchorStyle.GITHUB)
+
+
+def write_file(path, content, age=60):
+    """Write a file with a modification time in the past, so the cache trusts it."""
+    path.write_text(content, encoding="utf-8")
+    past = time.time() - age
+    os.utime(path, (past, past))
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = IndexCache.open(FINGERPRINT, str(tmp_path / "cache"))
+    yield cache
+    cache.close()
+
+
+class TestIndexCache:
+    """Tests for IndexCache class."""
+
+    def test_open_creates_ignored_directory(self, tmp_path):
+        """Test that the cache directory is created and ignored by git."""
+        IndexCache.open(FINGERPRINT, str(tmp_path / "cache")).close()
+        assert (tmp_path / "cache" / CACHE_FILE).is_file()
+        assert "*" in (tmp_path / "cache" / ".gitignore").read_text(encoding="utf-8")
+
+    def test_documents_are_reused_while_unchanged(self, tmp_path):
+        """Test that documents are reused across runs until their file changes."""
+        file_path = write_file(tmp_path / "doc.md", "# Title\n[a](b.md)\n[c][d]\n")
+        store = DocumentStore(cache=IndexCache.open(FINGERPRINT, str(tmp_path / "cache")))
+        document = store.get(file_path)
+        store.cache.close()
+
+        store = DocumentStore(cache=IndexCache.open(FINGERPRINT, str(tmp_path / "cache")))
+        with mock.patch.object(store.parser, "open_buffer", side_effect=AssertionError("read")):
+            cached = store.get(file_path)
+        assert cached == document
+        assert cached.references[1].kind is ReferenceKind.REFERENCE_LINK
+        assert store.cache.stats.reused_documents == 1
+
+        write_file(tmp_path / "doc.md", "# Other\n")
+        store.reset(cache=store.cache)
+        assert store.get(file_path).anchors == {"other"}
+        store.cache.close()
+
+    def test_same_content_is_not_parsed_again(self, tmp_path, cache):
+        """Test that a file touched without changing its content is read but not parsed."""
+        file_path = write_file(tmp_path / "doc.md", "# Title\n")
+        DocumentStore(cache=cache).get(file_path)
+
+        write_file(tmp_path / "doc.md", "# Title\n", age=30)
+        assert cache.load_document(file_path) is None
+        store = DocumentStore(cache=cache)
+        with mock.patch.object(store.parser, "iter_references_in_buffer") as parse:
+            assert store.get(file_path).anchors == {"title"}
+        parse.assert_not_called()
+        # The new modification time is recorded
+        assert cache.load_document(file_path) is not None
+
+    def test_recently_modified_files_are_compared_by_content(self, tmp_path, cache):
+        """Test that files modified right before they were read are not trusted by their time."""
+        file_path = str(tmp_path / "doc.md")
+        (tmp_path / "doc.md").write_text("# Title\n", encoding="utf-8")
+        DocumentStore(cache=cache).get(file_path)
+
+        assert cache.load_document(file_path) is None
+        assert cache.load_document(file_path, content_hash(b"# Title\n")) is not None
+
+    def test_verdicts_depend_on_their_target(self, tmp_path, cache):
+        """Test that verdicts are reused until their target is created, deleted or changed."""
+        target = write_file(tmp_path / "target.md", "# Setup\n")
+        image = str(tmp_path / "image.png")
+        store = DocumentStore(cache=cache)
+        store.get(target)
+
+        cache.store_verdict((target, "setup"), True)
+        cache.store_verdict((image, ""), False)
+        assert cache.load_verdict((target, "setup")) is True
+        assert cache.load_verdict((image, "")) is False
+        assert cache.load_verdict((target, "other")) is None
+
+        write_file(tmp_path / "image.png", "")
+        assert cache.load_verdict((image, "")) is None
+        write_file(tmp_path / "target.md", "# Install\n")
+        assert cache.load_verdict((target, "setup")) is None
+        os.remove(target)
+        assert cache.load_verdict((target, "setup")) is None
+
+    def test_configuration_change_discards_cache(self, tmp_path):
+        """Test that documents extracted with another configuration are not reused."""
+        file_path = write_file(tmp_path / "doc.md", "# A -- B\n")
+        cache = IndexCache.open(FINGERPRINT, str(tmp_path / "cache"))
+        DocumentStore(cache=cache).get(file_path)
+        cache.close()
+
+        fingerprint = get_fingerprint(MarkdownParser(), AnchorStyle.GITLAB)
+        cache = IndexCache.open(fingerprint, str(tmp_path / "cache"))
+        assert cache.load_document(file_path) is None
+        cache.close()
@@ -21,6 +21,18 @@ class TestGetCommandLineArguments:
             assert args.no_color is False
             assert args.verbose is False
             assert args.allow_absolute is False
+            assert args.html_links is False
+            assert args.html_images is False
+            assert args.raw_links is False
+            assert args.anchor_style == "github"
+            assert args.fs_snapshot is False
+            assert args.io_threads == 1
+            assert args.git is False
+            assert args.changed_since is None
+            assert args.incremental is False
+            assert args.watch is False
+            assert args.daemon is False
+            assert args.processes == 1
 
     def test_cli_multiple_files(self):
         """Test CLI with multiple files."""
@@ -100,6 +112,79 @@ class TestGetCommandLineArguments:
             args = get_command_line_arguments()
             assert args.allow_absolute is True
 
+    def test_cli_reference_kind_flags(self):
+        """Test CLI with the flags enabling additional reference kinds."""
+        test_args = ["refcheck", "file.md", "--html-links", "--html-images", "--raw-links"]
+        with mock.patch.object(sys, "argv", test_args):
+            args = get_command_line_arguments()
+            assert args.html_links is True
+            assert args.html_images is True
+            assert args.raw_links is True
+
+    def test_cli_fs_snapshot(self):
+        """Test CLI with --fs-snapshot flag."""
+        test_args = ["refcheck", "docs/", "--fs-snapshot"]
+        with mock.patch.object(sys, "argv", test_args):
+            args = get_command_line_arguments()
+            assert args.fs_snapshot is True
+
+    def test_cli_git(self):
+        """Test CLI with --git flag."""
+        test_args = ["refcheck", "docs/", "--git"]
+        with mock.patch.object(sys, "argv", test_args):
+            args = get_command_line_arguments()
+            assert args.git is True
+
+    def test_cli_changed_since_and_incremental(self):
+        """Test CLI with --changed-since and --incremental options."""
+        test_args = ["refcheck", "docs/", "--changed-since", "origin/main", "--incremental"]
+        with mock.patch.object(sys, "argv", test_args):
+            args = get_command_line_arguments()
+            assert args.changed_since == "origin/main"
+            assert args.incremental is True
+
+    def test_cli_watch(self):
+        """Test CLI with --watch flag."""
+        test_args = ["refcheck", "docs/", "--watch"]
+        with mock.patch.object(sys, "argv", test_args):
+            args = get_command_line_arguments()
+            assert args.watch is True
+
+    def test_cli_daemon(self):
+        """Test CLI with --daemon flag."""
+        test_args = ["refcheck", "docs/", "--daemon"]
+        with mock.patch.object(sys, "argv", test_args):
+            args = get_command_line_arguments()
+            assert args.daemon is True
+
+    def test_cli_processes(self):
+        """Test CLI with the --processes option."""
+        test_args = ["refcheck", "docs/", "--processes", "4"]
+        with mock.patch.object(sys, "argv", test_args):
+            args = get_command_line_arguments()
+            assert args.processes == 4
+
+    def test_cli_anchor_style(self):
+        """Test CLI with the --anchor-style option."""
+        test_args = ["refcheck", "file.md", "--anchor-style", "gitlab"]
+        with mock.patch.object(sys, "argv", test_args):
+            args = get_command_line_arguments()
+            assert args.anchor_style == "gitlab"
+
+    def test_cli_io_threads(self):
+        """Test CLI with the --io-threads option."""
+        test_args = ["refcheck", "file.md", "--io-threads", "8"]
+        with mock.patch.object(sys, "argv", test_args):
+            args = get_command_line_arguments()
+            assert args.io_threads == 8
+
+    @pytest.mark.parametrize("value", ["0", "-2", "many"])
+    def test_cli_io_threads_invalid(self, value):
+        """Test that --io-threads only accepts positive integers."""
+        test_args = ["refcheck", "file.md", "--io-threads", value]
+        with mock.patch.object(sys, "argv", test_args), pytest.raises(SystemExit):
+            get_command_line_arguments()
+
     def test_cli_all_flags_combined(self):
         """Test CLI with all flags combined."""
         test_args = [
@@ -0,0 +1,51 @@
+"""Tests for refcheck.client module."""
+
+import sys
+from unittest import mock
+
+import pytest
+
+from refcheck import client
+
+
+def run_client(args, response, check_result=True):
+    """Run the client with a response of the daemon, returning its exit code and request."""
+    with (
+        mock.patch.object(sys, "argv", ["refcheck-client", *args]),
+        mock.patch("refcheck.client.send_request", return_value=response) as send_request,
+        mock.patch("refcheck.main.main", return_value=check_result) as check,
+    ):
+        with pytest.raises(SystemExit) as exit_info:
+            client.main()
+    return exit_info.value.code, send_request.call_args.args[1], check.called
+
+
+class TestClient:
+    """Tests for the client of the daemon."""
+
+    def test_request(self, capsys):
+        """Test that the paths and options are sent, and the output of the daemon printed."""
+        code, request, checked = run_client(
+            ["docs", "--no-color"], {"ok": False, "output": "1 broken references found\n"}
+        )
+        assert code == 1
+        assert not checked
+        assert request["paths"] == ["docs"]
+        assert request["options"]["no_color"] is True
+        assert "watch" not in request["options"]
+        assert capsys.readouterr().out == "1 broken references found\n"
+
+    def test_no_daemon(self):
+        """Test that files are checked in the process of the client without a daemon."""
+        code, _, checked = run_client(["docs"], None)
+        assert code == 0
+        assert checked
+
+    def test_daemon_error(self, capsys):
+        """Test that files are checked in the process of the client if the daemon refuses."""
+        code, _, checked = run_client(
+            ["docs"], {"error": "The daemon was started with other options."}, False
+        )
+        assert code == 1
+        assert checked
+        assert "other options. Checking without the daemon." in capsys.readouterr().err
@@ -0,0 +1,107 @@
+"""Tests for refcheck.daemon module."""
+
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from refcheck.daemon import get_socket_path, send_request, serve
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return get_socket_path(str(tmp_path))
+
+
+@pytest.fixture
+def start_server(socket_path):
+    """Serve requests in a thread with a handler, until the end of the test."""
+    threads = []
+
+    def handle_or_stop(handle):
+        def handle_request(request):
+            if request.get("stop"):
+                raise KeyboardInterrupt
+            return handle(request)
+
+        return handle_request
+
+    def _start(handle):
+        def run():
+            try:
+                serve(socket_path, handle_or_stop(handle))
+            except KeyboardInterrupt:
+                pass
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        threads.append(thread)
+        # Wait until the daemon accepts connections
+        for _ in range(100):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                if probe.connect_ex(socket_path) == 0:
+                    break
+            time.sleep(0.01)
+
+    yield _start
+
+    for thread in threads:
+        send_request(socket_path, {"stop": True})
+        thread.join()
+
+
+class TestDaemon:
+    """Tests for the requests and responses between the client and the daemon."""
+
+    def test_request_and_response(self, socket_path, start_server):
+        """Test that each request gets the response of the handler."""
+        start_server(lambda request: {"paths": request["paths"][::-1]})
+
+        assert send_request(socket_path, {"paths": ["a.md", "b.md"]}) == {"paths": ["b.md", "a.md"]}
+        assert send_request(socket_path, {"paths": []}) == {"paths": []}
+
+    def test_socket_removed_when_stopped(self, socket_path, start_server):
+        """Test that the socket is removed when the daemon stops."""
+        start_server(lambda request: {})
+        assert os.path.exists(socket_path)
+
+        send_request(socket_path, {"stop": True})
+        for _ in range(100):
+            if not os.path.exists(socket_path):
+                break
+            time.sleep(0.01)
+        assert not os.path.exists(socket_path)
+
+    def test_invalid_request(self, socket_path, start_server):
+        """Test that a request that is not a JSON object gets an error."""
+        start_server(lambda request: {})
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(socket_path)
+            connection.sendall(b"[1, 2")
+            connection.shutdown(socket.SHUT_WR)
+            assert b"not a JSON object" in connection.recv(1024)
+
+    def test_no_daemon(self, socket_path, start_server):
+        """Test that no response is returned without a daemon, or with a stale socket."""
+        assert send_request(socket_path, {}) is None
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(socket_path)
+        assert send_request(socket_path, {}) is None
+
+        # A new daemon replaces the stale socket
+        start_server(lambda request: {"ok": True})
+        assert send_request(socket_path, {}) == {"ok": True}
+
+    def test_running_daemon_is_not_replaced(self, socket_path, start_server):
+        """Test that a second daemon does not take the socket of a running one."""
+        start_server(lambda request: {"ok": True})
+
+        with pytest.raises(OSError, match="already running"):
+            serve(socket_path, lambda request: {})
+        assert send_request(socket_path, {}) == {"ok": True}
@@ -0,0 +1,127 @@
+"""Tests for refcheck.git module."""
+
+import os
+from unittest import mock
+
+import pytest
+
+from refcheck.git import (
+    get_repository_root,
+    list_changed_files,
+    list_repository_files,
+    run_git,
+)
+from refcheck.utils import get_markdown_files_from_args, get_markdown_files_from_git, path_index
+
+
+@pytest.fixture
+def repository(git_repository):
+    """Create a git repository with tracked, untracked, ignored and deleted files."""
+    root = git_repository(
+        {
+            ".gitignore": "build/\n*.log\n",
+            "README.md": "[guide](docs/guide.md)",
+            "docs": {
+                "guide.md": "# Guide",
+                "deleted.md": "",
+                "img": {"logo.png": ""},
+                "archive": {".refcheckignore": "*.md\n!index.md\n", "index.md": "", "old.md": ""},
+            },
+            "build": {"generated.md": ""},
+            "debug.log": "",
+        }
+    )
+    os.remove(os.path.join(root, "docs", "deleted.md"))
+    with open(os.path.join(root, "docs", "new.md"), "w", encoding="utf-8") as file:
+        file.write("")
+    return root
+
+
+class TestGit:
+    """Tests for the git helpers."""
+
+    def test_get_repository_root(self, repository, tmp_path_factory):
+        """Test that the root of the working tree is found from any directory in it."""
+        assert get_repository_root(os.path.join(repository, "docs", "img")) == repository
+        assert get_repository_root(str(tmp_path_factory.mktemp("not_a_repository"))) is None
+
+    def test_list_repository_files(self, repository):
+        """Test that tracked and untracked files are listed, but not ignored or deleted ones."""
+        assert sorted(list_repository_files(repository)) == [
+            ".gitignore",
+            "README.md",
+            "docs/archive/.refcheckignore",
+            "docs/archive/index.md",
+            "docs/archive/old.md",
+            "docs/guide.md",
+            "docs/img/logo.png",
+            "docs/new.md",
+        ]
+
+    def test_list_changed_files(self, repository, git_command):
+        """Test that committed, uncommitted and untracked changes since a commit are listed."""
+        git_command(repository, "checkout", "-q", "-b", "feature")
+        git_command(repository, "mv", "docs/guide.md", "docs/manual.md")
+        git_command(repository, "commit", "-q", "-a", "-m", "Rename the guide")
+        with open(os.path.join(repository, "README.md"), "a", encoding="utf-8") as file:
+            file.write("\n")
+
+        changed, deleted = list_changed_files(repository, "main")
+        assert sorted(changed) == ["README.md", "docs/manual.md", "docs/new.md"]
+        assert sorted(deleted) == ["docs/deleted.md", "docs/guide.md"]
+
+    def test_list_changed_files_invalid_revision(self, repository):
+        """Test that an unknown revision, or one that looks like an option, is not an error."""
+        assert list_changed_files(repository, "no-such-branch") is None
+        assert list_changed_files(repository, "--output=changes.txt") is None
+        assert not os.path.exists(os.path.join(repository, "changes.txt"))
+
+    def test_git_not_installed(self, tmp_path):
+        """Test that a missing git executable is not an error."""
+        with mock.patch("subprocess.run", side_effect=FileNotFoundError("git")):
+            assert run_git(str(tmp_path), "rev-parse", "--show-toplevel") is None
+
+
+class TestGetMarkdownFilesFromGit:
+    """Tests for get_markdown_files_from_git function."""
+
+    def test_discovery_without_walk(self, repository, monkeypatch):
+        """Test that files are found from the index, applying exclusions and ignore files."""
+        monkeypatch.chdir(repository)
+        with mock.patch("os.scandir", side_effect=AssertionError("walk")):
+            found, not_in_git = get_markdown_files_from_git(["."], exclude=["new.md"])
+
+        assert not_in_git == []
+        assert sorted(found) == [
+            "README.md",
+            os.path.join("docs", "archive", "index.md"),
+            os.path.join("docs", "guide.md"),
+        ]
+
+    def test_subdirectory(self, repository, monkeypatch):
+        """Test that only the files below a searched subdirectory are returned."""
+        monkeypatch.chdir(os.path.join(repository, "docs"))
+        found, _ = get_markdown_files_from_git([os.path.join("archive", "")], exclude=[])
+        assert found == [os.path.join("archive", "index.md")]
+
+    def test_index_answers_existence(self, repository):
+        """Test that local references are checked against the files git knows about."""
+        get_markdown_files_from_git([repository])
+
+        with mock.patch("os.path.exists", side_effect=AssertionError("stat")):
+            assert path_index.exists(os.path.join(repository, "docs", "img", "logo.png"))
+            assert path_index.exists(os.path.join(repository, "docs", "img"))
+            assert not path_index.exists(os.path.join(repository, "docs", "deleted.md"))
+            assert not path_index.exists(os.path.join(repository, "build", "generated.md"))
+
+    def test_directories_outside_git(self, tmp_path, monkeypatch):
+        """Test that directories outside of a git repository are searched on disk."""
+        (tmp_path / "docs").mkdir()
+        (tmp_path / "docs" / "file.md").write_text("", encoding="utf-8")
+        monkeypatch.chdir(tmp_path)
+
+        with mock.patch("refcheck.utils.get_repository_root", return_value=None):
+            assert get_markdown_files_from_git(["docs"]) == ([], ["docs"])
+            with mock.patch("refcheck.utils.load_exclusion_patterns", return_value=[]):
+                found = get_markdown_files_from_args(["docs"], use_git=True)
+        assert found == [os.path.join("docs", "file.md")]
@@ -0,0 +1,117 @@
+"""Tests for refcheck.graph module."""
+
+import os
+
+from refcheck.graph import (
+    ChangeSet,
+    ReferenceGraph,
+    get_changes_since,
+    select_affected_files,
+)
+from refcheck.store import DocumentStore
+
+
+def build_graph(root, files):
+    store = DocumentStore()
+    paths = [os.path.join(root, *file.split("/")) for file in files]
+    return ReferenceGraph.from_documents(store.get(path) for path in paths), paths
+
+
+class TestReferenceGraph:
+    """Tests for ReferenceGraph class."""
+
+    def test_get_referrers(self, temp_directory_structure):
+        """Test that relative, absolute and directory references are indexed by their target."""
+        root = temp_directory_structure(
+            {
+                "README.md": "[guide](docs/guide.md#setup) [docs](docs/) [site](https://a.com/x.md)",
+                "docs": {
+                    "guide.md": "[logo](img/logo.png) [top](#guide) [readme](../README.md)",
+                    "faq.md": "[guide](/docs/guide.md) [mail](mailto:a@b.c)",
+                },
+            }
+        )
+        graph, (readme, guide, faq) = build_graph(
+            root, ["README.md", "docs/guide.md", "docs/faq.md"]
+        )
+
+        assert graph.get_referrers(guide) == {readme, faq}
+        assert graph.get_referrers(os.path.join(root, "docs")) == {readme}
+        assert graph.get_referrers(os.path.join(root, "docs", "img", "logo.png")) == {guide}
+        assert graph.get_referrers(readme) == {guide}
+        assert graph.get_referrers(faq) == set()
+        # Absolute references match by the end of the path only
+        assert graph.get_referrers(os.path.join(root, "other", "guide.md")) == set()
+
+    def test_missing_documents(self):
+        """Test that files that could not be read are skipped."""
+        assert ReferenceGraph.from_documents([None]).get_referrers("file.md") == set()
+
+
+class TestSelectAffectedFiles:
+    """Tests for select_affected_files function."""
+
+    def test_changed_files_and_inbound_links(self, temp_directory_structure):
+        """Test that changed files and files linking to deleted or changed Markdown are selected."""
+        root = temp_directory_structure(
+            {
+                "index.md": "[api](api/index.md) [img](img/chart.png)",
+                "links_to_deleted.md": "[old](old.md)",
+                "links_to_directory.md": "[gone](gone/)",
+                "links_to_asset.md": "[img](img/chart.png)",
+                "unrelated.md": "[index](index.md)",
+                "api": {"index.md": "# API"},
+            }
+        )
+        files = [
+            "index.md",
+            "links_to_deleted.md",
+            "links_to_directory.md",
+            "links_to_asset.md",
+            "unrelated.md",
+            "api/index.md",
+        ]
+        graph, paths = build_graph(root, files)
+        changes = ChangeSet(
+            changed={
+                os.path.join(root, "api", "index.md"),
+                os.path.join(root, "img", "chart.png"),
+            },
+            deleted={os.path.join(root, "old.md"), os.path.join(root, "gone", "page.md")},
+        )
+
+        selected = select_affected_files(paths, graph, changes)
+        assert [os.path.relpath(path, root) for path in selected] == [
+            "index.md",
+            "links_to_deleted.md",
+            "links_to_directory.md",
+            os.path.join("api", "index.md"),
+        ]
+
+    def test_nothing_changed(self, temp_markdown_file):
+        """Test that no files are selected without changes."""
+        file_path = temp_markdown_file("[a](b.md)")
+        graph, _ = build_graph(os.path.dirname(file_path), [os.path.basename(file_path)])
+        assert select_affected_files([file_path], graph, ChangeSet()) == []
+
+
+class TestGetChangesSince:
+    """Tests for get_changes_since function."""
+
+    def test_changes_of_repository(self, git_repository, git_command):
+        """Test that the changes are returned as absolute paths, listed once per repository."""
+        root = git_repository({"a.md": "", "docs": {"b.md": "", "c.md": ""}})
+        os.remove(os.path.join(root, "docs", "b.md"))
+        with open(os.path.join(root, "a.md"), "w", encoding="utf-8") as file:
+            file.write("changed")
+
+        changes = get_changes_since([root, os.path.join(root, "docs", "c.md")], "HEAD")
+        assert changes == ChangeSet(
+            changed={os.path.join(root, "a.md")}, deleted={os.path.join(root, "docs", "b.md")}
+        )
+
+    def test_not_a_repository_or_revision(self, git_repository, tmp_path_factory):
+        """Test that paths outside of git and unknown revisions cannot be compared."""
+        root = git_repository({"a.md": ""})
+        assert get_changes_since([root], "no-such-branch") is None
+        assert get_changes_since([str(tmp_path_factory.mktemp("plain"))], "HEAD") is None
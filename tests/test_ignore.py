@@ -0,0 +1,198 @@
+"""Tests for refcheck.ignore module."""
+
+import os
+
+import pytest
+
+from refcheck.ignore import IgnoreMatcher, IgnoreRules, parse_ignore_line
+from refcheck.utils import ParallelWalker, get_markdown_files_from_dir
+
+
+class TestParseIgnoreLine:
+    """Tests for parse_ignore_line function."""
+
+    @pytest.mark.parametrize("line", ["", "   ", "# comment", "/", "\n"])
+    def test_blank_lines_and_comments(self, line):
+        """Test that blank lines and comments define no rule."""
+        assert parse_ignore_line(line) is None
+
+    def test_invalid_pattern(self, caplog):
+        """Test that a pattern which is not a valid glob is skipped with a warning."""
+        assert parse_ignore_line("[z-a].md") is None
+        assert "Skipping invalid exclusion pattern '[z-a].md'" in caplog.text
+
+    @pytest.mark.parametrize(
+        "line, pattern, negated, directory_only",
+        [
+            ("build/\n", "build", False, True),
+            ("!keep.md", "keep.md", True, False),
+            ("\\!important.md", "!important.md", False, False),
+            ("\\#hash.md", "#hash.md", False, False),
+            ("trailing.md   ", "trailing.md", False, False),
+            ("space\\ ", "space\\ ", False, False),
+        ],
+    )
+    def test_rule_attributes(self, line, pattern, negated, directory_only):
+        """Test negation, escapes, trailing spaces and directory-only patterns."""
+        rule = parse_ignore_line(line)
+        assert (rule.pattern, rule.negated, rule.directory_only) == (
+            pattern,
+            negated,
+            directory_only,
+        )
+
+
+class TestIgnoreRules:
+    """Tests for IgnoreRules class."""
+
+    @pytest.mark.parametrize(
+        "patterns, path, is_dir, expected",
+        [
+            (["docs"], "docs", True, True),
+            (["docs"], "docs-old", True, None),  # Not a prefix match
+            (["docs"], "a/b/docs", True, True),  # Patterns without a slash match at any depth
+            (["/docs"], "a/docs", True, None),  # A leading slash anchors the pattern
+            (["a/docs"], "x/a/docs", True, None),  # So does a slash in the middle
+            (["logs/"], "logs", False, None),  # Directory-only patterns do not match files
+            (["logs/"], "src/logs", True, True),
+            (["*.draft.md"], "notes/todo.draft.md", False, True),
+            (["*.md"], "a/b.md", False, True),
+            (["/*.md"], "a/b.md", False, None),  # `*` does not match a slash
+            (["?.md"], "a.md", False, True),
+            (["?.md"], "ab.md", False, None),
+            (["[ab].md"], "b.md", False, True),
+            (["[!ab].md"], "b.md", False, None),
+            (["[!ab].md"], "c.md", False, True),
+            (["**/build"], "x/y/build", True, True),
+            (["a/**/b"], "a/b", True, True),
+            (["a/**/b"], "a/x/y/b", True, True),
+            (["abc/**"], "abc/x/y.md", False, True),
+            (["abc/**"], "abc", True, None),
+            (["*.md", "!keep.md"], "keep.md", False, False),  # The last matching rule decides
+            (["!keep.md", "*.md"], "keep.md", False, True),
+            (["\\*.md"], "x.md", False, None),
+            (["\\*.md"], "*.md", False, True),
+        ],
+    )
+    def test_gitignore_semantics(self, tmp_path, patterns, path, is_dir, expected):
+        """Test the gitignore semantics of patterns, relative to the directory of the rules."""
+        rules = IgnoreRules.from_lines(str(tmp_path), patterns)
+        assert rules.match(os.path.join(str(tmp_path), *path.split("/")), is_dir) is expected
+
+    def test_paths_outside_base_directory(self, tmp_path):
+        """Test that rules do not apply outside of their directory."""
+        rules = IgnoreRules.from_lines(str(tmp_path / "sub"), ["*"])
+        assert rules.match(str(tmp_path / "file.md"), False) is None
+        assert rules.match(str(tmp_path / "sub-other" / "file.md"), False) is None
+
+
+class TestIgnoreMatcher:
+    """Tests for IgnoreMatcher class."""
+
+    def test_command_line_patterns(self, tmp_path, monkeypatch):
+        """Test that relative patterns apply below the current directory, absolute paths exactly."""
+        monkeypatch.chdir(tmp_path)
+        matcher = IgnoreMatcher.from_patterns(["build", str(tmp_path / "docs" / "old[1].md")])
+
+        assert matcher.is_ignored("build", is_dir=True)
+        assert matcher.is_ignored(os.path.join("src", "build"), is_dir=True)
+        assert matcher.is_ignored(str(tmp_path / "docs" / "old[1].md"), is_dir=False)
+        assert not matcher.is_ignored(str(tmp_path / "docs" / "old1.md"), is_dir=False)
+        assert not matcher.is_ignored("builder", is_dir=True)
+
+    @pytest.mark.parametrize(
+        "patterns, excluded",
+        [
+            (["./docs"], ["docs/guide.md", "docs/keep.md"]),
+            (["src/../docs/"], ["docs/guide.md", "docs/keep.md"]),
+            (["./docs/*.md", "!./docs/keep.md"], ["docs/guide.md"]),
+        ],
+    )
+    def test_dot_segments_are_resolved(
+        self, temp_directory_structure, monkeypatch, patterns, excluded
+    ):
+        """Test that `./dir` and `dir/../dir` exclude the directory below the current one."""
+        root = temp_directory_structure(
+            {
+                "README.md": "",
+                "docs": {"guide.md": "", "keep.md": ""},
+                "src": {"docs": {"api.md": ""}},
+            }
+        )
+        monkeypatch.chdir(root)
+
+        files = get_markdown_files_from_dir(".", patterns)
+        # The patterns stay anchored, so `src/docs` is not excluded
+        expected = {"README.md", "docs/guide.md", "docs/keep.md", "src/docs/api.md"}
+        assert {os.path.relpath(file).replace(os.sep, "/") for file in files} == expected - set(
+            excluded
+        )
+
+    def test_patterns_outside_current_directory(self, temp_directory_structure, monkeypatch):
+        """Test that `../dir` excludes the directory next to the current one."""
+        root = temp_directory_structure(
+            {"a": {"z.md": "", "ex": {"y.md": ""}}, "b": {"ex": {"x.md": ""}}}
+        )
+        monkeypatch.chdir(os.path.join(root, "b"))
+
+        files = get_markdown_files_from_dir("..", ["../a/ex", "./../b/ex/"])
+        assert sorted(os.path.relpath(file) for file in files) == [os.path.join("..", "a", "z.md")]
+
+    @pytest.mark.parametrize("threads", [None, 4])
+    def test_invalid_patterns_are_skipped(
+        self, temp_directory_structure, monkeypatch, caplog, threads
+    ):
+        """Test that invalid patterns are skipped by the serial and the parallel walker."""
+        root = temp_directory_structure(
+            {
+                ".refcheckignore": "[z-a]\nold.md\n",
+                "README.md": "",
+                "old.md": "",
+                "docs": {"guide.md": "", "draft.md": ""},
+            }
+        )
+        monkeypatch.chdir(root)
+        exclude = ["[b-a]/", "draft.md"]
+
+        if threads is None:
+            files = get_markdown_files_from_dir(".", exclude)
+        else:
+            files = list(ParallelWalker(threads, exclude).iter_markdown_files(["."]))
+        # The other rules of the ignore file and of the command line still apply
+        assert sorted(os.path.relpath(file) for file in files) == [
+            "README.md",
+            os.path.join("docs", "guide.md"),
+        ]
+        assert "Skipping invalid exclusion pattern '[z-a]'" in caplog.text
+        assert "Skipping invalid exclusion pattern '[b-a]/'" in caplog.text
+
+    def test_nested_ignore_files_take_precedence(self, temp_directory_structure, monkeypatch):
+        """Test that ignore files apply below their directory and override their parents."""
+        root = temp_directory_structure(
+            {
+                "README.md": "",
+                "notes.draft.md": "",
+                "docs": {
+                    ".refcheckignore": "# Published drafts\n!*.draft.md\ngenerated/\n",
+                    "guide.md": "",
+                    "guide.draft.md": "",
+                    "generated": {"api.md": ""},
+                    "archive": {
+                        ".refcheckignore": "*.md\n!index.md\n",
+                        "index.md": "",
+                        "old.md": "",
+                    },
+                },
+                "generated": {"kept.md": ""},
+            }
+        )
+        monkeypatch.chdir(root)
+
+        result = get_markdown_files_from_dir(".", exclude=["*.draft.md"])
+        assert sorted(result) == [
+            "README.md",
+            os.path.join("docs", "archive", "index.md"),
+            os.path.join("docs", "guide.draft.md"),
+            os.path.join("docs", "guide.md"),
+            os.path.join("generated", "kept.md"),
+        ]
@@ -0,0 +1,210 @@
+"""Tests for refcheck.lsp module."""
+
+import io
+import json
+import pathlib
+
+import pytest
+
+from refcheck.lsp import LanguageServer, get_range, uri_to_path
+from refcheck.settings import settings
+
+
+def frame(message):
+    body = json.dumps({"jsonrpc": "2.0", **message}).encode("utf-8")
+    return f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body
+
+
+def read_messages(output):
+    """Split the output of the server into its messages."""
+    messages = []
+    data = output.getvalue()
+    while data:
+        header, _, data = data.partition(b"\r\n\r\n")
+        length = int(header.split(b":")[1])
+        messages.append(json.loads(data[:length]))
+        data = data[length:]
+    return messages
+
+
+@pytest.fixture(autouse=True)
+def restore_settings():
+    """The server configures the shared settings, so they are restored after each test."""
+    saved = dict(vars(settings))
+    yield
+    vars(settings).clear()
+    vars(settings).update(saved)
+
+
+@pytest.fixture
+def workspace(temp_directory_structure, monkeypatch):
+    root = temp_directory_structure(
+        {
+            "guide.md": "# Guide\n\n## Setup\n",
+            "docs": {"faq.md": "# FAQ\n"},
+        }
+    )
+    # The server changes to the workspace directory
+    monkeypatch.chdir(root)
+    return pathlib.Path(root)
+
+
+def run_server(workspace, *messages, options=None):
+    """Run the server on an initialization and the messages, returning its exit code and output."""
+    initialize = {
+        "id": 0,
+        "method": "initialize",
+        "params": {
+            "rootUri": workspace.as_uri(),
+            "capabilities": {},
+            "initializationOptions": options or {},
+        },
+    }
+    stream = io.BytesIO(b"".join(frame(message) for message in [initialize, *messages]))
+    output = io.BytesIO()
+    code = LanguageServer(stream, output).run()
+    return code, read_messages(output)
+
+
+def open_document(uri, text):
+    return {
+        "method": "textDocument/didOpen",
+        "params": {
+            "textDocument": {"uri": uri, "languageId": "markdown", "version": 1, "text": text}
+        },
+    }
+
+
+def change_document(uri, text):
+    return {
+        "method": "textDocument/didChange",
+        "params": {"textDocument": {"uri": uri, "version": 2}, "contentChanges": [{"text": text}]},
+    }
+
+
+def diagnostics_of(messages, uri):
+    return [
+        [diagnostic["message"] for diagnostic in message["params"]["diagnostics"]]
+        for message in messages
+        if message.get("method") == "textDocument/publishDiagnostics"
+        and message["params"]["uri"] == uri
+    ]
+
+
+class TestLanguageServer:
+    """Tests for the LanguageServer class."""
+
+    def test_lifecycle(self, workspace):
+        """Test the answers to initialize, unknown requests and shutdown, and the exit code."""
+        code, messages = run_server(
+            workspace,
+            {"id": 1, "method": "textDocument/hover", "params": {}},
+            {"id": 2, "method": "shutdown"},
+            {"method": "exit"},
+        )
+        assert code == 0
+        assert messages[0]["result"]["capabilities"]["textDocumentSync"]["change"] == 1
+        assert messages[1]["error"]["code"] == -32601
+        assert messages[2] == {"jsonrpc": "2.0", "id": 2, "result": None}
+
+        # Exiting without shutdown, or at the end of the input, is an error
+        assert run_server(workspace, {"method": "exit"})[0] == 1
+        assert run_server(workspace)[0] == 1
+
+    def test_diagnostics(self, workspace):
+        """Test that broken references of an open document are published, and fixed by edits."""
+        uri = (workspace / "docs" / "index.md").as_uri()
+        text = "# Index\n\n[setup](../guide.md#setup) [faq](faq.md#install) [x][missing]\n"
+        _, messages = run_server(
+            workspace,
+            open_document(uri, text),
+            change_document(uri, "# Index\n\n[faq](faq.md#faq)\n"),
+        )
+        assert diagnostics_of(messages, uri) == [
+            [
+                "Broken reference: 'faq.md#install' was not found.",
+                "Label 'missing' is not defined.",
+            ],
+            [],
+        ]
+        published = messages[1]["params"]["diagnostics"][0]
+        assert published["range"] == {
+            "start": {"line": 2, "character": 27},
+            "end": {"line": 2, "character": 48},
+        }
+        assert published["source"] == "refcheck"
+
+    def test_repeated_reference_ranges(self, workspace):
+        """Test that each occurrence of the same broken link on a line gets its own range."""
+        uri = (workspace / "index.md").as_uri()
+        _, messages = run_server(workspace, open_document(uri, "[a](x.md) and [a](x.md)\n"))
+        ranges = [diagnostic["range"] for diagnostic in messages[1]["params"]["diagnostics"]]
+        assert [(r["start"]["character"], r["end"]["character"]) for r in ranges] == [
+            (0, 9),
+            (14, 23),
+        ]
+
+    def test_unsaved_headers(self, workspace):
+        """Test that unsaved headers of an open document are seen by the other open documents."""
+        guide = (workspace / "guide.md").as_uri()
+        index = (workspace / "index.md").as_uri()
+        _, messages = run_server(
+            workspace,
+            open_document(index, "[install](guide.md#install)\n"),
+            open_document(guide, "# Guide\n\n## Setup\n"),
+            change_document(guide, "# Guide\n\n## Install\n"),
+            {"method": "textDocument/didClose", "params": {"textDocument": {"uri": guide}}},
+        )
+        # Opening the guide does not change its anchors, editing it fixes the link of the index,
+        # and closing it without saving breaks it again
+        broken = ["Broken reference: 'guide.md#install' was not found."]
+        assert diagnostics_of(messages, index) == [broken, [], broken]
+        assert diagnostics_of(messages, guide) == [[], [], []]
+
+    def test_watched_files(self, workspace):
+        """Test that files changed on disk are read again."""
+        uri = (workspace / "index.md").as_uri()
+        (workspace / "new.md").write_text("# New\n")
+        _, messages = run_server(
+            workspace,
+            open_document(uri, "[new](new.md#new) [other](other.md)\n"),
+            {
+                "method": "workspace/didChangeWatchedFiles",
+                "params": {"changes": [{"uri": (workspace / "new.md").as_uri(), "type": 2}]},
+            },
+        )
+        assert diagnostics_of(messages, uri)[0] == ["Broken reference: 'other.md' was not found."]
+
+    def test_initialization_options(self, workspace):
+        """Test that the options of the client configure the checks."""
+        uri = (workspace / "docs" / "index.md").as_uri()
+        text = "[guide](/guide.md)\n"
+        _, messages = run_server(workspace, open_document(uri, text))
+        assert diagnostics_of(messages, uri) == [["Broken reference: '/guide.md' was not found."]]
+
+        _, messages = run_server(
+            workspace, open_document(uri, text), options={"allowAbsolute": True}
+        )
+        assert diagnostics_of(messages, uri) == [[]]
+
+
+class TestHelpers:
+    """Tests for the conversions between LSP and refcheck positions."""
+
+    def test_get_range_counts_utf16_units(self):
+        """Test that characters outside the BMP count as two units, as LSP requires."""
+        lines = ["# Title", "\U0001f600 é [a](b.md)"]
+        assert get_range(lines, 2, "[a](b.md)", 8) == {
+            "start": {"line": 1, "character": 5},
+            "end": {"line": 1, "character": 14},
+        }
+        # Syntax spanning several lines covers the whole first line
+        assert get_range(lines, 1, "[a\nb](c.md)", 0)["end"] == {"line": 0, "character": 7}
+
+    def test_uri_to_path(self, tmp_path):
+        """Test that file URIs are converted back to paths, including escaped characters."""
+        path = tmp_path / "my docs" / "ü.md"
+        assert uri_to_path(path.as_uri()) == str(path)
+        # An escaped percent sign is decoded only once
+        percent = tmp_path / "100%25.md"
+        assert uri_to_path(percent.as_uri()) == str(percent)
@@ -1,10 +1,28 @@
 """Tests for refcheck.main module."""
 
+import os
+import multiprocessing
+import time
 import pytest
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from unittest import mock
 
-from refcheck.main import main, ReferenceChecker, BrokenReference
-from refcheck.parsers import Reference
+from refcheck.main import (
+    main,
+    CheckServer,
+    ReferenceChecker,
+    BrokenReference,
+    get_reference_kinds,
+)
+from refcheck.anchors import extract_anchors
+from refcheck.cli import get_default_arguments
+from refcheck.daemon import OPTIONS
+from refcheck.utils import get_markdown_files_from_args, path_index
+from refcheck.watch import PollingWatcher
+from refcheck.validators import clear_resolution_caches, validate_local_reference
+from refcheck.parsers import DEFAULT_KINDS, Reference, ReferenceKind
+from refcheck.store import document_store
 
 
 class TestReferenceChecker:
@@ -22,7 +40,6 @@ class TestReferenceChecker:
             line_number=1,
             syntax="[link](target.md)",
             link="target.md",
-            is_remote=False,
         )
 
         checker = ReferenceChecker()
@@ -43,7 +60,6 @@ class TestReferenceChecker:
             line_number=1,
             syntax="[link](nonexistent.md)",
             link="nonexistent.md",
-            is_remote=False,
         )
 
         checker = ReferenceChecker()
@@ -53,7 +69,7 @@ class TestReferenceChecker:
             checker.check_references([ref])
 
         assert len(checker.broken_references) == 1
-        assert checker.broken_references[0].link == "nonexistent.md"
+        assert checker.broken_references[0].reference.link == "nonexistent.md"
 
     def test_check_references_remote_skipped(self, temp_markdown_file, capsys):
         """Test that remote references are skipped when check_remote is False."""
@@ -65,7 +81,6 @@ class TestReferenceChecker:
             line_number=1,
             syntax="[link](https://example.com)",
             link="https://example.com",
-            is_remote=True,
         )
 
         checker = ReferenceChecker()
@@ -89,7 +104,6 @@ class TestReferenceChecker:
             line_number=1,
             syntax="[link](https://example.com)",
             link="https://example.com",
-            is_remote=True,
         )
 
         checker = ReferenceChecker()
@@ -111,7 +125,6 @@ class TestReferenceChecker:
             line_number=1,
             syntax="[link](https://example.com/404)",
             link="https://example.com/404",
-            is_remote=True,
         )
 
         checker = ReferenceChecker()
@@ -121,7 +134,7 @@ class TestReferenceChecker:
             checker.check_references([ref])
 
         assert len(checker.broken_references) == 1
-        assert checker.broken_references[0].link == "https://example.com/404"
+        assert checker.broken_references[0].reference.link == "https://example.com/404"
 
     def test_check_references_remote_timeout(self, mock_http_timeout, temp_markdown_file):
         """Test checking remote references that timeout."""
@@ -133,7 +146,6 @@ class TestReferenceChecker:
             line_number=1,
             syntax="[link](https://slow.example.com)",
             link="https://slow.example.com",
-            is_remote=True,
         )
 
         checker = ReferenceChecker()
@@ -143,7 +155,7 @@ class TestReferenceChecker:
             checker.check_references([ref])
 
         assert len(checker.broken_references) == 1
-        assert checker.broken_references[0].link == "https://slow.example.com"
+        assert checker.broken_references[0].reference.link == "https://slow.example.com"
 
     def test_check_references_markdown_with_header(self, temp_markdown_file):
         """Test checking markdown references with headers."""
@@ -160,7 +172,6 @@ class TestReferenceChecker:
             line_number=1,
             syntax="[link](target.md#section-a)",
             link="target.md#section-a",
-            is_remote=False,
         )
 
         checker = ReferenceChecker()
@@ -186,7 +197,6 @@ class TestReferenceChecker:
             line_number=1,
             syntax="[link](target.md#missing-section)",
             link="target.md#missing-section",
-            is_remote=False,
         )
 
         checker = ReferenceChecker()
@@ -197,6 +207,210 @@ class TestReferenceChecker:
 
         assert len(checker.broken_references) == 1
 
+    def test_check_references_undefined_label(self, temp_markdown_file, capsys):
+        """Test that reference-style links with an undefined label are broken."""
+        source_file = temp_markdown_file("[text][missing]")
+
+        ref = Reference(
+            file_path=source_file,
+            line_number=1,
+            syntax="[text][missing]",
+            link="missing",
+            kind=ReferenceKind.REFERENCE_LINK,
+        )
+
+        checker = ReferenceChecker()
+        with mock.patch("refcheck.main.settings") as mock_settings:
+            mock_settings.check_remote = False
+            mock_settings.no_color = True
+            checker.check_references([ref])
+
+        assert len(checker.broken_references) == 1
+        assert "BROKEN" in capsys.readouterr().out
+
+    def test_check_references_same_target_checked_once(self, tmp_path):
+        """Test that references resolving to the same target are validated once."""
+        (tmp_path / "docs").mkdir()
+        (tmp_path / "CONTRIBUTING.md").write_text("# Contributing\n", encoding="utf-8")
+        references = [
+            Reference(str(tmp_path / "docs" / name), 1, f"[c]({link})", link)
+            for name, link in [
+                ("a.md", "../CONTRIBUTING.md"),
+                ("b.md", "../CONTRIBUTING.md"),
+                ("c.md", "./../docs/../CONTRIBUTING.md"),
+                ("d.md", "../missing.md"),
+                ("e.md", "../missing.md"),
+            ]
+        ]
+
+        checker = ReferenceChecker()
+        with (
+            mock.patch("refcheck.main.settings") as mock_settings,
+            mock.patch(
+                "refcheck.main.validate_local_reference",
+                wraps=validate_local_reference,
+            ) as mock_validate,
+        ):
+            mock_settings.check_remote = False
+            mock_settings.no_color = True
+            checker.check_references(references)
+
+        assert mock_validate.call_count == 2
+        # The result of a broken target is fanned out to all of its occurrences
+        assert [broken.reference.file_path for broken in checker.broken_references] == [
+            str(tmp_path / "docs" / "d.md"),
+            str(tmp_path / "docs" / "e.md"),
+        ]
+
+    def test_check_references_fragments_checked_separately(self, temp_markdown_file):
+        """Test that different fragments of the same file are separate targets."""
+        source_file = temp_markdown_file("# Intro\n", "source.md")
+        references = [
+            Reference(source_file, 1, f"[x]({link})", link)
+            for link in ["#intro", "#intro", "#outro", "source.md#intro"]
+        ]
+
+        checker = ReferenceChecker()
+        with mock.patch("refcheck.main.settings") as mock_settings:
+            mock_settings.check_remote = False
+            mock_settings.no_color = True
+            checker.check_references(references)
+
+        assert [broken.reference.link for broken in checker.broken_references] == ["#outro"]
+        assert len(checker.local_results) == 2
+
+    def test_validate_local_targets(self, tmp_path):
+        """Test that targets are validated on threads, reading each target file once."""
+        (tmp_path / "guide.md").write_text("# Install\n\n# Usage\n", encoding="utf-8")
+        (tmp_path / "image.png").write_bytes(b"")
+        source_file = str(tmp_path / "source.md")
+        links = [
+            "guide.md#install",
+            "guide.md#usage",
+            "guide.md#missing",
+            "./guide.md#install",
+            "image.png",
+            "missing.png",
+            "https://example.com",
+            "/guide.md",
+        ]
+        references = [
+            Reference(source_file, i, f"[x]({link})", link) for i, link in enumerate(links, start=1)
+        ]
+
+        checker = ReferenceChecker(io_threads=4)
+        with mock.patch(
+            "refcheck.store.extract_anchors", wraps=extract_anchors
+        ) as mock_extract_anchors:
+            checker.validate_local_targets(references)
+
+        mock_extract_anchors.assert_called_once()
+        # Remote and absolute references are left to check_references
+        guide, image, missing = (
+            str(tmp_path / name) for name in ["guide.md", "image.png", "missing.png"]
+        )
+        assert checker.local_results == {
+            (guide, "install"): True,
+            (guide, "usage"): True,
+            (guide, "missing"): False,
+            (image, ""): True,
+            (missing, ""): False,
+        }
+
+    def test_validate_in_processes(self, temp_directory_structure, monkeypatch):
+        """Test that files are parsed and their targets validated in other processes."""
+        root = temp_directory_structure(
+            {
+                "guide.md": "# Install\n\n[faq](faq.md#faq) [usage](#usage) [x][missing]\n",
+                "faq.md": "# FAQ\n\n[guide](guide.md#missing) [web](https://example.com)\n",
+                "image.md": "![logo](logo.png)\n",
+            }
+        )
+        monkeypatch.chdir(root)
+        files = ["faq.md", "guide.md", "image.md"]
+
+        checker = ReferenceChecker(processes=2)
+        checker.validate_in_processes(files)
+
+        # Each file is a shard, so only fragments of the same file are validated by the processes
+        assert checker.local_results == {("guide.md", "usage"): False, ("logo.png", ""): False}
+        assert document_store.parser.stats.files == 3
+
+        # The others are validated from the documents of the processes, without parsing again
+        references = [ref for file in files for ref in document_store.get(file).references]
+        with (
+            mock.patch("refcheck.store.extract_anchors") as mock_extract_anchors,
+            mock.patch("builtins.print"),
+        ):
+            checker.check_references(references)
+        mock_extract_anchors.assert_not_called()
+        assert [broken.reference.link for broken in checker.broken_references] == [
+            "guide.md#missing",
+            "#usage",
+            "missing",
+            "logo.png",
+        ]
+
+        # The documents are the same as if they were parsed in this process
+        documents = [document_store.get(file) for file in files]
+        document_store.forget()
+        assert documents == [document_store.get(file) for file in files]
+
+    @pytest.mark.parametrize("method", ["fork", "spawn"])
+    def test_validate_in_processes_path_index(self, git_repository, monkeypatch, method):
+        """Test that processes check against the files of git, however they are started."""
+        if method not in multiprocessing.get_all_start_methods():
+            pytest.skip(f"{method} is not available")
+        root = git_repository({"index.md": "[build](build.md)\n", ".gitignore": "build.md\n"})
+        with open(os.path.join(root, "build.md"), "w", encoding="utf-8") as file:
+            file.write("# Build\n")
+        monkeypatch.chdir(root)
+        files = get_markdown_files_from_args(["."], [], use_git=True)
+
+        checker = ReferenceChecker(processes=2)
+        context = multiprocessing.get_context(method)
+        with mock.patch(
+            "refcheck.main.ProcessPoolExecutor", partial(ProcessPoolExecutor, mp_context=context)
+        ):
+            checker.validate_in_processes(files)
+
+        # The ignored file exists on disk, but not for git
+        assert checker.local_results == {("build.md", ""): False}
+
+    def test_check_references_other_schemes_are_skipped(self, mock_http_success, capsys):
+        """Test that links with schemes other than HTTP are not requested, even with --check-remote."""
+        ref = Reference("doc.md", 1, "<mailto:user@example.com>", "mailto:user@example.com")
+
+        checker = ReferenceChecker()
+        with mock.patch("refcheck.main.settings") as mock_settings:
+            mock_settings.check_remote = True
+            mock_settings.no_color = True
+            checker.check_references([ref])
+
+        assert checker.broken_references == []
+        mock_http_success.assert_not_called()
+        assert "SKIPPED" in capsys.readouterr().out
+
+    def test_check_references_by_target_kind(self, tmp_path):
+        """Test that look-alikes of Markdown files are checked as assets, ignoring fragments."""
+        for name in ["page.mdx", "notes.md.bak", "manual.pdf"]:
+            (tmp_path / name).write_text("no headers", encoding="utf-8")
+        source_file = str(tmp_path / "source.md")
+        links = ["page.mdx#intro", "notes.md.bak", "manual.pdf#page=2", "missing.pdf#page=1"]
+        references = [
+            Reference(source_file, i, f"[x]({link})", link) for i, link in enumerate(links, start=1)
+        ]
+
+        checker = ReferenceChecker()
+        with mock.patch("refcheck.main.settings") as mock_settings:
+            mock_settings.check_remote = False
+            mock_settings.no_color = True
+            checker.check_references(references)
+
+        assert [broken.reference.link for broken in checker.broken_references] == [
+            "missing.pdf#page=1"
+        ]
+
     def test_print_summary_no_broken(self, capsys):
         """Test print_summary with no broken references."""
         checker = ReferenceChecker()
@@ -214,11 +428,12 @@ class TestReferenceChecker:
         source_file = temp_markdown_file(content)
 
         broken_ref = BrokenReference(
-            file_path=source_file,
-            line_number=10,
-            syntax="[link](missing.md)",
-            link="missing.md",
-            is_remote=False,
+            reference=Reference(
+                file_path=source_file,
+                line_number=10,
+                syntax="[link](missing.md)",
+                link="missing.md",
+            ),
             status="BROKEN",
         )
 
@@ -241,27 +456,30 @@ class TestReferenceChecker:
 
         broken_refs = [
             BrokenReference(
-                file_path=file2,
-                line_number=5,
-                syntax="[link](missing2.md)",
-                link="missing2.md",
-                is_remote=False,
+                reference=Reference(
+                    file_path=file2,
+                    line_number=5,
+                    syntax="[link](missing2.md)",
+                    link="missing2.md",
+                ),
                 status="BROKEN",
             ),
             BrokenReference(
-                file_path=file1,
-                line_number=10,
-                syntax="[link](missing1.md)",
-                link="missing1.md",
-                is_remote=False,
+                reference=Reference(
+                    file_path=file1,
+                    line_number=10,
+                    syntax="[link](missing1.md)",
+                    link="missing1.md",
+                ),
                 status="BROKEN",
             ),
             BrokenReference(
-                file_path=file1,
-                line_number=5,
-                syntax="[link](missing3.md)",
-                link="missing3.md",
-                is_remote=False,
+                reference=Reference(
+                    file_path=file1,
+                    line_number=5,
+                    syntax="[link](missing3.md)",
+                    link="missing3.md",
+                ),
                 status="BROKEN",
             ),
         ]
@@ -274,9 +492,9 @@ class TestReferenceChecker:
             checker.print_summary()
 
         # After sorting, file1:5 should come before file1:10, and both before file2:5
-        assert checker.broken_references[0].file_path == file1
-        assert checker.broken_references[0].line_number == 5
-        assert checker.broken_references[1].line_number == 10
+        assert checker.broken_references[0].reference.file_path == file1
+        assert checker.broken_references[0].reference.line_number == 5
+        assert checker.broken_references[1].reference.line_number == 10
 
 
 class TestMainFunction:
@@ -290,6 +508,14 @@ class TestMainFunction:
             mock_settings.verbose = False
             mock_settings.check_remote = False
             mock_settings.no_color = True
+            mock_settings.anchor_style = "github"
+            mock_settings.io_threads = 1
+            mock_settings.git = False
+            mock_settings.changed_since = None
+            mock_settings.incremental = False
+            mock_settings.watch = False
+            mock_settings.daemon = False
+            mock_settings.processes = 1
             mock_settings.is_valid.return_value = True
 
             with mock.patch("refcheck.main.get_markdown_files_from_args", return_value=[]):
@@ -320,6 +546,14 @@ class TestMainFunction:
             mock_settings.verbose = False
             mock_settings.check_remote = False
             mock_settings.no_color = True
+            mock_settings.anchor_style = "github"
+            mock_settings.io_threads = 1
+            mock_settings.git = False
+            mock_settings.changed_since = None
+            mock_settings.incremental = False
+            mock_settings.watch = False
+            mock_settings.daemon = False
+            mock_settings.processes = 1
             mock_settings.is_valid.return_value = True
 
             with mock.patch("refcheck.main.get_markdown_files_from_args", return_value=[test_file]):
@@ -343,6 +577,14 @@ class TestMainFunction:
             mock_settings.verbose = False
             mock_settings.check_remote = False
             mock_settings.no_color = True
+            mock_settings.anchor_style = "github"
+            mock_settings.io_threads = 1
+            mock_settings.git = False
+            mock_settings.changed_since = None
+            mock_settings.incremental = False
+            mock_settings.watch = False
+            mock_settings.daemon = False
+            mock_settings.processes = 1
             mock_settings.is_valid.return_value = True
 
             with mock.patch(
@@ -365,6 +607,14 @@ class TestMainFunction:
             mock_settings.verbose = False
             mock_settings.check_remote = False
             mock_settings.no_color = True
+            mock_settings.anchor_style = "github"
+            mock_settings.io_threads = 1
+            mock_settings.git = False
+            mock_settings.changed_since = None
+            mock_settings.incremental = False
+            mock_settings.watch = False
+            mock_settings.daemon = False
+            mock_settings.processes = 1
             mock_settings.is_valid.return_value = True
 
             with mock.patch("refcheck.main.get_markdown_files_from_args", return_value=[test_file]):
@@ -375,6 +625,40 @@ class TestMainFunction:
         assert "1 broken references found" in captured.out
         assert "nonexistent.md" in captured.out
 
+    def test_main_reference_links(self, temp_markdown_file, capsys):
+        """Test main with reference-style links checked through their definitions."""
+        temp_markdown_file("# Target", "target.md")
+        source_file = temp_markdown_file(
+            "[one][target] [two][target] [three][missing]\n\n[target]: target.md\n", "source.md"
+        )
+
+        with mock.patch("refcheck.main.settings") as mock_settings:
+            mock_settings.paths = [source_file]
+            mock_settings.exclude = []
+            mock_settings.verbose = False
+            mock_settings.check_remote = False
+            mock_settings.no_color = True
+            mock_settings.anchor_style = "github"
+            mock_settings.io_threads = 1
+            mock_settings.git = False
+            mock_settings.changed_since = None
+            mock_settings.incremental = False
+            mock_settings.watch = False
+            mock_settings.daemon = False
+            mock_settings.processes = 1
+            mock_settings.is_valid.return_value = True
+
+            with mock.patch(
+                "refcheck.main.get_markdown_files_from_args", return_value=[source_file]
+            ):
+                result = main()
+
+        assert result is False
+        captured = capsys.readouterr()
+        assert captured.out.count("[target]: target.md - ") == 1
+        assert "1 broken references found" in captured.out
+        assert "[three][missing]" in captured.out
+
     def test_main_check_remote_warning(self, temp_markdown_file, capsys):
         """Test that warning is displayed when remote checking is disabled."""
         content = "# Test"
@@ -386,6 +670,14 @@ class TestMainFunction:
             mock_settings.verbose = False
             mock_settings.check_remote = False
             mock_settings.no_color = True
+            mock_settings.anchor_style = "github"
+            mock_settings.io_threads = 1
+            mock_settings.git = False
+            mock_settings.changed_since = None
+            mock_settings.incremental = False
+            mock_settings.watch = False
+            mock_settings.daemon = False
+            mock_settings.processes = 1
             mock_settings.is_valid.return_value = True
 
             with mock.patch("refcheck.main.get_markdown_files_from_args", return_value=[test_file]):
@@ -405,6 +697,14 @@ class TestMainFunction:
             mock_settings.verbose = True
             mock_settings.check_remote = False
             mock_settings.no_color = True
+            mock_settings.anchor_style = "github"
+            mock_settings.io_threads = 1
+            mock_settings.git = False
+            mock_settings.changed_since = None
+            mock_settings.incremental = False
+            mock_settings.watch = False
+            mock_settings.daemon = False
+            mock_settings.processes = 1
             mock_settings.is_valid.return_value = True
 
             with mock.patch("refcheck.main.get_markdown_files_from_args", return_value=[test_file]):
@@ -413,6 +713,85 @@ class TestMainFunction:
 
             mock_setup_logging.assert_called_once_with(verbose=True)
 
+    def test_main_io_threads_output_order(self, temp_markdown_file, capsys):
+        """Test that checking on several threads reports the same as checking serially."""
+        temp_markdown_file("# Target\n", "target.md")
+        files = [
+            temp_markdown_file(
+                "[a](target.md#target)\n[b](missing.md)\n[c](target.md#nope)\n[d](#here)\n# Here\n",
+                f"file{i}.md",
+            )
+            for i in range(5)
+        ]
+
+        outputs = []
+        for io_threads in (1, 4):
+            with mock.patch("refcheck.main.settings") as mock_settings:
+                mock_settings.paths = files
+                mock_settings.exclude = []
+                mock_settings.verbose = False
+                mock_settings.check_remote = False
+                mock_settings.no_color = True
+                mock_settings.anchor_style = "github"
+                mock_settings.io_threads = io_threads
+                mock_settings.git = False
+                mock_settings.changed_since = None
+                mock_settings.incremental = False
+                mock_settings.watch = False
+                mock_settings.daemon = False
+                mock_settings.processes = 1
+                mock_settings.is_valid.return_value = True
+
+                with (
+                    mock.patch("refcheck.main.get_markdown_files_from_args", return_value=files),
+                    mock.patch(
+                        "refcheck.main.iter_markdown_files_from_args",
+                        return_value=iter(reversed(files)),
+                    ),
+                ):
+                    assert main() is False
+            outputs.append(capsys.readouterr().out)
+
+        assert outputs[0] == outputs[1]
+        assert "10 broken references found" in outputs[1]
+
+    def test_main_processes_output(self, temp_markdown_file, capsys):
+        """Test that checking in several processes reports the same as checking in one."""
+        temp_markdown_file("# Target\n", "target.md")
+        files = [
+            temp_markdown_file(
+                "[a](target.md#target)\n[b](missing.md)\n[c](target.md#nope)\n[d](#here)\n# Here\n",
+                f"file{i}.md",
+            )
+            for i in range(5)
+        ]
+
+        outputs = []
+        for processes in (1, 2):
+            with mock.patch("refcheck.main.settings") as mock_settings:
+                mock_settings.paths = files
+                mock_settings.exclude = []
+                mock_settings.verbose = False
+                mock_settings.check_remote = False
+                mock_settings.no_color = True
+                mock_settings.anchor_style = "github"
+                mock_settings.io_threads = 1
+                mock_settings.git = False
+                mock_settings.changed_since = None
+                mock_settings.incremental = False
+                mock_settings.watch = False
+                mock_settings.daemon = False
+                mock_settings.processes = processes
+                mock_settings.to_arguments.return_value = get_default_arguments()
+                mock_settings.is_valid.return_value = True
+
+                with mock.patch("refcheck.main.get_markdown_files_from_args", return_value=files):
+                    assert main() is False
+            outputs.append(capsys.readouterr().out)
+
+        assert outputs[0] == outputs[1]
+        assert "10 broken references found" in outputs[1]
+
     def test_main_multiple_files(self, temp_markdown_file, capsys):
         """Test main with multiple markdown files."""
         file1 = temp_markdown_file("# File 1", "file1.md")
@@ -424,6 +803,14 @@ class TestMainFunction:
             mock_settings.verbose = False
             mock_settings.check_remote = False
             mock_settings.no_color = True
+            mock_settings.anchor_style = "github"
+            mock_settings.io_threads = 1
+            mock_settings.git = False
+            mock_settings.changed_since = None
+            mock_settings.incremental = False
+            mock_settings.watch = False
+            mock_settings.daemon = False
+            mock_settings.processes = 1
             mock_settings.is_valid.return_value = True
 
             with mock.patch(
@@ -435,22 +822,443 @@ class TestMainFunction:
         captured = capsys.readouterr()
         assert "2 Markdown files to check" in captured.out
 
+    def test_main_changed_since(self, git_repository, git_command, capsys):
+        """Test that only changed files and files linking to changed files are checked."""
+        root = git_repository(
+            {
+                "guide.md": "# Guide",
+                "index.md": "[guide](guide.md)",
+                "old.md": "[broken](missing.md)",
+                "notes.md": "",
+            }
+        )
+        git_command(root, "mv", "guide.md", "manual.md")
+        with open(os.path.join(root, "notes.md"), "w", encoding="utf-8") as file:
+            file.write("[manual](manual.md#guide)")
+        files = [
+            os.path.join(root, name) for name in ("index.md", "manual.md", "notes.md", "old.md")
+        ]
+
+        with mock.patch("refcheck.main.settings") as mock_settings:
+            mock_settings.paths = [root]
+            mock_settings.exclude = []
+            mock_settings.verbose = False
+            mock_settings.check_remote = False
+            mock_settings.no_color = True
+            mock_settings.anchor_style = "github"
+            mock_settings.io_threads = 1
+            mock_settings.git = False
+            mock_settings.changed_since = "HEAD"
+            mock_settings.incremental = False
+            mock_settings.watch = False
+            mock_settings.daemon = False
+            mock_settings.processes = 1
+            mock_settings.is_valid.return_value = True
+
+            with mock.patch("refcheck.main.get_markdown_files_from_args", return_value=files):
+                result = main()
+
+        assert result is False
+        captured = capsys.readouterr()
+        assert "3 of 4 Markdown files changed since HEAD" in captured.out
+        # The link to the renamed file is broken, the unchanged file with a broken link is skipped
+        assert "1 broken references found" in captured.out
+        assert "index.md:1: [guide](guide.md)" in captured.out
+        assert "old.md" not in captured.out.split("Markdown files to check")[1]
+
+    def test_main_incremental(self, temp_markdown_file, monkeypatch, capsys):
+        """Test that re-runs from the cache report the same, and see deleted targets."""
+        target = temp_markdown_file("# Target\n", "target.md")
+        source = temp_markdown_file("[a](target.md#target)\n[b](missing.md)\n", "source.md")
+        monkeypatch.chdir(os.path.dirname(source))
+
+        outputs = []
+        for run in range(3):
+            if run == 2:
+                os.remove(target)
+            with mock.patch("refcheck.main.settings") as mock_settings:
+                mock_settings.paths = [source]
+                mock_settings.exclude = []
+                mock_settings.verbose = False
+                mock_settings.check_remote = False
+                mock_settings.no_color = True
+                mock_settings.allow_absolute = False
+                mock_settings.fs_snapshot = False
+                mock_settings.anchor_style = "github"
+                mock_settings.io_threads = 1
+                mock_settings.git = False
+                mock_settings.changed_since = None
+                mock_settings.incremental = True
+                mock_settings.watch = False
+                mock_settings.daemon = False
+                mock_settings.processes = 1
+                mock_settings.is_valid.return_value = True
+
+                with mock.patch(
+                    "refcheck.main.get_markdown_files_from_args", return_value=[source]
+                ):
+                    assert main() is False
+            outputs.append(capsys.readouterr().out)
+
+        assert os.path.isfile(os.path.join(".refcheck_cache", "index.sqlite3"))
+        assert outputs[0] == outputs[1]
+        assert "1 broken references found" in outputs[1]
+        assert "2 broken references found" in outputs[2]
+
+    def test_main_incremental_git(self, git_repository, monkeypatch, capsys):
+        """Test that verdicts made against the files of git are not reused without --git."""
+        root = git_repository({"index.md": "[build](build.md)\n", ".gitignore": "build.md\n"})
+        with open(os.path.join(root, "build.md"), "w", encoding="utf-8") as file:
+            file.write("# Build\n")
+        monkeypatch.chdir(root)
+
+        outputs = []
+        for git in (True, False, True):
+            # Each run starts in a new process
+            path_index.clear()
+            clear_resolution_caches()
+            with mock.patch("refcheck.main.settings") as mock_settings:
+                mock_settings.paths = ["."]
+                mock_settings.exclude = []
+                mock_settings.verbose = False
+                mock_settings.check_remote = False
+                mock_settings.no_color = True
+                mock_settings.allow_absolute = False
+                mock_settings.fs_snapshot = False
+                mock_settings.anchor_style = "github"
+                mock_settings.io_threads = 1
+                mock_settings.git = git
+                mock_settings.changed_since = None
+                mock_settings.incremental = True
+                mock_settings.watch = False
+                mock_settings.daemon = False
+                mock_settings.processes = 1
+                mock_settings.is_valid.return_value = True
+                main()
+            outputs.append(capsys.readouterr().out)
+
+        # The ignored file is not a target with --git, but exists on disk
+        assert "1 broken references found" in outputs[0]
+        assert "No broken references!" in outputs[1]
+        assert "1 broken references found" in outputs[2]
+
+    def test_main_incremental_git_ignore_changes(self, git_repository, monkeypatch, capsys):
+        """Test that verdicts made with --git are not reused once the files of git change."""
+        root = git_repository(
+            {"docs": {"a.md": "[gen](../build/gen.md)\n"}, ".gitignore": "build/\n"}
+        )
+        os.mkdir(os.path.join(root, "build"))
+        with open(os.path.join(root, "build", "gen.md"), "w", encoding="utf-8") as file:
+            file.write("# Generated\n")
+        monkeypatch.chdir(root)
+
+        outputs = []
+        for ignored in ("build/\n", ""):
+            with open(".gitignore", "w", encoding="utf-8") as file:
+                file.write(ignored)
+            # Each run starts in a new process
+            path_index.clear()
+            clear_resolution_caches()
+            with mock.patch("refcheck.main.settings") as mock_settings:
+                mock_settings.paths = ["docs"]
+                mock_settings.exclude = []
+                mock_settings.verbose = False
+                mock_settings.check_remote = False
+                mock_settings.no_color = True
+                mock_settings.allow_absolute = False
+                mock_settings.fs_snapshot = False
+                mock_settings.anchor_style = "github"
+                mock_settings.io_threads = 1
+                mock_settings.git = True
+                mock_settings.changed_since = None
+                mock_settings.incremental = True
+                mock_settings.watch = False
+                mock_settings.daemon = False
+                mock_settings.processes = 1
+                mock_settings.is_valid.return_value = True
+                main()
+            outputs.append(capsys.readouterr().out)
+
+        assert "1 broken references found" in outputs[0]
+        assert "No broken references!" in outputs[1]
+
+    def test_main_watch(self, temp_directory_structure, monkeypatch, capsys):
+        """Test that watching checks affected files again and returns the last result."""
+        root = temp_directory_structure(
+            {
+                "index.md": "[guide](guide.md)\n[logo](logo.png)\n",
+                "guide.md": "# Guide\n",
+                "other.md": "[guide](guide.md)\n",
+            }
+        )
+        monkeypatch.chdir(root)
+        logo = os.path.join(root, "logo.png")
+        guide = os.path.join(root, "guide.md")
+
+        def create_logo():
+            with open(logo, "w", encoding="utf-8"):
+                pass
+            return {logo}
+
+        def delete_guide():
+            os.remove(guide)
+            return {guide}
+
+        def restore_guide():
+            with open(guide, "w", encoding="utf-8") as file:
+                file.write("# Guide\n")
+            return {guide}
+
+        def interrupt():
+            raise KeyboardInterrupt
+
+        # Each wait makes a change and returns the changed paths, like a watcher would
+        changes = iter([set, create_logo, delete_guide, restore_guide, interrupt])
+        watcher = mock.MagicMock()
+        watcher.directories = [root]
+        watcher.name = "test"
+        watcher.wait_for_changes.side_effect = lambda: next(changes)()
+
+        with mock.patch("refcheck.main.settings") as mock_settings:
+            mock_settings.paths = ["."]
+            mock_settings.exclude = []
+            mock_settings.verbose = False
+            mock_settings.check_remote = False
+            mock_settings.no_color = True
+            mock_settings.anchor_style = "github"
+            mock_settings.io_threads = 1
+            mock_settings.git = False
+            mock_settings.changed_since = None
+            mock_settings.incremental = False
+            mock_settings.watch = True
+            mock_settings.daemon = False
+            mock_settings.processes = 1
+            mock_settings.fs_snapshot = False
+            mock_settings.is_valid.return_value = True
+
+            with mock.patch("refcheck.main.create_watcher", return_value=watcher):
+                assert main() is True
+
+        # Each part has the summary of a check, then the files checked again after a change
+        checks = capsys.readouterr().out.split("Reference check complete.")
+        assert "1 broken references found" in checks[1]
+        # Creating the logo fixes the link of index.md, without checking other.md again
+        assert "1 Markdown files to check again." in checks[1]
+        assert "FILE: other.md" not in checks[1]
+        # Deleting the guide breaks the links of both files, and restoring it fixes them
+        assert "No broken references!" in checks[2]
+        assert "2 Markdown files to check again." in checks[2]
+        assert "2 broken references found" in checks[3]
+        assert "No broken references!" in checks[4]
+        assert "Stopped watching." in checks[4]
+
+    def test_main_watch_git(self, git_repository, monkeypatch, capsys):
+        """Test that targets are looked up in the files of git after any change, with --git."""
+        root = git_repository(
+            {"docs": {"a.md": "[gen](../build/gen.md)\n"}, ".gitignore": "build/\n"}
+        )
+        os.mkdir(os.path.join(root, "build"))
+        with open(os.path.join(root, "build", "gen.md"), "w", encoding="utf-8") as file:
+            file.write("# Generated\n")
+        monkeypatch.chdir(root)
+        document = os.path.join(root, "docs", "a.md")
+
+        def edit_document():
+            with open(document, "a", encoding="utf-8") as file:
+                file.write("\nMore text.\n")
+            return {document}
+
+        def interrupt():
+            raise KeyboardInterrupt
+
+        changes = iter([edit_document, interrupt])
+        watcher = mock.MagicMock()
+        watcher.directories = [os.path.join(root, "docs")]
+        watcher.name = "test"
+        watcher.wait_for_changes.side_effect = lambda: next(changes)()
+
+        path_index.clear()
+        clear_resolution_caches()
+        with mock.patch("refcheck.main.settings") as mock_settings:
+            mock_settings.paths = ["docs"]
+            mock_settings.exclude = []
+            mock_settings.verbose = False
+            mock_settings.check_remote = False
+            mock_settings.no_color = True
+            mock_settings.anchor_style = "github"
+            mock_settings.io_threads = 1
+            mock_settings.git = True
+            mock_settings.changed_since = None
+            mock_settings.incremental = False
+            mock_settings.watch = True
+            mock_settings.daemon = False
+            mock_settings.processes = 1
+            mock_settings.fs_snapshot = False
+            mock_settings.is_valid.return_value = True
+
+            with mock.patch("refcheck.main.create_watcher", return_value=watcher):
+                assert main() is False
+        path_index.clear()
+
+        # The ignored file is not a target with --git, before and after the edit
+        checks = capsys.readouterr().out.split("Reference check complete.")
+        assert "1 broken references found" in checks[1]
+        assert "1 Markdown files to check again." in checks[1]
+        assert "1 broken references found" in checks[2]
+
+
+class TestCheckServer:
+    """Tests for CheckServer class."""
+
+    @pytest.fixture
+    def server(self, temp_directory_structure, monkeypatch):
+        root = temp_directory_structure(
+            {
+                "docs": {"index.md": "[guide](guide.md#setup)\n", "guide.md": "# Guide\n"},
+                "other.md": "[index](docs/index.md)\n",
+            }
+        )
+        monkeypatch.chdir(root)
+        with mock.patch("refcheck.main.settings") as mock_settings:
+            for name in OPTIONS:
+                setattr(mock_settings, name, False)
+            mock_settings.paths = ["docs"]
+            mock_settings.exclude = []
+            mock_settings.no_color = True
+            mock_settings.anchor_style = "github"
+            mock_settings.io_threads = 1
+            mock_settings.changed_since = None
+
+            watcher = mock.MagicMock()
+            watcher.directories = [os.path.join(root, "docs")]
+            watcher.wait_for_changes.return_value = set()
+            with mock.patch("refcheck.main.create_watcher", return_value=watcher):
+                server = CheckServer()
+            yield server, root
+
+    def request(self, server, paths):
+        return server.handle({"cwd": os.getcwd(), "paths": paths, "options": server.options})
+
+    def test_check(self, capsys, server):
+        """Test that the response has the output of the check and the broken references."""
+        server, root = server
+        assert "Loaded 2 Markdown files." in capsys.readouterr().out
+
+        response = self.request(server, ["docs"])
+        assert response["ok"] is False
+        assert "[guide](guide.md#setup) - " in response["output"]
+        assert "1 broken references found" in response["output"]
+        assert response["broken"] == [
+            {
+                "file": os.path.join("docs", "index.md"),
+                "line": 1,
+                "syntax": "[guide](guide.md#setup)",
+                "link": "guide.md#setup",
+            }
+        ]
+        # The output goes to the client only
+        assert "BROKEN" not in capsys.readouterr().out
+
+    def test_changes_are_seen(self, server):
+        """Test that the documents of changed files are read again before a check."""
+        server, root = server
+        assert self.request(server, ["docs/index.md"])["ok"] is False
+
+        guide = os.path.join(root, "docs", "guide.md")
+        with open(guide, "w", encoding="utf-8") as file:
+            file.write("# Guide\n\n## Setup\n")
+        # Unchanged files are not read again
+        with mock.patch("refcheck.store.DocumentStore._load") as load:
+            assert self.request(server, ["docs/index.md"])["ok"] is False
+            load.assert_not_called()
+
+        server.watcher.wait_for_changes.return_value = {guide}
+        response = self.request(server, ["docs/index.md"])
+        assert response["ok"] is True
+        assert response["broken"] == []
+
+    def test_polling_watcher(self, server):
+        """Test that requests do not wait for the interval of a polling watcher."""
+        server, root = server
+        server.watcher = PollingWatcher(server.watcher.directories, interval=5)
+        start = time.monotonic()
+        assert self.request(server, ["docs/index.md"])["ok"] is False
+
+        with open(os.path.join(root, "docs", "guide.md"), "w", encoding="utf-8") as file:
+            file.write("# Guide\n\n## Setup\n")
+        assert self.request(server, ["docs/index.md"])["ok"] is True
+        assert time.monotonic() - start < 1
+
+    def test_errors(self, server):
+        """Test that requests the server cannot answer like the client would get an error."""
+        server, root = server
+        options = dict(server.options, check_remote=True)
+        assert (
+            "other options"
+            in server.handle({"cwd": os.getcwd(), "paths": ["docs"], "options": options})["error"]
+        )
+        assert (
+            "serves"
+            in server.handle(
+                {"cwd": os.path.dirname(root), "paths": ["docs"], "options": server.options}
+            )["error"]
+        )
+        assert "other paths" in self.request(server, ["other.md"])["error"]
+        assert "no list of paths" in self.request(server, "docs")["error"]
+
+
+class TestGetReferenceKinds:
+    """Tests for get_reference_kinds() function."""
+
+    def test_default_kinds(self):
+        """Test that only the default kinds are enabled without flags."""
+        with mock.patch("refcheck.main.settings") as mock_settings:
+            mock_settings.html_links = False
+            mock_settings.html_images = False
+            mock_settings.raw_links = False
+            assert get_reference_kinds() == DEFAULT_KINDS
+
+    def test_flags_enable_kinds(self):
+        """Test that each flag enables its reference kind."""
+        with mock.patch("refcheck.main.settings") as mock_settings:
+            mock_settings.html_links = True
+            mock_settings.html_images = False
+            mock_settings.raw_links = True
+            kinds = get_reference_kinds()
+
+        assert ReferenceKind.HTML_LINK in kinds
+        assert ReferenceKind.HTML_IMAGE not in kinds
+        assert ReferenceKind.RAW_LINK in kinds
+
 
 class TestBrokenReferenceDataClass:
     """Tests for BrokenReference data class."""
 
     def test_broken_reference_creation(self):
         """Test creating a BrokenReference object."""
-        broken_ref = BrokenReference(
+        reference = Reference(
             file_path="/path/to/file.md",
             line_number=10,
             syntax="[link](broken.md)",
             link="broken.md",
-            is_remote=False,
-            status="BROKEN",
         )
+        broken_ref = BrokenReference(reference=reference, status="BROKEN")
 
-        assert broken_ref.file_path == "/path/to/file.md"
-        assert broken_ref.line_number == 10
-        assert broken_ref.link == "broken.md"
+        assert broken_ref.reference is reference
+        assert broken_ref.reference.file_path == "/path/to/file.md"
+        assert broken_ref.reference.line_number == 10
+        assert broken_ref.reference.link == "broken.md"
         assert broken_ref.status == "BROKEN"
+
+    def test_broken_reference_has_no_instance_dict(self):
+        """Test that BrokenReference is slotted and does not copy reference fields."""
+        reference = Reference(
+            file_path="/path/to/file.md",
+            line_number=10,
+            syntax="[link](broken.md)",
+            link="broken.md",
+        )
+        broken_ref = BrokenReference(reference=reference, status="BROKEN")
+
+        assert not hasattr(broken_ref, "__dict__")
+        assert not hasattr(reference, "__dict__")
@@ -1,8 +1,25 @@
 """Tests for refcheck.parsers module."""
 
+import dataclasses
 import os
 
-from refcheck.parsers import MarkdownParser, Reference, ReferenceMatch
+import pytest
+
+from refcheck.parsers import (
+    MarkdownParser,
+    Reference,
+    ReferenceKind,
+    ReferenceMatch,
+    TargetKind,
+    classify_link,
+)
+from refcheck.store import DocumentStore
+
+
+def read_references(parser, file_path):
+    """Return the references of a file in document order, read through a document store."""
+    document = DocumentStore(parser).get(file_path)
+    return list(document.references) if document else []
 
 
 class TestMarkdownParser:
@@ -200,6 +217,14 @@ Line 7
         assert result["basic_images"][0].line_number == 6
         assert result["inline_links"][0].line_number == 8
 
+    def test_parse_markdown_file_columns(self, temp_markdown_file):
+        """Test that the byte offset of each reference in its line is recorded."""
+        file_path = temp_markdown_file("# Title\n[a](x.md) é [a](x.md)\n[b](y.md)\n")
+        parser = MarkdownParser()
+        result = parser.parse_markdown_file(file_path)
+
+        assert [ref.column for ref in result["basic_references"]] == [0, 13, 0]
+
     def test_parse_real_fixture_file_code_blocks(self):
         """Test parsing real fixture file with code blocks."""
         fixture_path = os.path.join(
@@ -243,82 +268,218 @@ Line 7
 
     def test_is_remote_reference_http(self):
         """Test remote reference detection for HTTP."""
-        parser = MarkdownParser()
-        assert parser._is_remote_reference("http://example.com") is True
-        assert parser._is_remote_reference("https://example.com") is True
+        assert Reference("doc.md", 1, "", "http://example.com").is_remote is True
+        assert Reference("doc.md", 1, "", "https://example.com").is_remote is True
 
     def test_is_remote_reference_mailto(self):
         """Test remote reference detection for mailto."""
-        parser = MarkdownParser()
-        assert parser._is_remote_reference("mailto:user@example.com") is True
+        assert Reference("doc.md", 1, "", "mailto:user@example.com").is_remote is True
 
     def test_is_remote_reference_local_file(self):
         """Test remote reference detection for local files."""
-        parser = MarkdownParser()
-        assert parser._is_remote_reference("file.md") is False
-        assert parser._is_remote_reference("../file.md") is False
-        assert parser._is_remote_reference("./file.md") is False
-        assert parser._is_remote_reference("/absolute/path.md") is False
+        assert Reference("doc.md", 1, "", "file.md").is_remote is False
+        assert Reference("doc.md", 1, "", "../file.md").is_remote is False
+        assert Reference("doc.md", 1, "", "./file.md").is_remote is False
+        assert Reference("doc.md", 1, "", "/absolute/path.md").is_remote is False
 
     def test_is_remote_reference_header(self):
         """Test remote reference detection for headers."""
+        assert Reference("doc.md", 1, "", "#header").is_remote is False
+        assert Reference("doc.md", 1, "", "file.md#header").is_remote is False
+
+    def test_code_reference_outside_code_is_kept(self, temp_markdown_file):
+        """Test that a reference is only dropped where it appears inside code."""
+        content = """# Test
+`[link](file.md)`
+[link](file.md)
+"""
+        file_path = temp_markdown_file(content)
         parser = MarkdownParser()
-        assert parser._is_remote_reference("#header") is False
-        assert parser._is_remote_reference("file.md#header") is False
+        result = parser.parse_markdown_file(file_path)
+
+        basic_refs = result["basic_references"]
+        assert len(basic_refs) == 1
+        assert basic_refs[0].line_number == 3
 
-    def test_drop_code_references_empty_lists(self):
-        """Test _drop_code_references with empty input."""
+    def test_to_reference(self, temp_markdown_file):
+        """Test _to_reference method."""
         parser = MarkdownParser()
-        result = parser._drop_code_references([], [])
-        assert result == []
+        content = "See [link](file.md)"
+        file_path = temp_markdown_file(content)
+
+        ref_match = ReferenceMatch(line_number=1, start=4, end=19, link_start=11, link_end=18)
 
-    def test_drop_code_references_no_code(self):
-        """Test _drop_code_references when there are no code sections."""
+        reference = parser._to_reference(
+            file_path, ReferenceKind.BASIC_REFERENCE, ref_match, content.encode()
+        )
+        assert reference.file_path == file_path
+        assert reference.line_number == 1
+        assert reference.link == "file.md"
+        assert reference.syntax == "[link](file.md)"
+        assert reference.kind is ReferenceKind.BASIC_REFERENCE
+
+    def test_iter_matches_with_line_numbers(self):
+        """Test _iter_matches_with_line_numbers method."""
         parser = MarkdownParser()
         import re
 
-        match = re.search(r"\[(.+?)\]\((.+?)\)", "[link](file.md)")
-        ref = ReferenceMatch(line_number=1, match=match)
-        result = parser._drop_code_references([ref], [])
-        assert len(result) == 1
+        # Use pattern with named groups like in parsers.py
+        pattern = re.compile(rb"!*\[(?P<text>[^\]]+)\]\((?P<link>[^)]+)\)")
+        text = b"""line 1
+[link1](file1.md)
+line 3
+[link2](file2.md) [link3](file3.md)"""
+
+        matches = list(parser._iter_matches_with_line_numbers(pattern, text))
+        assert [line_number for line_number, _ in matches] == [2, 4, 4]
 
-    def test_process_basic_references(self, temp_markdown_file):
-        """Test _process_basic_references method."""
+    def test_references_document_order(self, temp_markdown_file):
+        """Test that the references of a file are typed and in document order."""
+        content = """# Test
+<https://example.com>
+![image](image.png)
+[link](file.md)
+"""
+        file_path = temp_markdown_file(content)
         parser = MarkdownParser()
-        content = "[link](file.md)"
+
+        references = read_references(parser, file_path)
+        assert [ref.kind for ref in references] == [
+            ReferenceKind.INLINE_LINK,
+            ReferenceKind.BASIC_IMAGE,
+            ReferenceKind.BASIC_REFERENCE,
+        ]
+        assert [ref.line_number for ref in references] == [2, 3, 4]
+
+    def test_parse_html_and_raw_links_disabled_by_default(self, temp_markdown_file):
+        """Test that HTML references and bare URLs are not extracted by default."""
+        content = '<a href="page.md">Page</a> <img src="logo.png"> https://example.com\n'
         file_path = temp_markdown_file(content)
+        parser = MarkdownParser()
+        result = parser.parse_markdown_file(file_path)
 
-        import re
+        assert result["html_links"] == []
+        assert result["html_images"] == []
+        assert result["raw_links"] == []
 
-        # Use the same pattern as in parsers.py with named groups
-        pattern = re.compile(r"!*\[(?P<text>[^\]]+)\]\((?P<link>[^)]+)\)")
-        matches = []
-        for match in re.finditer(pattern, content):
-            matches.append(ReferenceMatch(line_number=1, match=match))
+    def test_parse_html_and_raw_links_same_scan(self, temp_markdown_file):
+        """Test extracting HTML anchors, images and bare URLs with code exclusion."""
+        content = """# Test
+<a class="x" href="page.md#intro">Page</a>
+<img alt="Logo" src='logo.png' />
+Visit https://example.com/docs. for more.
+`https://inline-code.com` and `<a href="code.md">`
+
+```html
+<a href="fenced.md">Fenced</a> <img src="fenced.png"> https://fenced.com
+```
+"""
+        file_path = temp_markdown_file(content)
+        parser = MarkdownParser(frozenset(ReferenceKind))
+        result = parser.parse_markdown_file(file_path)
 
-        references = parser._process_basic_references(file_path, matches)
-        assert len(references) == 1
-        assert references[0].file_path == file_path
-        assert references[0].line_number == 1
-        assert references[0].link == "file.md"
-        assert references[0].syntax == "[link](file.md)"
+        assert [(ref.link, ref.line_number) for ref in result["html_links"]] == [
+            ("page.md#intro", 2)
+        ]
+        assert result["html_links"][0].syntax == '<a class="x" href="page.md#intro">'
+        assert [(ref.link, ref.line_number) for ref in result["html_images"]] == [("logo.png", 3)]
+        assert [(ref.link, ref.line_number) for ref in result["raw_links"]] == [
+            ("https://example.com/docs", 4)
+        ]
+        assert result["raw_links"][0].is_remote is True
+
+    def test_raw_links_inside_other_references_are_not_duplicated(self, temp_markdown_file):
+        """Test that URLs that are part of other references are not reported as bare URLs."""
+        content = '[x](https://a.com) <https://b.com> <a href="https://c.com">c</a>\n'
+        file_path = temp_markdown_file(content)
+        parser = MarkdownParser(frozenset(ReferenceKind))
+        result = parser.parse_markdown_file(file_path)
+
+        assert result["raw_links"] == []
+        assert len(result["basic_references"]) == 1
+        assert len(result["inline_links"]) == 1
+        assert len(result["html_links"]) == 1
 
-    def test_find_matches_with_line_numbers(self):
-        """Test _find_matches_with_line_numbers method."""
+    def test_reference_links_resolved_through_definitions(self, temp_markdown_file):
+        """Test that reference-style links are resolved against the document's definitions."""
+        content = """# Test
+See [the guide][guide], the [Guide][] and ![logo][img].
+Again [the guide][ GUIDE ].
+
+[guide]: docs/guide.md "The Guide"
+   [img]: <images/logo.png>
+[guide]: duplicate.md
+[^1]: A footnote is not a link definition.
+"""
+        file_path = temp_markdown_file(content)
         parser = MarkdownParser()
-        import re
+        result = parser.parse_markdown_file(file_path)
 
-        # Use pattern with named groups like in parsers.py
-        pattern = re.compile(r"!*\[(?P<text>[^\]]+)\]\((?P<link>[^)]+)\)")
-        text = """line 1
-[link1](file1.md)
-line 3
-[link2](file2.md)"""
+        # Each definition is reported once, no matter how many usages point at it
+        definitions = result["link_definitions"]
+        assert [(ref.link, ref.line_number) for ref in definitions] == [
+            ("docs/guide.md", 5),
+            ("images/logo.png", 6),
+        ]
+        assert result["reference_links"] == []
+
+    def test_reference_links_undefined_labels(self, temp_markdown_file):
+        """Test that usages of undefined labels are reported after the scan."""
+        content = """[used before definition][late] and [undefined][nope]
+`[in code][nope2]`
+
+[late]: https://example.com
+"""
+        file_path = temp_markdown_file(content)
+        parser = MarkdownParser()
+        references = read_references(parser, file_path)
+
+        assert [(ref.kind, ref.link) for ref in references] == [
+            (ReferenceKind.LINK_DEFINITION, "https://example.com"),
+            (ReferenceKind.REFERENCE_LINK, "nope"),
+        ]
+        assert references[1].line_number == 1
+        assert references[1].syntax == "[undefined][nope]"
+
+    def test_reference_links_not_matched_in_indexing(self, temp_markdown_file):
+        """Test that brackets glued to a word, as in `a[i][j]`, are not reference links."""
+        content = "The cell a[i][j] of matrix[row][col][k], unlike [real][missing].\n"
+        file_path = temp_markdown_file(content)
+        parser = MarkdownParser()
+        references = read_references(parser, file_path)
+
+        assert [(ref.kind, ref.link) for ref in references] == [
+            (ReferenceKind.REFERENCE_LINK, "missing"),
+        ]
+
+    def test_prefilter_skips_files_without_link_syntax(self, temp_markdown_file):
+        """Test that files without any link syntax are skipped before decoding."""
+        file_path = temp_markdown_file("| a | b |\n| 1 | 2 |\n")
+        parser = MarkdownParser()
+
+        assert read_references(parser, file_path) == []
+        assert parser.stats.files == 1
+        assert parser.stats.skipped_files == 1
+        assert parser.stats.skipped_file_bytes == len("| a | b |\n| 1 | 2 |\n")
+
+    def test_prefilter_skips_link_free_stretches(self, temp_markdown_file):
+        """Test that link-free stretches are skipped and counted in the stats."""
+        filler = "plain text line\n" * 100
+        content = filler + "[link](file.md)\n" + filler
+        file_path = temp_markdown_file(content)
+        parser = MarkdownParser()
+
+        references = read_references(parser, file_path)
+        assert [(ref.link, ref.line_number) for ref in references] == [("file.md", 101)]
+        assert parser.stats.skipped_files == 0
+        assert parser.stats.skipped_bytes == 2 * len(filler) + 1  # The trailing newline
+        assert parser.stats.scanned_bytes == len("[link](file.md)")
+        assert "Skipped 0 of 1 files" in str(parser.stats)
 
-        matches = parser._find_matches_with_line_numbers(pattern, text)
-        assert len(matches) == 2
-        assert matches[0].line_number == 2
-        assert matches[1].line_number == 4
+    def test_references_file_not_found(self):
+        """Test that a non-existent file has no references."""
+        parser = MarkdownParser()
+        assert read_references(parser, "/nonexistent/file.md") == []
 
     def test_parse_multiple_references_same_line(self, temp_markdown_file):
         """Test parsing multiple references on the same line."""
@@ -352,6 +513,44 @@ line 3
         assert basic_images[0].link == "image.png"
 
 
+class TestClassifyLink:
+    """Tests for classify_link function."""
+
+    @pytest.mark.parametrize(
+        "link, target, path, fragment",
+        [
+            ("#intro", TargetKind.SAME_FILE_ANCHOR, "", "intro"),
+            ("guide.md", TargetKind.MARKDOWN, "guide.md", ""),
+            ("../docs/Guide.MD#setup", TargetKind.MARKDOWN, "../docs/Guide.MD", "setup"),
+            ("notes.markdown#a#b", TargetKind.MARKDOWN, "notes.markdown", "a#b"),
+            ("page.mdx", TargetKind.ASSET, "page.mdx", ""),
+            ("backup.md.bak", TargetKind.ASSET, "backup.md.bak", ""),
+            ("manual.pdf#page=2", TargetKind.ASSET, "manual.pdf", "page=2"),
+            ("/img/logo.png", TargetKind.ASSET, "/img/logo.png", ""),
+            ("https://example.com/a.md#b", TargetKind.REMOTE, "https://example.com/a.md#b", ""),
+            ("HTTP://EXAMPLE.COM", TargetKind.REMOTE, "HTTP://EXAMPLE.COM", ""),
+            ("mailto:user@example.com", TargetKind.OTHER_SCHEME, "mailto:user@example.com", ""),
+            ("ftp://example.com/file", TargetKind.OTHER_SCHEME, "ftp://example.com/file", ""),
+        ],
+    )
+    def test_classify_link(self, link, target, path, fragment):
+        """Test that links are classified by their target and split into path and fragment."""
+        assert classify_link(link) == (target, path, fragment)
+
+    def test_reference_is_classified_on_demand(self):
+        """Test that references derive the classification of their link without storing it."""
+        ref = Reference("doc.md", 1, "[x](other.md#part)", "other.md#part")
+        assert (ref.target, ref.path, ref.fragment) == (TargetKind.MARKDOWN, "other.md", "part")
+        assert [field.name for field in dataclasses.fields(Reference)] == [
+            "file_path",
+            "line_number",
+            "syntax",
+            "link",
+            "kind",
+            "column",
+        ]
+
+
 class TestReferenceDataClass:
     """Tests for Reference data class."""
 
@@ -362,7 +561,6 @@ class TestReferenceDataClass:
             line_number=10,
             syntax="[link](target.md)",
             link="target.md",
-            is_remote=False,
         )
         assert ref.file_path == "/path/to/file.md"
         assert ref.line_number == 10
@@ -377,7 +575,6 @@ class TestReferenceDataClass:
             line_number=10,
             syntax="[link](target.md)",
             link="target.md",
-            is_remote=False,
         )
         str_repr = str(ref)
         assert "Reference:" in str_repr
@@ -393,7 +590,81 @@ class TestReferenceDataClass:
             line_number=5,
             syntax="[link](https://example.com)",
             link="https://example.com",
-            is_remote=True,
         )
         str_repr = str(ref)
         assert "Remote" in str_repr
+
+    def test_reference_is_frozen_and_slotted(self):
+        """Test that references are immutable and carry no per-instance dict."""
+        ref = Reference(
+            file_path="/path/to/file.md",
+            line_number=5,
+            syntax="[link](target.md)",
+            link="target.md",
+        )
+        assert not hasattr(ref, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            ref.link = "other.md"  # type: ignore[misc]
+
+    def test_references_share_interned_file_path(self, temp_markdown_file):
+        """Test that all references of a file share one file path string."""
+        file_path = temp_markdown_file("[a](a.md) [b](b.md)")
+        parser = MarkdownParser()
+        # Build the path dynamically so it is not the same object as the interned one
+        first, second = read_references(parser, os.path.join(*os.path.split(file_path)))
+        assert first.file_path is second.file_path
+
+    def test_invalid_utf8_is_replaced(self, tmp_path):
+        """Test that undecodable bytes do not abort parsing."""
+        file_path = tmp_path / "latin1.md"
+        file_path.write_bytes(b"Caf\xe9 [caf\xe9](caf\xe9.md)\n[ok](ok.md)\n")
+        parser = MarkdownParser()
+
+        references = read_references(parser, str(file_path))
+        assert [ref.link for ref in references] == ["caf�.md", "ok.md"]
+        assert references[0].syntax == "[caf�](caf�.md)"
+        assert parser.stats.undecodable_slices == 2
+
+    def test_multibyte_characters_before_links(self, temp_markdown_file):
+        """Test that byte offsets of matches are sliced and decoded correctly."""
+        file_path = temp_markdown_file("Über ✓ [Ärger](dateien/ärger.md)\n")
+        parser = MarkdownParser()
+
+        (reference,) = read_references(parser, file_path)
+        assert reference.link == "dateien/ärger.md"
+        assert reference.syntax == "[Ärger](dateien/ärger.md)"
+
+    def test_empty_file(self, temp_markdown_file):
+        """Test that empty files are parsed without mapping them."""
+        file_path = temp_markdown_file("")
+        parser = MarkdownParser()
+
+        assert read_references(parser, file_path) == []
+        assert parser.stats.mapped_files == 0
+
+    def test_large_files_are_memory_mapped(self, temp_markdown_file, monkeypatch):
+        """Test that files above the threshold are scanned through a memory map."""
+        monkeypatch.setattr("refcheck.parsers.MMAP_THRESHOLD", 1)
+        monkeypatch.setattr("refcheck.parsers.NEWLINE_CHUNK_SIZE", 7)
+        filler = "plain text line\n" * 10
+        file_path = temp_markdown_file(filler + "[link](file.md)\n" + filler + "<https://a.io>\n")
+        parser = MarkdownParser()
+
+        references = read_references(parser, file_path)
+        assert [(ref.link, ref.line_number) for ref in references] == [
+            ("file.md", 11),
+            ("https://a.io", 22),
+        ]
+        assert parser.stats.mapped_files == 1
+
+    def test_memory_map_is_closed_when_abandoned(self, temp_markdown_file, monkeypatch):
+        """Test that the memory map is released when a consumer stops early."""
+        monkeypatch.setattr("refcheck.parsers.MMAP_THRESHOLD", 1)
+        file_path = temp_markdown_file("[a](a.md)\n[b](b.md)\n")
+        parser = MarkdownParser()
+
+        with parser.open_buffer(file_path) as buffer:
+            references = parser.iter_references_in_buffer(file_path, buffer)
+            assert next(references).link == "a.md"
+            references.close()
+        assert buffer.closed
@@ -20,6 +20,18 @@ class TestSettings:
         assert settings.no_color is False
         assert settings.allow_absolute is False
         assert settings.exclude == []
+        assert settings.html_links is False
+        assert settings.html_images is False
+        assert settings.raw_links is False
+        assert settings.anchor_style == "github"
+        assert settings.fs_snapshot is False
+        assert settings.io_threads == 1
+        assert settings.git is False
+        assert settings.changed_since is None
+        assert settings.incremental is False
+        assert settings.watch is False
+        assert settings.daemon is False
+        assert settings.processes == 1
 
     def test_settings_initialization_without_pytest(self):
         """Test settings initialization when not running under pytest."""
@@ -51,6 +63,30 @@ class TestSettings:
             if pytest_module:
                 sys.modules["pytest"] = pytest_module
 
+    def test_settings_configure(self):
+        """Test that configured settings replace the defaults, without parsing the command line."""
+        from refcheck.cli import get_default_arguments
+
+        args = get_default_arguments()
+        args.allow_absolute = True
+        args.anchor_style = "gitlab"
+
+        with mock.patch("refcheck.settings.get_command_line_arguments") as parse:
+            settings = Settings()
+            settings.configure(args)
+            assert settings.allow_absolute is True
+            assert settings.anchor_style == "gitlab"
+            assert settings.paths == []
+            parse.assert_not_called()
+
+    def test_settings_to_arguments(self):
+        """Test that the arguments of settings configure the same settings, e.g. in a process."""
+        settings = Settings()
+        copy = Settings()
+        vars(copy).clear()
+        copy.configure(settings.to_arguments())
+        assert str(copy) == str(settings)
+
     def test_settings_paths_property(self):
         """Test paths property."""
         settings = Settings()
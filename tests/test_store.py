@@ -0,0 +1,62 @@
+"""Tests for refcheck.store module."""
+
+import builtins
+from unittest import mock
+
+from refcheck.anchors import AnchorStyle
+from refcheck.parsers import MarkdownParser
+from refcheck.store import DocumentStore
+
+
+class TestDocumentStore:
+    """Tests for DocumentStore class."""
+
+    def test_get_references_and_anchors(self, temp_markdown_file):
+        """Test that a document holds both its references and its anchors."""
+        file_path = temp_markdown_file("# Guide\n\nSee [setup](#setup).\n\n## Setup\n")
+        store = DocumentStore()
+
+        document = store.get(file_path)
+        assert document.path == file_path
+        assert [ref.link for ref in document.references] == ["#setup"]
+        assert document.anchors == {"guide", "setup"}
+
+    def test_file_is_read_once(self, tmp_path, monkeypatch):
+        """Test that all ways to refer to a file share one read."""
+        (tmp_path / "docs").mkdir()
+        (tmp_path / "docs" / "file.md").write_text("# Title\n[a](b.md)\n", encoding="utf-8")
+        monkeypatch.chdir(tmp_path)
+        store = DocumentStore()
+
+        with mock.patch(
+            "refcheck.parsers.open", side_effect=builtins.open, create=True
+        ) as mock_file:
+            first = store.get("docs/file.md")
+            assert store.get("docs/../docs/file.md") is first
+            assert store.get(str(tmp_path / "docs" / "file.md")) is first
+        mock_file.assert_called_once()
+        assert first.path == "docs/file.md"
+
+    def test_anchors_of_files_without_links(self, temp_markdown_file):
+        """Test that skipping files without link syntax does not skip their anchors."""
+        file_path = temp_markdown_file("# Only Headers\n\n## Here\n")
+        store = DocumentStore()
+
+        document = store.get(file_path)
+        assert document.references == ()
+        assert document.anchors == {"only-headers", "here"}
+        assert store.parser.stats.skipped_files == 1
+
+    def test_missing_file(self, tmp_path):
+        """Test that missing files have no document."""
+        store = DocumentStore()
+        assert store.get(str(tmp_path / "missing.md")) is None
+
+    def test_reset(self, temp_markdown_file):
+        """Test that reset forgets documents and applies the new configuration."""
+        file_path = temp_markdown_file("# A -- B\n")
+        store = DocumentStore()
+        assert store.get(file_path).anchors == {"a----b"}
+
+        store.reset(MarkdownParser(), AnchorStyle.GITLAB)
+        assert store.get(file_path).anchors == {"a-b"}
@@ -1,7 +1,12 @@
 import os
+import threading
 import pytest
 from unittest.mock import patch
 from refcheck.utils import (
+    ParallelWalker,
+    PathIndex,
+    iter_markdown_files_from_args,
+    path_index,
     get_markdown_files_from_dir,
     get_markdown_files_from_args,
     load_exclusion_patterns,
@@ -11,6 +16,7 @@ from refcheck.utils import (
     print_green,
     print_yellow,
     CHECK_IGNORE_DEFAULTS,
+    _scan_directory,
 )
 
 
@@ -41,7 +47,7 @@ venv
             mock_settings.no_color = True
             result = load_exclusion_patterns()
 
-        # Should return all non-empty lines (including comments in current implementation)
+        # Should return all non-empty lines except comments
         assert "node_modules" in result
         assert ".git" in result
         assert "build" in result
@@ -122,11 +128,8 @@ build
             mock_settings.no_color = True
             result = load_exclusion_patterns()
 
-        # Comments starting with # are not filtered, but if the implementation
-        # strips them, this should be empty. Based on the code, it reads
-        # lines and strips them, so comments would be included.
-        # Let's verify actual behavior - comments are NOT filtered in current code
-        assert "# Comment 1" in result
+        # Comments starting with # are skipped, like in .gitignore files
+        assert result == []
 
     def test_load_exclusion_patterns_strips_whitespace(self, tmp_path, monkeypatch, capsys):
         """Test that exclusion patterns have whitespace stripped."""
@@ -153,50 +156,159 @@ build
 # === Test get_markdown_files_from_dir ===
 
 
-def test_get_markdown_files_from_dir():
-    with patch("os.walk") as mock_walk:
-        # Mock folder structure for testing, which is returned by os.walk:
-        # root
-        # ├── subdir1
-        # │   └── file3.md
-        # └── subdir2
-        #     ├── file4.txt
-        #     └── file5.md
-        # ├── file1.md
-        # └── file2.py
-        mock_walk.return_value = [
-            (
-                os.path.normpath("root"),
-                ("subdir1", "subdir2"),
-                ("file1.md", "file2.py"),
-            ),
-            (os.path.normpath("root/subdir1"), (), ("file3.md",)),
-            (os.path.normpath("root/subdir2"), (), ("file4.txt", "file5.md")),
-        ]
-
-        # Test case 1: No exclude
-        result = get_markdown_files_from_dir("root")
-        expected = [
-            os.path.normpath("root/file1.md"),
-            os.path.normpath("root/subdir1/file3.md"),
-            os.path.normpath("root/subdir2/file5.md"),
-        ]
-        assert result == expected
+def test_get_markdown_files_from_dir(temp_directory_structure, monkeypatch):
+    # root
+    # ├── subdir1
+    # │   └── file3.md
+    # └── subdir2
+    #     ├── file4.txt
+    #     └── file5.md
+    # ├── file1.md
+    # └── file2.py
+    monkeypatch.chdir(
+        temp_directory_structure(
+            {
+                "root": {
+                    "subdir1": {"file3.md": ""},
+                    "subdir2": {"file4.txt": "", "file5.md": ""},
+                    "file1.md": "",
+                    "file2.py": "",
+                }
+            }
+        )
+    )
+
+    # Test case 1: No exclude
+    result = get_markdown_files_from_dir("root")
+    expected = [
+        os.path.normpath("root/file1.md"),
+        os.path.normpath("root/subdir1/file3.md"),
+        os.path.normpath("root/subdir2/file5.md"),
+    ]
+    assert sorted(result) == expected
+
+    # Test case 2: Exclude directory root/subdir1
+    result = get_markdown_files_from_dir("root", exclude=["root/subdir1"])
+    expected = [
+        os.path.normpath("root/file1.md"),
+        os.path.normpath("root/subdir2/file5.md"),
+    ]
+    assert sorted(result) == expected
+
+    # Test case 3: Exclude file root/subdir1/file3.md
+    result = get_markdown_files_from_dir("root", exclude=["root/subdir1/file3.md"])
+    assert sorted(result) == expected
+
+    # Test case 4: Exclude the root directory itself
+    assert get_markdown_files_from_dir("root", exclude=["root"]) == []
+
+
+def test_get_markdown_files_from_dir_prunes_excluded(temp_directory_structure, caplog):
+    root = temp_directory_structure(
+        {
+            "docs": {"guide.md": ""},
+            "node_modules": {"pkg": {"README.md": "", "lib": {"index.js": ""}}},
+            "README.md": "",
+        }
+    )
+    os.symlink(os.path.join(root, "docs"), os.path.join(root, "docs-link"))
+
+    with (
+        patch("os.scandir", wraps=os.scandir) as mock_scandir,
+        caplog.at_level("INFO"),
+    ):
+        result = get_markdown_files_from_dir(root, exclude=[os.path.join(root, "node_modules")])
+
+    assert sorted(result) == [
+        os.path.join(root, "README.md"),
+        os.path.join(root, "docs", "guide.md"),
+    ]
+    # Neither the excluded directory nor the symlinked one are listed
+    assert sorted(call.args[0] for call in mock_scandir.call_args_list) == [
+        root,
+        os.path.join(root, "docs"),
+    ]
+    assert "Visited 2 directories and 2 files" in caplog.text
+    assert "Pruned 1 excluded directories" in caplog.text
+
+
+# === Test ParallelWalker ===
 
-        # Test case 2: Exclude directory root/subdir1
-        result = get_markdown_files_from_dir("root", exclude=["root/subdir1"])
-        expected = [
-            os.path.normpath("root/file1.md"),
-            os.path.normpath("root/subdir2/file5.md"),
-        ]
-        assert result == expected
 
-        # Test case 3: Exclude file root/subdir1/file3.md
-        result = get_markdown_files_from_dir("root", exclude=["root/subdir1/file3.md"])
-        expected = [
-            os.path.normpath("root/file1.md"),
-            os.path.normpath("root/subdir2/file5.md"),
-        ]
+@pytest.fixture
+def unbalanced_tree(temp_directory_structure):
+    """Create a tree with one deep and wide subtree, an excluded one and a few small ones."""
+    deep = {"README.md": ""}
+    for depth in range(6):
+        deep = {
+            f"level{depth}.md": "",
+            "nested": deep,
+            **{f"wide{i}": {"a.md": ""} for i in range(5)},
+        }
+    return temp_directory_structure(
+        {
+            "big": deep,
+            "small1": {"one.md": "", "one.txt": ""},
+            "small2": {"two.md": ""},
+            "node_modules": {"pkg": {"README.md": ""}},
+            "index.md": "",
+        }
+    )
+
+
+@pytest.mark.parametrize("threads", [1, 2, 4])
+def test_parallel_walker_finds_same_files(unbalanced_tree, threads):
+    exclude = [os.path.join(unbalanced_tree, "node_modules")]
+    walker = ParallelWalker(threads, exclude)
+
+    found = list(walker.iter_markdown_files([unbalanced_tree]))
+    with patch("builtins.print"):
+        expected = get_markdown_files_from_dir(unbalanced_tree, exclude)
+    assert len(found) == len(set(found))
+    assert sorted(found) == sorted(expected)
+    assert walker.stats.directories == 40
+    assert walker.stats.pruned_directories == 1
+
+
+def test_parallel_walker_consumer_stops_early(unbalanced_tree):
+    walker = ParallelWalker(4)
+    files = walker.iter_markdown_files([unbalanced_tree])
+    assert next(files).endswith(".md")
+    # Closing the generator stops and joins the threads instead of hanging
+    files.close()
+    assert threading.active_count() == 1
+
+
+def test_parallel_walker_raises_errors_of_threads(unbalanced_tree):
+    def scan(directory, matcher, stats):
+        if os.path.basename(directory) == "small2":
+            raise PermissionError(directory)
+        return _scan_directory(directory, matcher, stats)
+
+    walker = ParallelWalker(4)
+    with patch("refcheck.utils._scan_directory", side_effect=scan):
+        # The other threads finish instead of waiting for the failed directory forever
+        with pytest.raises(PermissionError):
+            list(walker.iter_markdown_files([unbalanced_tree]))
+    assert threading.active_count() == 1
+
+
+def test_iter_markdown_files_from_args(unbalanced_tree, capsys):
+    small = os.path.join(unbalanced_tree, "small1")
+    paths = [
+        os.path.join(small, "one.md"),
+        small,
+        os.path.join(unbalanced_tree, "small2"),
+        os.path.join(unbalanced_tree, "missing"),
+    ]
+    exclude = [paths[2]]
+    with patch("refcheck.utils.load_exclusion_patterns", return_value=["*.txt"]):
+        found = list(iter_markdown_files_from_args(paths, exclude, threads=2))
+    assert exclude == [paths[2]]
+
+    # Files are yielded once, even if they are found through several paths
+    assert found == [os.path.join(small, "one.md")]
+    assert "missing is not a valid file or directory" in capsys.readouterr().out
 
 
 # === Test get_markdown_files_from_args ===
@@ -260,6 +372,8 @@ def test_get_markdown_files_from_args(
 
     # Check the result
     assert sorted(result) == sorted(expected_files)
+    # The exclusions of the ignore file are not added to the list of the caller
+    assert exclude == []
 
     # Check for warnings if any
     captured = capsys.readouterr()
@@ -267,6 +381,62 @@ def test_get_markdown_files_from_args(
         assert warning in captured.out
 
 
+# === Test PathIndex ===
+
+
+@pytest.fixture
+def snapshot_tree(tmp_path):
+    """Create a small tree and a snapshot of it taken by walking it."""
+    (tmp_path / "docs" / "img").mkdir(parents=True)
+    (tmp_path / "docs" / "Guide.md").write_text("# Guide", encoding="utf-8")
+    (tmp_path / "docs" / "img" / "logo.png").write_bytes(b"")
+    index = PathIndex()
+    for dirpath, dirnames, filenames in os.walk(tmp_path / "docs"):
+        index.add_directory(str(dirpath), dirnames, filenames)
+    return tmp_path, index
+
+
+def test_path_index_answers_from_snapshot(snapshot_tree):
+    root, index = snapshot_tree
+    with patch("os.path.exists", side_effect=AssertionError("stat")):
+        assert index.exists(str(root / "docs" / "Guide.md"))
+        assert index.exists(str(root / "docs" / "img" / ".." / "Guide.md"))
+        assert index.exists(str(root / "docs" / "img"))
+        assert not index.exists(str(root / "docs" / "missing.md"))
+
+
+def test_path_index_falls_back_outside_snapshot(snapshot_tree):
+    root, index = snapshot_tree
+    (root / "other.md").write_text("", encoding="utf-8")
+    # The parent of the walked root was not walked, so the file system is asked
+    assert index.exists(str(root / "other.md"))
+    assert index.exists(str(root / "docs"))
+    assert not PathIndex().exists(str(root / "missing.md"))
+
+
+def test_path_index_below_missing_or_unwalked_directories(snapshot_tree):
+    root, index = snapshot_tree
+    (root / "real").mkdir()
+    (root / "real" / "file.md").write_text("", encoding="utf-8")
+    (root / "docs" / "link").symlink_to(root / "real")
+    index.add_directory(str(root / "docs"), ["img", "link"], ["Guide.md"])
+
+    with patch("os.path.exists", side_effect=AssertionError("stat")):
+        assert not index.exists(str(root / "docs" / "missing" / "deeper" / "file.md"))
+        assert not index.exists(str(root / "docs" / "Guide.md" / "file.md"))
+    # Symlinked directories are not walked, so their contents are looked up on disk
+    assert index.exists(str(root / "docs" / "link" / "file.md"))
+
+
+def test_get_markdown_files_from_dir_fills_snapshot(snapshot_tree):
+    root, _ = snapshot_tree
+    with patch("refcheck.utils.settings") as mock_settings:
+        mock_settings.fs_snapshot = True
+        get_markdown_files_from_dir(str(root / "docs"))
+    with patch("os.path.exists", side_effect=AssertionError("stat")):
+        assert path_index.exists(str(root / "docs" / "img" / "logo.png"))
+
+
 # === Test print functions ===
 
 
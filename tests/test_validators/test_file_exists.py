@@ -1,6 +1,7 @@
 import os
 import pytest
 from unittest import mock
+from refcheck.utils import path_index
 from refcheck.validators import file_exists
 
 
@@ -228,3 +229,54 @@ def test_file_valid_path_with_query_string(mock_os_path_exists):
 
     assert result is True
     mock_os_path_exists.assert_called_once()
+
+
+# === Filesystem snapshot ===
+
+
+def test_file_exists_from_snapshot(tmp_path, mock_settings_absolute_path, mock_os_path_exists):
+    (tmp_path / "docs" / "sub").mkdir(parents=True)
+    (tmp_path / "docs" / "target.md").write_text("", encoding="utf-8")
+    for dirpath, dirnames, filenames in os.walk(tmp_path):
+        path_index.add_directory(str(dirpath), dirnames, filenames)
+    origin = str(tmp_path / "docs" / "sub" / "origin.md")
+
+    assert file_exists(origin, "../target.md") is True
+    assert file_exists(origin, "missing.md") is False
+    mock_os_path_exists.assert_not_called()
+
+    # Walking up from the origin is answered from the snapshot, only the absolute path is stat'ed
+    mock_os_path_exists.return_value = False
+    assert file_exists(origin, "/docs/target.md") is True
+    mock_os_path_exists.assert_called_once_with("/docs/target.md")
+
+
+# === Memoized resolution ===
+
+
+def test_absolute_resolution_is_memoized(tmp_path, mock_settings_absolute_path):
+    (tmp_path / "docs" / "a" / "b").mkdir(parents=True)
+    (tmp_path / "docs" / "one.md").write_text("", encoding="utf-8")
+    (tmp_path / "docs" / "two.md").write_text("", encoding="utf-8")
+    origin_dir = tmp_path / "docs" / "a" / "b"
+
+    with mock.patch("os.path.exists", wraps=os.path.exists) as mock_exists:
+        assert file_exists(str(origin_dir / "first.md"), "/one.md") is True
+        traversal_calls = mock_exists.call_count
+        assert traversal_calls == 4  # Absolute path, origin dir, a, docs
+
+        # Other files in the same directory reuse the result
+        assert file_exists(str(origin_dir / "second.md"), "/one.md") is True
+        assert mock_exists.call_count == traversal_calls
+
+        # Other references start at the cached workspace root
+        assert file_exists(str(origin_dir / "first.md"), "/two.md") is True
+        assert mock_exists.call_count == traversal_calls + 2
+        mock_exists.assert_called_with(str(tmp_path / "docs" / "two.md"))
+
+
+def test_backslash_resolution_is_memoized(mock_os_path_exists):
+    mock_os_path_exists.return_value = True
+    assert file_exists("some/path/origin.md", r"\relative_file.md") is True
+    assert file_exists("other/path/origin.md", r"\relative_file.md") is True
+    mock_os_path_exists.assert_called_once_with("relative_file.md")
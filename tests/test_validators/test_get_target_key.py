@@ -0,0 +1,25 @@
+import os
+import pytest
+from refcheck.validators import get_target_key, Reference
+
+
+@pytest.mark.parametrize(
+    "file_path, link, expected",
+    [
+        ("docs/a.md", "b.md", (os.path.normpath("docs/b.md"), "")),  # Relative to the origin file
+        ("docs/a.md", "../README.md#usage", ("README.md", "usage")),  # Fragment split off
+        ("docs/a.md", "./img/../b.md", (os.path.normpath("docs/b.md"), "")),  # Normalized path
+        ("docs/a.md", "#intro", (os.path.normpath("docs/a.md"), "intro")),  # Same document
+        ("docs/a.md", "/abs/b.md", None),  # Absolute references are resolved separately
+        ("docs/a.md", "\\b.md", None),  # So are backslash-prefixed ones
+    ],
+)
+def test_get_target_key(file_path, link, expected):
+    ref = Reference(file_path, 1, f"[x]({link})", link)
+    assert get_target_key(ref) == expected
+
+
+def test_get_target_key_same_for_sibling_files():
+    first = Reference("docs/a.md", 1, "[c](../CONTRIBUTING.md)", "../CONTRIBUTING.md")
+    second = Reference("docs/b.md", 7, "[c](../CONTRIBUTING.md)", "../CONTRIBUTING.md")
+    assert get_target_key(first) == get_target_key(second) == ("CONTRIBUTING.md", "")
@@ -1,6 +1,10 @@
+import builtins
 import pytest
-from unittest.mock import mock_open, patch
-from refcheck.validators import _header_exists  # No need to import _normalize_header
+from unittest.mock import patch
+from refcheck.anchors import AnchorStyle
+from refcheck.parsers import MarkdownParser
+from refcheck.store import document_store
+from refcheck.validators import _header_exists
 
 
 @pytest.mark.parametrize(
@@ -13,9 +17,14 @@ from refcheck.validators import _header_exists  # No need to import _normalize_h
         ),  # Header exists, normalized
         (
             "# Title\n## Section_One\n### Subsection",
-            "section one",
+            "section_one",
             True,
-        ),  # Underscore replaced by space
+        ),  # Underscores are kept, like GitHub does
+        (
+            "# Title\n## Section_One\n### Subsection",
+            "section one",
+            False,
+        ),  # ... so they do not match spaces
         (
             "# Header with (special)! chars?",
             "header-with-special-chars",
@@ -35,23 +44,21 @@ from refcheck.validators import _header_exists  # No need to import _normalize_h
         ),  # No actual header match
     ],
 )
-@patch("refcheck.validators.open", new_callable=mock_open)
-def test_header_exists(mock_file, file_content, header, expected):
+def test_header_exists(temp_markdown_file, file_content, header, expected):
     """Test if headers are correctly identified after normalization."""
 
     # Arrange
-    mock_file.return_value.read.return_value = file_content
+    file_path = temp_markdown_file(file_content)
 
     # Act
-    result = _header_exists("fake_path.md", header)
+    result = _header_exists(file_path, header)
 
     # Assert
     assert result == expected, f"Expected {expected} but got {result} for header: {header}"
 
 
-@patch("refcheck.validators.open", side_effect=FileNotFoundError)
 @patch("refcheck.validators.logger.error")  # Mock logger to prevent actual logging
-def test_header_exists_file_not_found(mock_logger, mock_file):
+def test_header_exists_file_not_found(mock_logger):
     """Test that _header_exists handles missing files correctly."""
 
     # Act
@@ -60,3 +67,59 @@ def test_header_exists_file_not_found(mock_logger, mock_file):
     # Assert
     assert result is False
     mock_logger.assert_called_once_with("File not found: missing.md")
+
+
+@pytest.mark.parametrize(
+    "file_content, header, expected",
+    [
+        ("## Setup {#install}", "install", True),  # Explicit heading id
+        ("## Setup {#install}", "setup", False),  # Replaced by the explicit id
+        ('<a name="legacy-anchor"></a>\n# Title', "legacy-anchor", True),  # HTML name
+        ('<span id="Custom_Id">text</span>', "Custom_Id", True),  # HTML id, matched exactly
+        ("<div class='note'>text</div>", "note", False),  # Other attributes are no anchors
+    ],
+)
+def test_header_exists_explicit_anchors(temp_markdown_file, file_content, header, expected):
+    """Test that explicit heading ids and HTML anchors are part of the anchor index."""
+    file_path = temp_markdown_file(file_content)
+
+    assert _header_exists(file_path, header) == expected
+
+
+def test_header_exists_reads_file_once(tmp_path, monkeypatch):
+    """Test that the anchors of a file are collected once and shared by all lookups."""
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "file.md").write_text("# Title\n## Section\n", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+
+    with patch("refcheck.parsers.open", side_effect=builtins.open, create=True) as mock_file:
+        assert _header_exists("docs/file.md", "title")
+        assert _header_exists("docs/../docs/file.md", "section")
+        assert not _header_exists("docs/file.md", "missing")
+    mock_file.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "file_content, header, expected",
+    [
+        ("# Café & Crème", "café--crème", True),  # Non-ASCII letters are kept
+        ("# Café & Crème", "caf%C3%A9--cr%C3%A8me", True),  # Percent-encoded fragment
+        ("# Intro\n## Intro", "intro-1", True),  # Duplicate header suffix
+        ("```\n# Not a header\n```", "not-a-header", False),  # Fenced code block
+        ("Setext Header\n=============", "setext-header", True),  # Setext header
+    ],
+)
+def test_header_exists_github_slugs(temp_markdown_file, file_content, header, expected):
+    """Test that anchors follow the GitHub slug rules."""
+    file_path = temp_markdown_file(file_content)
+
+    assert _header_exists(file_path, header) == expected
+
+
+def test_header_exists_gitlab_slugs(temp_markdown_file):
+    """Test that the GitLab style collapses consecutive hyphens."""
+    document_store.reset(MarkdownParser(), AnchorStyle.GITLAB)
+    file_path = temp_markdown_file("# Café & Crème")
+
+    assert _header_exists(file_path, "café-crème")
+    assert document_store.get(file_path).anchors == {"café-crème"}
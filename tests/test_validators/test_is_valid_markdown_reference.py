@@ -64,7 +64,6 @@ def test_is_valid_markdown_reference(
         line_number=10,  # Arbitrary, not used in the function
         syntax=f"[Example]({link})",
         link=link,
-        is_remote=False,  # Ensuring only local references are tested
     )
 
     mock_file_exists.return_value = file_exists_return
@@ -77,3 +76,16 @@ def test_is_valid_markdown_reference(
 
     # Assert
     assert result == expected, f"Expected {expected} but got {result} for link: {link}"
+
+
+def test_absolute_reference_header_is_found_in_resolved_file(tmp_path, mock_settings_absolute):
+    """Test that headers of absolute references are looked up in the file that was found."""
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "guide.md").write_text("# Guide\n\n## Setup\n", encoding="utf-8")
+    origin = str(tmp_path / "docs" / "sub" / "page.md")
+
+    def make_ref(link):
+        return Reference(origin, 1, f"[x]({link})", link)
+
+    assert is_valid_markdown_reference(make_ref("/docs/guide.md#setup"))
+    assert not is_valid_markdown_reference(make_ref("/docs/guide.md#missing"))
@@ -0,0 +1,80 @@
+import os
+import pytest
+from unittest import mock
+
+from refcheck.anchors import extract_anchors
+from refcheck.parsers import ReferenceKind
+from refcheck.validators import validate_references, Reference
+
+
+@pytest.fixture
+def docs_tree(tmp_path):
+    """Create a small documentation tree and return the path of its sub directory."""
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "api.md").write_text("# API\n\n## Errors\n", encoding="utf-8")
+    (tmp_path / "docs" / "diagram.png").write_bytes(b"")
+    (tmp_path / "README.md").write_text("# Project\n", encoding="utf-8")
+    return tmp_path / "docs"
+
+
+def make_reference(file_path, link, kind=ReferenceKind.INLINE_LINK):
+    return Reference(str(file_path), 1, f"[x]({link})", link, kind=kind)
+
+
+def test_verdicts_in_order(docs_tree):
+    """Test that each reference gets its verdict, in the order of the references."""
+    source = docs_tree / "guide.md"
+    links = [
+        "api.md",
+        "api.md#errors",
+        "api.md#missing",
+        "#errors",
+        "diagram.png",
+        "missing.md",
+        "../README.md#project",
+        "/README.md",
+    ]
+
+    verdicts = validate_references(make_reference(source, link) for link in links)
+    assert verdicts == [True, True, False, False, True, False, True, False]
+
+
+def test_one_check_per_target(docs_tree):
+    """Test that a target referenced many times is checked and loaded once."""
+    references = [
+        make_reference(docs_tree / f"page{i}.md", link)
+        for i in range(50)
+        for link in ["api.md", "./api.md#errors", "api.md#API"]
+    ]
+
+    with (
+        mock.patch("os.path.exists", wraps=os.path.exists) as mock_exists,
+        mock.patch("refcheck.store.extract_anchors", wraps=extract_anchors) as mock_extract,
+    ):
+        verdicts = validate_references(references)
+
+    assert all(verdicts)
+    mock_exists.assert_called_once_with(str(docs_tree / "api.md"))
+    mock_extract.assert_called_once()
+
+
+def test_absolute_references(docs_tree, mock_settings_absolute):
+    """Test that absolute references are resolved and their anchors checked in the found file."""
+    source = docs_tree / "guide.md"
+    links = ["/docs/api.md#errors", "/docs/api.md#missing", "/missing.md"]
+
+    verdicts = validate_references(make_reference(source, link) for link in links)
+    assert verdicts == [True, False, False]
+
+
+def test_remote_and_undefined_references(docs_tree, mock_http_success):
+    """Test that remote references are checked once per URL and undefined labels are invalid."""
+    source = docs_tree / "guide.md"
+    references = [
+        make_reference(source, "https://example.com"),
+        make_reference(source, "https://example.com"),
+        make_reference(source, "undefined", ReferenceKind.REFERENCE_LINK),
+    ]
+
+    assert validate_references(references) == [True, True, False]
+    mock_http_success.assert_called_once()
@@ -0,0 +1,124 @@
+"""Tests for refcheck.watch module."""
+
+import os
+import sys
+import time
+
+import pytest
+
+from refcheck.graph import ReferenceGraph
+from refcheck.store import DocumentStore
+from refcheck.watch import InotifyWatcher, PollingWatcher, create_watcher, select_rechecked_files
+
+
+def write_file(path, content):
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content)
+
+
+@pytest.fixture(params=["polling", "inotify"])
+def watcher_class(request):
+    if request.param == "polling":
+        return lambda directories: PollingWatcher(directories, interval=0.01)
+    if not sys.platform.startswith("linux"):
+        pytest.skip("inotify is only available on Linux")
+    return InotifyWatcher
+
+
+class TestWatchers:
+    """Tests for the polling and inotify watchers."""
+
+    def test_no_changes(self, watcher_class, tmp_path):
+        """Test that waiting returns nothing after the timeout if nothing changed."""
+        write_file(tmp_path / "a.md", "# A\n")
+        watcher = watcher_class([str(tmp_path)])
+        try:
+            assert watcher.wait_for_changes(timeout=0.05) == set()
+        finally:
+            watcher.close()
+
+    def test_created_modified_and_deleted_files(self, watcher_class, tmp_path):
+        """Test that created, modified and deleted files are reported by absolute path."""
+        write_file(tmp_path / "a.md", "# A\n")
+        write_file(tmp_path / "b.md", "# B\n")
+        watcher = watcher_class([str(tmp_path)])
+        try:
+            write_file(tmp_path / "a.md", "# A changed\n")
+            os.remove(tmp_path / "b.md")
+            write_file(tmp_path / "c.png", "")
+            assert watcher.wait_for_changes(timeout=5) == {
+                str(tmp_path / "a.md"),
+                str(tmp_path / "b.md"),
+                str(tmp_path / "c.png"),
+            }
+        finally:
+            watcher.close()
+
+    def test_no_wait_for_changes(self, watcher_class, tmp_path):
+        """Test that a timeout of 0 returns changes made before, without waiting."""
+        watcher = watcher_class([str(tmp_path)])
+        try:
+            write_file(tmp_path / "a.md", "# A\n")
+            if isinstance(watcher, PollingWatcher):
+                watcher.interval = 5
+            start = time.monotonic()
+            assert watcher.wait_for_changes(timeout=0) == {str(tmp_path / "a.md")}
+            assert watcher.wait_for_changes(timeout=0) == set()
+            assert time.monotonic() - start < 1
+        finally:
+            watcher.close()
+
+    def test_set_directories(self, watcher_class, tmp_path):
+        """Test that only the files directly in the watched directories are reported."""
+        (tmp_path / "docs").mkdir()
+        (tmp_path / "other").mkdir()
+        watcher = watcher_class([str(tmp_path / "other")])
+        try:
+            watcher.set_directories([str(tmp_path / "docs")])
+            assert watcher.directories == [str(tmp_path / "docs")]
+
+            write_file(tmp_path / "other" / "a.md", "")
+            write_file(tmp_path / "docs" / "b.md", "")
+            assert watcher.wait_for_changes(timeout=5) == {str(tmp_path / "docs" / "b.md")}
+        finally:
+            watcher.close()
+
+    def test_create_watcher(self, tmp_path):
+        """Test that inotify is used on Linux, and polling elsewhere."""
+        watcher = create_watcher([str(tmp_path)])
+        try:
+            expected = InotifyWatcher if sys.platform.startswith("linux") else PollingWatcher
+            assert isinstance(watcher, expected)
+            assert watcher.directories == [str(tmp_path)]
+        finally:
+            watcher.close()
+
+
+class TestSelectRecheckedFiles:
+    """Tests for select_rechecked_files() function."""
+
+    def test_changed_files_and_referrers(self, temp_directory_structure):
+        """Test that changed files and files linking to changed or created paths are selected."""
+        root = temp_directory_structure(
+            {
+                "README.md": "[guide](docs/guide.md) [logo](docs/logo.png)",
+                "docs": {
+                    "guide.md": "[index](index.md)",
+                    "index.md": "[docs](../docs)",
+                },
+                "other.md": "no links",
+            }
+        )
+        files = [
+            os.path.join(root, *file.split("/"))
+            for file in ["README.md", "docs/guide.md", "docs/index.md", "other.md"]
+        ]
+        readme, guide, index, other = files
+        store = DocumentStore()
+        graph = ReferenceGraph.from_documents(store.get(file) for file in files)
+
+        # The created asset fixes the link of the README
+        logo = os.path.join(root, "docs", "logo.png")
+        assert select_rechecked_files(files, graph, {logo}) == [readme, index]
+        assert select_rechecked_files(files, graph, {guide}) == [readme, guide, index]
+        assert select_rechecked_files(files, graph, {other}) == [other]